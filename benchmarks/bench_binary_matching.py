@@ -0,0 +1,63 @@
+"""Sprite.locate_binary against Sprite.locate_template for a flat colored icon.
+
+Locates a 32x32 two-color icon in a 1920x1080 frame of smooth scenery with
+some patches of the icon color.
+
+Usage: python benchmarks/bench_binary_matching.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Binarizations, Sprite
+
+COLOR_KEY = (0, 200, 255)
+
+
+def measure(function, repeat=5):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame_img = cv2.resize(
+        rng.integers(0, 256, (27, 48, 3), dtype=np.uint8),
+        (1920, 1080),
+        interpolation=cv2.INTER_CUBIC,
+    )
+    for _ in range(50):
+        y, x = rng.integers(0, 1040), rng.integers(0, 1880)
+        frame_img[y : y + 24, x : x + 24] = COLOR_KEY
+    icon = np.full((32, 32, 3), 30, dtype=np.uint8)
+    icon[4:28, 4:28] = COLOR_KEY
+    icon[10:22, 10:22] = 30
+    frame_img[600:632, 900:932] = icon
+    frame = Frame(frame_img)
+    sprite = Sprite.from_images("ICON", [icon])
+
+    location, template_seconds = measure(
+        lambda: Sprite.locate_template(sprite, frame, match_threshold=0.99)
+    )
+    assert location == (600, 900, 632, 932)
+    for binarization in Binarizations:
+        location, binary_seconds = measure(
+            lambda: Sprite.locate_binary(
+                sprite, frame, binarization=binarization, color_key=COLOR_KEY
+            )
+        )
+        assert location == (600, 900, 632, 932)
+        print(
+            f"{binarization.name:9} locate_template {template_seconds * 1e3:7.1f} ms"
+            f"  locate_binary {binary_seconds * 1e3:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
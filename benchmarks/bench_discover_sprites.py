@@ -0,0 +1,41 @@
+"""Sprite.discover_sprites without, with a cold and with a warm cache file.
+
+Writes 2000 noisy 64x64 sprite images (10 animation states each) to a
+temporary dir first.
+
+Usage: python benchmarks/bench_discover_sprites.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from game_control.sprite import Sprite
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        sprites_dir = Path(directory) / "sprites"
+        sprites_dir.mkdir()
+        for i in range(2000):
+            img = rng.integers(0, 16, (64, 64, 3), dtype=np.uint8) * 16
+            cv2.imwrite(str(sprites_dir / f"sprite_{i // 10}_{i % 10}.png"), img)
+        cache_file = Path(directory) / "sprites.npz"
+
+        for name, kwargs in [
+            ("no cache", {}),
+            ("cold cache", {"cache_file": cache_file}),
+            ("warm cache", {"cache_file": cache_file}),
+        ]:
+            start = time.perf_counter()
+            Sprite.discover_sprites(sprites_dir, **kwargs)
+            seconds = time.perf_counter() - start
+            print(f"{name:<12} {seconds * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""FFT match engine against cv2.matchTemplate for many sprites per region.
+
+Locates 1, 5, 20 and 50 sprites of 32x48 pixels in a 960x540 frame (the
+default game window size) with Sprite.locate_many. The FFT engine is timed
+on fresh frames, so the frame transform is included.
+
+Usage: python benchmarks/bench_fft_matching.py
+"""
+
+import timeit
+
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import MatchEngines, Sprite
+
+
+def main():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (540, 960, 3), dtype=np.uint8)
+
+    for count in [1, 5, 20, 50]:
+        sprites = []
+        for i in range(count):
+            y, x = rng.integers(0, 500), rng.integers(0, 900)
+            image_data = img[y : y + 32, x : x + 48, :, np.newaxis].copy()
+            sprites.append(Sprite(f"SPRITE_{i}", image_data=image_data))
+
+        timings = []
+        for match_engine in [MatchEngines.OPENCV, MatchEngines.FFT]:
+
+            def run():
+                return Sprite.locate_many(
+                    sprites, Frame(img), match_engine=match_engine
+                )
+
+            timings.append(min(timeit.repeat(run, number=1, repeat=3)) * 1e3)
+            assert run() == Sprite.locate_many(sprites, Frame(img))
+        print(
+            f"{count:3} sprites OPENCV {timings[0]:9.1f} ms  FFT {timings[1]:9.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
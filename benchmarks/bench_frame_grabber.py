@@ -0,0 +1,75 @@
+"""Bytes allocated per grab by the FrameGrabber capture path.
+
+Compares the old path (copy the mss screenshot with np.array, slice off
+alpha and make it contiguous for cv2) with FrameGrabber, which converts the
+raw BGRA buffer straight into its frame buffer. The screenshot itself is
+made up front, so allocations inside mss are not counted.
+
+Usage: python benchmarks/bench_frame_grabber.py [width height]
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+from mss.screenshot import ScreenShot
+
+import game_control.frame_grabber
+from game_control.frame_grabber import ColorModes, FrameGrabber
+
+
+class PrerecordedScreenGrabber:
+    screenshot = None
+
+    def grab(self, region):
+        return self.screenshot
+
+
+def old_grab(screen_grabber, region):
+    frame = np.array(screen_grabber.grab(region))
+    return np.ascontiguousarray(frame[..., :3])
+
+
+def allocated_per_grab(grab, repeat=20):
+    """Average peak of newly allocated bytes during a grab."""
+    grab()  # Warm up, e.g. to fill buffers that are reused afterwards.
+    frames = []
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(repeat):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        frames.append(grab())
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - current
+    tracemalloc.stop()
+    return allocated / repeat
+
+
+def main(width=1920, height=1080):
+    region = {"top": 0, "left": 0, "width": width, "height": height}
+    bgra = np.random.randint(0, 256, (height, width, 4), dtype=np.uint8)
+    PrerecordedScreenGrabber.screenshot = ScreenShot(bytearray(bgra.tobytes()), region)
+    game_control.frame_grabber.mss.mss = PrerecordedScreenGrabber
+
+    screen_grabber = PrerecordedScreenGrabber()
+    grabs = {"np.array + slice": lambda: old_grab(screen_grabber, region)}
+    for color_mode, scale in [
+        (ColorModes.BGR, 1),
+        (ColorModes.GRAYSCALE, 1),
+        (ColorModes.BGR, 0.5),
+    ]:
+        frame_grabber = FrameGrabber(fps=30, color_mode=color_mode, scale=scale)
+        name = f"FrameGrabber {color_mode.name} x{scale}"
+        grabs[name] = lambda f=frame_grabber: f.grab_frame(region)
+
+    print(f"{width}x{height}")
+    for name, grab in grabs.items():
+        allocated = allocated_per_grab(grab)
+        seconds = min(timeit.repeat(grab, number=20, repeat=5)) / 20
+        print(f"{name:<30} {allocated / 1e6:8.2f} MB/grab {seconds * 1e3:8.2f} ms/grab")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,80 @@
+"""SpriteIdentifier.identify_many against identify with a Sprite per crop.
+
+Identifies 48 slots of 32x32 pixels cut out of a frame against a library
+of 1000 sprites, in every mode.
+
+Usage: python benchmarks/bench_identify_many.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+from game_control.sprite_identifier import SpriteIdentifier
+
+MODES = ["SIGNATURE_COLORS", "CONSTELLATION_OF_PIXELS", "SSIM", "PERCEPTUAL_HASH"]
+
+
+def random_image(rng):
+    image = cv2.GaussianBlur(
+        rng.integers(0, 256, (32, 32, 3), dtype=np.uint8), (0, 0), 3
+    )
+    return (cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX) // 32 * 32).astype(
+        np.uint8
+    )
+
+
+def measure(function, repeat=3):
+    """Result of function and its fastest time of repeat calls."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    return result, min(seconds)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    images = [random_image(rng) for _ in range(1000)]
+    sprite_identifier = SpriteIdentifier({})
+    for i, image in enumerate(images):
+        sprite_identifier.register(Sprite.from_images(f"SPRITE_{i}", [image]))
+
+    frame_img = np.zeros((6 * 40, 8 * 40, 3), dtype=np.uint8)
+    boxes = []
+    for row in range(6):
+        for column in range(8):
+            box = (row * 40, column * 40, row * 40 + 32, column * 40 + 32)
+            frame_img[box[0] : box[2], box[1] : box[3]] = images[rng.integers(1000)]
+            boxes.append(box)
+    frame = Frame(frame_img)
+
+    for mode in MODES:
+        sprite_identifier.identify_many(frame=frame, boxes=boxes[:1], mode=mode)
+
+        names, loop_seconds = measure(
+            lambda: [
+                sprite_identifier.identify(
+                    Sprite("QUERY", image_data=frame_img[y0:y1, x0:x1, :, np.newaxis]),
+                    mode=mode,
+                )
+                for y0, x0, y1, x1 in boxes
+            ]
+        )
+        identifications, many_seconds = measure(
+            lambda: sprite_identifier.identify_many(frame=frame, boxes=boxes, mode=mode)
+        )
+
+        assert names == [name for name, score in identifications]
+        print(
+            f"{mode:<24} identify {loop_seconds * 1e3:8.2f} ms"
+            f"  identify_many {many_seconds * 1e3:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Sprite.locate_all_template against masking and locating again.
+
+Counts 5 and 20 instances of a 32x48 sprite in a 960x540 frame.
+
+Usage: python benchmarks/bench_locate_all_template.py
+"""
+
+import time
+
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+
+
+def locate_by_masking(sprite, img):
+    img = img.copy()
+    locations = []
+    while True:
+        location = Sprite.locate_template(sprite, Frame(img))
+        if location is None:
+            return locations
+        locations.append(location)
+        img[location[0] : location[2], location[1] : location[3]] = 0
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for count in [5, 20]:
+        img = rng.integers(0, 256, (540, 960, 3), dtype=np.uint8)
+        sprite_image = img[:32, :48].copy()
+        for i in range(count):
+            y, x = 50 + 100 * (i // 5), 50 + 180 * (i % 5)
+            img[y : y + 32, x : x + 48] = sprite_image
+        sprite = Sprite("SPRITE", image_data=sprite_image[..., np.newaxis])
+
+        start = time.perf_counter()
+        masked_locations = locate_by_masking(sprite, img)
+        masking_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = Sprite.locate_all_template(sprite, Frame(img))
+        all_seconds = time.perf_counter() - start
+
+        assert sorted(masked_locations) == sorted(location for location, _ in matches)
+        print(
+            f"{count + 1:3} instances masking {masking_seconds * 1e3:8.1f} ms"
+            f"  locate_all_template {all_seconds * 1e3:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
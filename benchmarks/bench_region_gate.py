@@ -0,0 +1,70 @@
+"""RegionGate.locate against Sprite.locate_template on mostly static HUD regions.
+
+Locates 5 sprites in 3 HUD regions of 100 960x540 frames in which a score
+changes every 10 frames and the rest of the game world every frame.
+
+Usage: python benchmarks/bench_region_gate.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.region_gate import RegionGate
+from game_control.sprite import Sprite
+
+REGIONS = {
+    "SCORE": (0, 0, 60, 320),
+    "HEALTH": (0, 640, 60, 960),
+    "ITEMS": (480, 0, 540, 960),
+}
+
+
+def main():
+    rng = np.random.default_rng(0)
+    hud = cv2.GaussianBlur(
+        rng.integers(0, 256, (540, 960, 3), dtype=np.uint8), (0, 0), 2
+    )
+    sprites = [
+        Sprite(f"SPRITE_{i}", image_data=hud[y : y + 24, x : x + 24, :, np.newaxis])
+        for i, (y, x) in enumerate(
+            [(10, 10), (20, 100), (10, 700), (490, 50), (500, 600)]
+        )
+    ]
+    frames = []
+    for i in range(100):
+        img = hud.copy()
+        img[60:480] = rng.integers(0, 256, (420, 960, 3), dtype=np.uint8)
+        img[20:40, 250:310] = 25 * (i // 10)
+        frames.append(Frame(img))
+    queries = [(sprite, region_name) for sprite in sprites for region_name in REGIONS]
+
+    start = time.perf_counter()
+    locations = [
+        Sprite.locate_template(sprite, frame, REGIONS[region_name])
+        for frame in frames
+        for sprite, region_name in queries
+    ]
+    locate_seconds = time.perf_counter() - start
+
+    gate = RegionGate(REGIONS)
+    start = time.perf_counter()
+    gated_locations = [
+        gate.locate(sprite, frame, region_name)
+        for frame in frames
+        for sprite, region_name in queries
+    ]
+    gate_seconds = time.perf_counter() - start
+
+    assert gated_locations == locations
+    print(
+        f"locate_template {locate_seconds * 1e3:8.1f} ms"
+        f"  RegionGate.locate {gate_seconds * 1e3:8.1f} ms"
+        f"  hits {gate.hits} misses {gate.misses}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""SpriteIdentifier identify by signature colors and by constellation of pixels
+against a scan of all sprites.
+
+Registers 100, 1000 and 5000 sprites with two animation states of random
+colors out of a 4096 color palette and identifies 100 query sprites. Then
+alternately registers one of 100 more sprites and identifies a query sprite.
+
+Usage: python benchmarks/bench_sprite_identifier.py
+"""
+
+import time
+
+import numpy as np
+
+from game_control.sprite import Sprite
+from game_control.sprite_identifier import SpriteIdentifier
+
+
+def scan_identify_by_signature_colors(sprites, query_sprite):
+    top_sprite_score = 0
+    top_sprite_match = None
+    for sprite_name, sprite in sprites.items():
+        for sprite_signature_colors in sprite.signature_colors:
+            for query_sprite_signature_colors in query_sprite.signature_colors:
+                score = int(
+                    (
+                        len(query_sprite_signature_colors & sprite_signature_colors)
+                        / len(sprite_signature_colors)
+                    )
+                    * 100
+                )
+                if score > top_sprite_score:
+                    top_sprite_score = score
+                    top_sprite_match = sprite_name
+    return top_sprite_match
+
+
+def scan_identify_by_constellation_of_pixels(sprites, query_sprite):
+    top_sprite_score = 0
+    top_sprite_match = None
+    for sprite_name, sprite in sprites.items():
+        if sprite.image_shape != query_sprite.image_shape:
+            continue
+        for constellation_of_pixels in sprite.constellation_of_pixels:
+            for i in range(query_sprite.image_data.shape[3]):
+                query_sprite_image = query_sprite.image_data[..., i]
+                score = sum(
+                    tuple(query_sprite_image[y, x, :3]) == color
+                    for (y, x), color in constellation_of_pixels.items()
+                )
+                score = int((score / len(constellation_of_pixels)) * 100)
+                if score > top_sprite_score:
+                    top_sprite_score = score
+                    top_sprite_match = sprite_name
+    return top_sprite_match
+
+
+def random_sprite(name, rng, states=2):
+    palette = rng.integers(0, 16, (4096, 3), dtype=np.uint8) * 16
+    images = [palette[rng.integers(0, len(palette), (16, 16))] for _ in range(states)]
+    return Sprite.from_images(name, images)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    sprites = [random_sprite(f"SPRITE_{i}", rng) for i in range(5100)]
+    query_sprites = [random_sprite("QUERY", rng, states=1) for _ in range(100)]
+
+    for count in [100, 1000, 5000]:
+        sprite_identifier = SpriteIdentifier({})
+        for sprite in sprites[:count]:
+            sprite_identifier.register(sprite)
+
+        for name, scan, identify in [
+            (
+                "signature colors",
+                scan_identify_by_signature_colors,
+                sprite_identifier.identify_by_signature_colors,
+            ),
+            (
+                "constellation of pixels",
+                scan_identify_by_constellation_of_pixels,
+                sprite_identifier.identify_by_constellation_of_pixels,
+            ),
+        ]:
+            identify(query_sprites[0])
+            timings = []
+            for run in [lambda q: scan(sprite_identifier.sprites, q), identify]:
+                start = time.perf_counter()
+                matches = [run(query_sprite) for query_sprite in query_sprites]
+                timings.append((time.perf_counter() - start) / len(query_sprites) * 1e3)
+            print(
+                f"{count:5} sprites {name:<24} scan {timings[0]:8.3f} ms"
+                f"  indexed {timings[1]:8.3f} ms"
+            )
+            assert matches == [
+                scan(sprite_identifier.sprites, query_sprite)
+                for query_sprite in query_sprites
+            ]
+
+    for mode in ["SIGNATURE_COLORS", "CONSTELLATION_OF_PIXELS"]:
+        sprite_identifier = SpriteIdentifier({})
+        for sprite in sprites[:5000]:
+            sprite_identifier.register(sprite)
+        sprite_identifier.identify(query_sprites[0], mode=mode)
+
+        start = time.perf_counter()
+        for sprite, query_sprite in zip(sprites[5000:], query_sprites):
+            sprite_identifier.register(sprite)
+            sprite_identifier.identify(query_sprite, mode=mode)
+        duration = (time.perf_counter() - start) / len(query_sprites) * 1e3
+        print(f"register and identify {mode:<24} {duration:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Sprite.locate (constellation of pixels) on sparse and dense color frames.
+
+Compares Sprite.locate with the previous implementation, which looped over
+all candidate pixels in Python, and checks that both give the same result.
+"Sprite.locate" builds the color index of the frame on every call; "shared
+index" reuses it, as happens when locating more sprites in the same frame.
+
+Usage: python benchmarks/bench_sprite_locate.py
+"""
+
+import timeit
+
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+from game_control.utilities import extract_roi_from_image
+
+
+def python_loop_locate(sprite, frame, region=None):
+    """Sprite.locate as it was before vectorization (without global location)."""
+    location = None
+    img = frame.img
+    if region:
+        img = extract_roi_from_image(img, region)
+
+    for constellation_of_pixels in sprite.constellation_of_pixels:
+        query_coordinates, query_rgb = list(constellation_of_pixels.items())[0]
+        rgb_coordinates = [
+            (y - query_coordinates[0], x - query_coordinates[1])
+            for y, x in Sprite.locate_color(query_rgb, image=img)
+        ]
+        maximum_y = img.shape[0] - sprite.image_shape[0]
+        maximum_x = img.shape[1] - sprite.image_shape[1]
+
+        for y, x in rgb_coordinates:
+            if y < 0 or x < 0 or y > maximum_y or x > maximum_x:
+                continue
+            for yx, rgb in constellation_of_pixels.items():
+                if tuple(img[y + yx[0], x + yx[1], :]) != rgb:
+                    break
+            else:
+                location = (y, x, y + sprite.image_shape[0], x + sprite.image_shape[1])
+
+    return location
+
+
+def make_frame(sprite_img, density, rng, shape=(1080, 1920, 3)):
+    """Frame where a fraction density of the pixels has a color of the sprite."""
+    colors = np.unique(sprite_img.reshape(-1, 3), axis=0)
+    img = np.zeros(shape, dtype=np.uint8)
+    mask = rng.random(shape[:2]) < density
+    img[mask] = colors[rng.integers(0, len(colors), mask.sum())]
+    y, x = shape[0] // 2, shape[1] // 2
+    img[y : y + sprite_img.shape[0], x : x + sprite_img.shape[1]] = sprite_img
+    return Frame(img)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    palette = np.array([(255, 0, 0), (0, 255, 0), (0, 0, 255), (0, 255, 255)], np.uint8)
+    sprite_img = palette[rng.integers(0, len(palette), (32, 32))]
+    sprite = Sprite("BENCHMARK", image_data=sprite_img[..., np.newaxis])
+
+    for density in [0.001, 0.05, 0.5]:
+        frame = make_frame(sprite_img, density, rng)
+        expected = python_loop_locate(sprite, frame)
+        assert Sprite.locate(sprite, frame) == expected
+
+        runs = {
+            "python loop": lambda: python_loop_locate(sprite, frame),
+            "Sprite.locate": lambda: Sprite.locate(sprite, Frame(frame.img)),
+            "shared index": lambda: Sprite.locate(sprite, frame),
+        }
+        for name, run in runs.items():
+            seconds = min(timeit.repeat(run, number=3, repeat=3)) / 3
+            print(f"density {density:<6} {name:<14} {seconds * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Sprite.locate_many against a loop of Sprite.locate_template calls.
+
+Locates 1, 10 and 50 sprites in a 960x540 frame (the default game window
+size), half of them within a shared region and half in the whole frame.
+
+Usage: python benchmarks/bench_sprite_locate_many.py
+"""
+
+import os
+import timeit
+
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+
+REGION = (100, 200, 400, 700)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = Frame(rng.integers(0, 256, (540, 960, 3), dtype=np.uint8))
+    print(f"{os.cpu_count()} cpus")
+
+    for count in [1, 10, 50]:
+        sprites = []
+        for i in range(count):
+            y, x = rng.integers(100, 300), rng.integers(200, 600)
+            image_data = frame.img[y : y + 32, x : x + 48, :, np.newaxis].copy()
+            sprites.append(Sprite(f"SPRITE_{i}", image_data=image_data))
+        regions = {sprite.name: REGION for sprite in sprites[::2]}
+
+        def loop():
+            return {
+                sprite.name: Sprite.locate_template(
+                    sprite, frame, regions.get(sprite.name)
+                )
+                for sprite in sprites
+            }
+
+        def many():
+            return Sprite.locate_many(sprites, frame, regions)
+
+        assert loop() == many()
+        for name, run in [("loop", loop), ("locate_many", many)]:
+            seconds = min(timeit.repeat(run, number=3, repeat=3)) / 3
+            print(f"{count:3} sprites {name:<12} {seconds * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Accuracy and speed of the pyramid mode of Sprite.locate_template.
+
+Locates every sprite of tests/test_sprite_locator_data in every screenshot
+at full resolution and with 1 to 3 pyramid levels, and reports how often
+the pyramid mode gives the same location and how long it takes.
+
+Usage: python benchmarks/bench_sprite_pyramid.py
+"""
+
+import timeit
+from pathlib import Path
+
+import cv2
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "test_sprite_locator_data"
+
+
+def main():
+    sprites = Sprite.discover_sprites(DATA_DIR / "sprites")
+    frames = []
+    for file_path in sorted((DATA_DIR / "screenshots").glob("*.png")):
+        img = cv2.imread(str(file_path))
+        if img is None:
+            raise RuntimeError(f"Could not read {file_path} (fetch it with git lfs)")
+        frames.append(Frame(img))
+
+    cases = [(sprite, frame) for sprite in sprites.values() for frame in frames]
+    expected = [Sprite.locate_template(sprite, frame) for sprite, frame in cases]
+
+    for levels in range(4):
+        locations = [
+            Sprite.locate_template(sprite, frame, pyramid_levels=levels)
+            for sprite, frame in cases
+        ]
+        same = sum(a == b for a, b in zip(locations, expected))
+
+        def run():
+            for sprite, frame in cases:
+                Sprite.locate_template(sprite, frame, pyramid_levels=levels)
+
+        seconds = min(timeit.repeat(run, number=1, repeat=3)) / len(cases)
+        print(
+            f"pyramid_levels={levels} {same}/{len(cases)} same locations "
+            f"{seconds * 1e3:8.2f} ms/locate"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Sprite.locate_template with the frame matched in 1 to cpu count bands.
+
+Locates a 64x64 sprite in a 2560x1440 frame; the speedup is bounded by the
+number of cores.
+
+Usage: python benchmarks/bench_tiled_matching.py
+"""
+
+import os
+import time
+
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = Frame(rng.integers(0, 256, (1440, 2560, 3), dtype=np.uint8))
+    sprite = Sprite("SPRITE", image_data=frame.img[700:764, 1200:1264, :, np.newaxis])
+    cpu_count = os.cpu_count() or 1
+    print(f"{cpu_count} cores")
+
+    untiled_seconds = None
+    for tiles in sorted({1, 2, 4, cpu_count}):
+        Sprite.locate_template(sprite, frame, tiles=tiles)
+        start = time.perf_counter()
+        for _ in range(5):
+            location = Sprite.locate_template(sprite, frame, tiles=tiles)
+        seconds = (time.perf_counter() - start) / 5
+        assert location == (700, 1200, 764, 1264)
+        untiled_seconds = untiled_seconds or seconds
+        print(
+            f"{tiles:3} tiles {seconds * 1e3:8.1f} ms"
+            f"  speedup {untiled_seconds / seconds:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Per-call latency of the Linux window controller backends.
+
+Times the queries Game makes for every grabbed frame with the xdotool
+subprocess backend and the persistent Xlib connection backend. Needs a
+running X server (e.g. Xvfb) with a visible window of the given name, and
+xdotool/xwininfo for the XDOTOOL backend.
+
+Usage: python benchmarks/bench_window_controllers.py "window name" [calls]
+"""
+
+import sys
+import timeit
+
+from game_control.window_controller import WindowController, WindowControllers
+
+
+def main(window_name, calls=50):
+    for backend in [WindowControllers.XDOTOOL, WindowControllers.XLIB]:
+        window_controller = WindowController(backend=backend)
+        window_id = window_controller.locate_window(window_name)
+        queries = {
+            "locate_window": lambda: window_controller.locate_window(window_name),
+            "is_window_focused": lambda: window_controller.is_window_focused(window_id),
+            "get_window_geometry": lambda: window_controller.get_window_geometry(
+                window_id
+            ),
+            "get_focused_window_name": window_controller.get_focused_window_name,
+        }
+        for name, query in queries.items():
+            seconds = min(timeit.repeat(query, number=calls, repeat=3)) / calls
+            print(f"{backend.name:<8} {name:<24} {seconds * 1e3:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], *map(int, sys.argv[2:3]))
@@ -0,0 +1,175 @@
+import cv2
+import numpy as np
+
+from game_control.utilities import convert_to_grayscale
+
+# Number of set bits of every byte value.
+_POPCOUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(
+    axis=1, dtype=np.int32
+)
+# Template blocks per axis whose bit counts bound the mismatches of a window.
+_BOUND_BLOCKS = 4
+# Candidate windows compared per batch, to bound memory use.
+_BATCH_SIZE = 4096
+
+
+def binarize_color_key(image, color, tolerance=0):
+    """Pixels that have a color.
+
+    Args:
+        image (ndarray): BGR or BGRA uint8 image.
+        color (tuple): BGR color.
+        tolerance (int): maximum difference per channel.
+
+    Returns:
+        ndarray: bool array with the height and width of the image.
+    """
+    lower = [max(c - tolerance, 0) for c in color] + [0] * (image.shape[2] - 3)
+    upper = [min(c + tolerance, 255) for c in color] + [255] * (image.shape[2] - 3)
+    return cv2.inRange(image, np.array(lower), np.array(upper)) > 0
+
+
+def binarize_edges(image, low_threshold=100, high_threshold=200):
+    """Pixels on edges, as found by the Canny edge detector.
+
+    Args:
+        image (ndarray): grayscale, BGR or BGRA uint8 image.
+        low_threshold (int): gradient below which a pixel is not on an edge.
+        high_threshold (int): gradient above which a pixel is on an edge.
+
+    Returns:
+        ndarray: bool array with the height and width of the image.
+    """
+    if image.ndim == 3:
+        image = convert_to_grayscale(image)
+    return cv2.Canny(image, low_threshold, high_threshold) > 0
+
+
+class BinaryTemplate:
+    """Binarized template packed in bits, to match with BinaryImage."""
+
+    def __init__(self, bits):
+        """Construct template.
+
+        Args:
+            bits (ndarray): 2D bool array.
+        """
+        self.shape = bits.shape
+        self.packed = np.packbits(bits, axis=1)
+        self.byte_mask = np.packbits(np.ones(bits.shape[1], dtype=bool))
+        self.block_edges = [
+            np.linspace(0, size, min(size, _BOUND_BLOCKS) + 1).astype(int)
+            for size in bits.shape
+        ]
+        integral = cv2.integral(bits.astype(np.uint8))
+        self.bit_count = int(integral[-1, -1])
+        self.block_counts = [
+            [
+                _window_sums(integral[y0 : y1 + 1, x0 : x1 + 1], y1 - y0, x1 - x0)[0, 0]
+                for x0, x1 in zip(self.block_edges[1][:-1], self.block_edges[1][1:])
+            ]
+            for y0, y1 in zip(self.block_edges[0][:-1], self.block_edges[0][1:])
+        ]
+
+
+class BinaryImage:
+    """Binarized image to match binarized templates in by XOR and popcount.
+
+    Rows are packed in bytes once for each of the 8 bit offsets, so the bits
+    of every window are whole bytes of one of them. The number of differing
+    bits of a window is the popcount of the XOR of those bytes with the
+    packed template. Before that, a window is rejected when its count of set
+    bits, and then the counts of blocks of it, differ from those of the
+    template by more than the allowed number of mismatches. An integral image
+    gives these counts in constant time per window.
+    """
+
+    def __init__(self, bits):
+        """Construct image.
+
+        Args:
+            bits (ndarray): 2D bool array.
+        """
+        self.shape = bits.shape
+        self._integral = cv2.integral(bits.astype(np.uint8))
+        byte_count = -(-bits.shape[1] // 8)
+        self._packed = np.zeros((8, bits.shape[0], byte_count + 1), dtype=np.uint8)
+        for offset in range(8):
+            packed = np.packbits(bits[:, offset:], axis=1)
+            self._packed[offset, :, : packed.shape[1]] = packed
+
+    def match(self, template, match_threshold):
+        """Best window by the fraction of bits equal to those of the template.
+
+        Args:
+            template (BinaryTemplate): the template to match.
+            match_threshold (float): minimum fraction of equal bits.
+
+        Returns:
+            tuple: fraction of equal bits and (x, y) of the best window, the
+                first in row-major order of equally good ones; None when no
+                window reaches match_threshold.
+        """
+        height, width = template.shape
+        result_shape = (self.shape[0] - height + 1, self.shape[1] - width + 1)
+        if result_shape[0] <= 0 or result_shape[1] <= 0:
+            return None
+        # Whole bits, tolerating rounding errors of the fraction.
+        allowed_mismatches = int(
+            np.floor((1 - match_threshold) * height * width + 1e-9)
+        )
+        if allowed_mismatches < 0:
+            return None
+
+        # The bit count of the whole window bounds the mismatches, then the
+        # bit counts of blocks of the windows that remain do.
+        counts = _window_sums(self._integral, height, width)
+        candidate_ys, candidate_xs = np.nonzero(
+            np.abs(counts - template.bit_count) <= allowed_mismatches
+        )
+        bounds = np.zeros(len(candidate_ys), dtype=np.int32)
+        ys, xs = template.block_edges
+        for i, (y0, y1) in enumerate(zip(ys[:-1], ys[1:])):
+            for j, (x0, x1) in enumerate(zip(xs[:-1], xs[1:])):
+                top, bottom = candidate_ys + y0, candidate_ys + y1
+                left, right = candidate_xs + x0, candidate_xs + x1
+                counts = (
+                    self._integral[bottom, right]
+                    - self._integral[top, right]
+                    - self._integral[bottom, left]
+                    + self._integral[top, left]
+                )
+                bounds += np.abs(counts - template.block_counts[i][j])
+        candidates = bounds <= allowed_mismatches
+        candidate_ys, candidate_xs = candidate_ys[candidates], candidate_xs[candidates]
+        if len(candidate_ys) == 0:
+            return None
+
+        mismatches = np.empty(len(candidate_ys), dtype=np.int32)
+        rows = np.arange(height)[:, np.newaxis]
+        columns = np.arange(template.packed.shape[1])
+        for start in range(0, len(candidate_ys), _BATCH_SIZE):
+            batch = slice(start, start + _BATCH_SIZE)
+            batch_ys, batch_xs = candidate_ys[batch], candidate_xs[batch]
+            windows = self._packed[
+                (batch_xs % 8)[:, np.newaxis, np.newaxis],
+                batch_ys[:, np.newaxis, np.newaxis] + rows,
+                (batch_xs // 8)[:, np.newaxis, np.newaxis] + columns,
+            ]
+            differences = (windows & template.byte_mask) ^ template.packed
+            mismatches[batch] = _POPCOUNTS[differences].sum(axis=(1, 2))
+
+        best = np.argmin(mismatches)
+        if mismatches[best] > allowed_mismatches:
+            return None
+        score = 1 - mismatches[best] / (height * width)
+        return float(score), (int(candidate_xs[best]), int(candidate_ys[best]))
+
+
+def _window_sums(integral, height, width):
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    ).astype(np.int32)
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+def pack_colors(pixels):
+    """Pack the channels of pixels into one integer per pixel.
+
+    The first channel ends up in the most significant byte, so packed
+    colors sort in the same order as the rows of channel values.
+
+    Args:
+        pixels (ndarray): uint8 array with 1 to 4 channels in the last axis.
+
+    Returns:
+        ndarray: uint32 array with the shape of pixels without last axis.
+    """
+    channels = pixels.shape[-1]
+    packed = pixels[..., 0].astype(np.uint32)
+    for c in range(1, channels):
+        packed <<= 8
+        packed |= pixels[..., c]
+    return packed
+
+
+class ColorIndex:
+    """Index to look up where colors are in an image.
+
+    The image is packed once into one integer per pixel. Positions of a color
+    are looked up on first request and cached, so every query after the first
+    for the same color is free. Looking up many colors at once takes a single
+    pass over the image.
+
+    Colors are given as BGR tuples. For images with 4 channels only pixels
+    with alpha 255 are found, like Sprite.locate_color does.
+    """
+
+    def __init__(self, image):
+        self._image = image
+        self._width = image.shape[1]
+        self._channels = image.shape[2]
+        self._packed = pack_colors(image).ravel()
+        self._positions = dict()
+
+    @property
+    def image(self):
+        """ndarray: the indexed image."""
+        return self._image
+
+    def locate_color(self, color):
+        """Positions of pixels with the given color.
+
+        Args:
+            color (tuple): BGR color.
+
+        Returns:
+            tuple: ys and xs ndarrays in row-major order.
+        """
+        return self.locate_colors([color])[0]
+
+    def locate_colors(self, colors):
+        """Positions of pixels for each of the given colors.
+
+        Args:
+            colors (list): BGR colors.
+
+        Returns:
+            list: per color a tuple of ys and xs ndarrays in row-major order.
+        """
+        keys = [self._key(color) for color in colors]
+        missing = np.unique([key for key in keys if key not in self._positions])
+
+        if len(missing) == 1:
+            indices = np.flatnonzero(self._packed == missing[0])
+            self._positions[missing[0]] = divmod(indices, self._width)
+        elif len(missing) > 1:
+            indices = np.flatnonzero(np.isin(self._packed, missing))
+            values = self._packed[indices]
+            order = np.argsort(values, kind="stable")
+            starts = np.searchsorted(values, missing, side="left", sorter=order)
+            ends = np.searchsorted(values, missing, side="right", sorter=order)
+            for key, start, end in zip(missing, starts, ends):
+                self._positions[key] = divmod(indices[order[start:end]], self._width)
+
+        return [self._positions[key] for key in keys]
+
+    def _key(self, color):
+        color = tuple(color)[:3]
+        if self._channels == 4:
+            color += (255,)
+        return int(pack_colors(np.array(color, dtype=np.uint8)))
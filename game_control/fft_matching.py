@@ -0,0 +1,151 @@
+import sys
+
+import cv2
+import numpy as np
+
+_FLT_EPSILON = np.finfo(np.float32).eps
+_DBL_EPSILON = sys.float_info.epsilon
+
+
+def _split_channels(image):
+    if image.ndim == 2:
+        return [image]
+    return [image[..., c] for c in range(image.shape[2])]
+
+
+def compute_spectra(image, fft_shape):
+    """Fourier transforms of the channels of image, zero padded to fft_shape.
+
+    Args:
+        image (ndarray): image with or without channel axis.
+        fft_shape (tuple): height and width of the transforms.
+
+    Returns:
+        list: per channel a float64 ndarray in OpenCV's packed (CCS) format.
+    """
+    spectra = []
+    for channel in _split_channels(image):
+        padded = np.zeros(fft_shape, dtype=np.float64)
+        padded[: channel.shape[0], : channel.shape[1]] = channel
+        spectra.append(cv2.dft(padded))
+    return spectra
+
+
+class ImageSpectrum:
+    """Fourier transform and integral images of an image to match templates.
+
+    Template matching by correlation in the frequency domain: the transform
+    of the image is computed once, after which every template costs one
+    multiplication per channel and one inverse transform, no matter its
+    size. Window sums needed by the normalized and TM_CCOEFF methods come
+    from integral images. Results equal those of cv2.matchTemplate up to
+    floating point rounding.
+    """
+
+    def __init__(self, image):
+        """Construct spectrum.
+
+        Args:
+            image (ndarray): uint8 image with or without channel axis.
+        """
+        self.image_shape = image.shape[:2]
+        self.fft_shape = (
+            cv2.getOptimalDFTSize(image.shape[0]),
+            cv2.getOptimalDFTSize(image.shape[1]),
+        )
+        self._spectra = compute_spectra(image, self.fft_shape)
+
+        sums, squared_sums = cv2.integral2(image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        channels = len(self._spectra)
+        self._sums = sums.reshape(sums.shape[:2] + (channels,))
+        self._squared_sums = squared_sums.reshape(squared_sums.shape[:2] + (channels,))
+        self._window_sums = dict()
+
+    def match_template(self, template, template_spectra, match_method):
+        """Match template like cv2.matchTemplate(image, template, match_method).
+
+        Args:
+            template (ndarray): template with the channels of the image.
+            template_spectra (list): compute_spectra(template, fft_shape).
+            match_method (int): cv2 template match method.
+
+        Returns:
+            ndarray: float32 match result.
+        """
+        height, width = template.shape[:2]
+        correlation = None
+        for spectrum, template_spectrum in zip(self._spectra, template_spectra):
+            product = cv2.mulSpectrums(spectrum, template_spectrum, 0, conjB=True)
+            correlation = product if correlation is None else correlation + product
+        correlation = cv2.idft(correlation, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+        result = correlation[
+            : self.image_shape[0] - height + 1, : self.image_shape[1] - width + 1
+        ]
+
+        if match_method == cv2.TM_CCORR:
+            return result.astype(np.float32)
+
+        template = template.reshape(height, width, -1).astype(np.float64)
+        template_means = template.mean(axis=(0, 1))
+        template_squared_sum = np.sum(template * template)
+        window_sums, window_squared_sums = self._get_window_sums(height, width)
+
+        if match_method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+            numerator = np.maximum(
+                window_squared_sums - 2 * result + template_squared_sum, 0
+            )
+        else:
+            numerator = result
+        if match_method in (cv2.TM_CCOEFF, cv2.TM_CCOEFF_NORMED):
+            numerator = numerator - window_sums @ template_means
+
+        if match_method in (cv2.TM_SQDIFF, cv2.TM_CCOEFF):
+            return numerator.astype(np.float32)
+
+        # Normalize like OpenCV does, including its handling of flat windows.
+        window_mean_squares = 0
+        if match_method == cv2.TM_CCOEFF_NORMED:
+            template_norm = np.sqrt(np.sum((template - template_means) ** 2))
+            if template_norm < _DBL_EPSILON:
+                return np.ones(numerator.shape, dtype=np.float32)
+            window_mean_squares = np.sum(window_sums**2, axis=2) / (height * width)
+        else:
+            template_norm = np.sqrt(template_squared_sum)
+
+        window_variances = np.maximum(window_squared_sums - window_mean_squares, 0)
+        denominator = np.sqrt(window_variances) * template_norm
+        denominator[
+            window_variances <= np.minimum(0.5, 10 * _FLT_EPSILON * window_squared_sums)
+        ] = 0
+
+        absolute_numerator = np.abs(numerator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = np.where(
+                absolute_numerator < denominator,
+                numerator / denominator,
+                np.where(
+                    absolute_numerator < denominator * 1.125,
+                    np.where(numerator > 0, 1.0, -1.0),
+                    1.0 if match_method == cv2.TM_SQDIFF_NORMED else 0.0,
+                ),
+            )
+        return normalized.astype(np.float32)
+
+    def _get_window_sums(self, height, width):
+        """Sums per channel and total sum of squares of all windows of a size."""
+        key = (height, width)
+        if key not in self._window_sums:
+            self._window_sums[key] = (
+                _window_sums(self._sums, height, width),
+                _window_sums(self._squared_sums, height, width).sum(axis=2),
+            )
+        return self._window_sums[key]
+
+
+def _window_sums(integral, height, width):
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    )
@@ -1,3 +1,10 @@
+import numpy as np
+
+from game_control.color_index import ColorIndex
+from game_control.fft_matching import ImageSpectrum
+from game_control.utilities import convert_to_grayscale, extract_roi_from_image
+
+
 class Frame:
     """Frame of a game.
 
@@ -5,13 +12,67 @@ class Frame:
 
     """
 
-    def __init__(self, img, timestamp=None):
+    def __init__(self, img, timestamp=None, frame_id=None):
         """Construct frame and fill with given arguments.
 
         Args:
             img (np.ndarray): array with pixel values.
             timestamp (datetime): date and time of creation.
+            frame_id (int): sequence number given by the FrameBuffer.
 
         """
         self.img = img
         self.timestamp = timestamp
+        self.frame_id = frame_id
+        self._color_index = None
+        self._spectra = dict()
+        self._spectra_img = None
+
+    def clear_caches(self):
+        """Release the color index and spectra of img; rebuilt on next use.
+
+        FrameBuffer calls this once a newer frame is added, so only its
+        newest frame holds these caches, and when the slot of the frame is
+        reused, after which they would describe pixels that are gone.
+        """
+        self._color_index = None
+        self._spectra = dict()
+        self._spectra_img = None
+
+    @property
+    def color_index(self):
+        """ColorIndex: index of the colors in img, built on first use.
+
+        Shared by all Sprite.locate and Sprite.locate_color calls on this
+        frame. Rebuilt when img is replaced.
+        """
+        if self._color_index is None or self._color_index.image is not self.img:
+            self._color_index = ColorIndex(self.img)
+        return self._color_index
+
+    def spectrum(self, region=None, grayscale=False):
+        """ImageSpectrum of (a region of) img, computed once per region.
+
+        Shared by all Sprite locates with the FFT match engine on this frame.
+        Recomputed when img is replaced.
+
+        Args:
+            region (tuple): region of img; None for all of img.
+            grayscale (bool): whether to convert img to grayscale first.
+
+        Returns:
+            ImageSpectrum: the spectrum.
+        """
+        if self._spectra_img is not self.img:
+            self._spectra = dict()
+            self._spectra_img = self.img
+
+        key = (tuple(region) if region else None, grayscale)
+        if key not in self._spectra:
+            img = self.img
+            if region:
+                img = extract_roi_from_image(img, region)
+            if grayscale and img.ndim == 3:
+                img = convert_to_grayscale(img)
+            self._spectra[key] = ImageSpectrum(np.ascontiguousarray(img))
+        return self._spectra[key]
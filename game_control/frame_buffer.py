@@ -1,22 +1,159 @@
-import collections
+import numpy as np
 
 
 class FrameBuffer:
+    """Ring buffer with the most recent frames.
+
+    Pixel data of all frames lives in one preallocated array that is reused,
+    so adding a frame copies its pixels in place instead of allocating.
+    The img of an added frame becomes a view into that array, which stays
+    valid until maxlen more frames have been added.
+
+    Every slot has a mirror at i + maxlen, so the last n images are always
+    available as one contiguous view for frame stacking. Mirrors are only
+    filled by last_images(), so adding a frame writes each pixel once.
+
+    Only the newest frame keeps the caches of Frame, such as its spectra,
+    which take many times the memory of its pixels; those of older frames
+    are cleared and rebuilt when used again.
+
+    """
 
     def __init__(self, maxlen=5):
-        self._frames = collections.deque(maxlen=maxlen)
+        self._maxlen = maxlen
+        self._images = None
+        self._timestamps = np.full(maxlen, np.nan, dtype=np.float64)
+        self._frame_ids = np.full(maxlen, -1, dtype=np.int64)
+        self._frames = [None] * maxlen
+        self._mirrored = np.zeros(maxlen, dtype=bool)
+        self._reserved_image = None
+        self._count = 0
+        self._frame_count = 0
+
+    @property
+    def maxlen(self):
+        return self._maxlen
 
     @property
     def frames(self):
-        return self._frames
+        """list: frames in the buffer, ordered from oldest to newest."""
+        return [self._frames[i] for i in self._indices(len(self))]
 
     @property
     def is_full(self):
-        return len(self.frames) == self.frames.maxlen
+        return len(self) == self.maxlen
 
     @property
     def last_frame(self):
-        return self.frames[-1] if len(self.frames) > 0 else None
+        return self._frames[self._indices(1)[0]] if len(self) > 0 else None
+
+    @property
+    def timestamps(self):
+        """ndarray: POSIX timestamps of the frames (NaN when unknown), oldest first."""
+        return self._timestamps[self._indices(len(self))]
+
+    @property
+    def frame_ids(self):
+        """ndarray: ids of the frames in order of adding, oldest first."""
+        return self._frame_ids[self._indices(len(self))]
+
+    def __len__(self):
+        return min(self._count, self.maxlen)
+
+    def next_image(self, shape, dtype=np.uint8):
+        """Reserve the slot the next added frame will be stored in.
+
+        Lets a producer write pixels directly into the buffer: a frame whose
+        img is the returned array is added by add_frame() without copying.
+
+        Args:
+            shape (tuple): shape of the image.
+            dtype (np.dtype): data type of the image.
+
+        Returns:
+            ndarray: writable, C-contiguous view of the next slot.
+        """
+        self._ensure_allocated(tuple(shape), np.dtype(dtype))
+        self._reserved_image = self._images[self._count % self.maxlen]
+        return self._reserved_image
 
     def add_frame(self, frame):
-        self.frames.append(frame)
+        """Copy the image of the frame into the buffer.
+
+        The buffer is reallocated (and emptied) when the shape or dtype of
+        the image differs from the images already in the buffer.
+
+        Args:
+            frame (Frame): frame to add; its img is replaced by a view into
+                the buffer and it gets a frame_id.
+
+        Returns:
+            Frame: the given frame.
+        """
+        img = frame.img
+        if img is self._reserved_image:
+            slot = img
+        else:
+            self._ensure_allocated(img.shape, img.dtype)
+            slot = self._images[self._count % self.maxlen]
+            slot[...] = img
+        self._reserved_image = None
+
+        i = self._count % self.maxlen
+        if len(self) > 0:
+            self.last_frame.clear_caches()
+        if self._frames[i] is not None:
+            self._frames[i].clear_caches()
+        frame.img = slot
+        frame.frame_id = self._frame_count
+        self._frames[i] = frame
+        self._mirrored[i] = False
+        self._timestamps[i] = (
+            np.nan if frame.timestamp is None else frame.timestamp.timestamp()
+        )
+        self._frame_ids[i] = self._frame_count
+        self._count += 1
+        self._frame_count += 1
+
+        return frame
+
+    def last_images(self, n):
+        """Contiguous view of the images of the last n frames.
+
+        Only slots of which the mirror is outdated are copied, at most once
+        per added frame.
+
+        Args:
+            n (int): number of frames; at most the number of frames in buffer.
+
+        Returns:
+            ndarray: images stacked along a new first axis, oldest first.
+        """
+        if not 0 < n <= len(self):
+            raise ValueError(f"n needs to be between 1 and {len(self)}...")
+
+        end = (self._count - 1) % self.maxlen + self.maxlen + 1
+        start = end - n
+        for i in range(max(start - self.maxlen, 0), end - self.maxlen):
+            if not self._mirrored[i]:
+                self._images[i + self.maxlen] = self._images[i]
+                self._mirrored[i] = True
+        return self._images[start:end]
+
+    def _indices(self, n):
+        return [(self._count - n + k) % self.maxlen for k in range(n)]
+
+    def _ensure_allocated(self, shape, dtype):
+        if (
+            self._images is not None
+            and self._images.shape[1:] == shape
+            and self._images.dtype == dtype
+        ):
+            return
+
+        self._images = np.empty((2 * self.maxlen,) + shape, dtype=dtype)
+        self._frames = [None] * self.maxlen
+        self._mirrored[:] = False
+        self._timestamps[:] = np.nan
+        self._frame_ids[:] = -1
+        self._count = 0
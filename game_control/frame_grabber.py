@@ -1,24 +1,117 @@
+import collections
+import enum
+import threading
 from datetime import datetime
 
+import cv2
 import mss
 import numpy as np
 
 from game_control.frame import Frame
 from game_control.frame_buffer import FrameBuffer
+from game_control.limiter import Limiter
+
+
+class ColorModes(enum.Enum):
+    """Pixel format of grabbed frames."""
+
+    BGR = 1  # 3 channel uint8 BGR.
+    GRAYSCALE = 2  # 1 channel uint8, without channel axis.
+
+
+class DropPolicies(enum.Enum):
+    """What to do with captured frames when the consumer falls behind."""
+
+    DROP_OLDEST = 1  # Keep capturing; discard the oldest unconsumed frame.
+    DROP_NEWEST = 2  # Skip capturing until the consumer catches up.
+
+
+class FrameGrabberError(BaseException):
+    pass
 
 
 class FrameGrabber:
-    """Frame grabber to make screenshots of a game."""
+    """Frame grabber to make screenshots of a game.
+
+    Frames can be grabbed on request with grab_frame(), or continuously in a
+    background thread after calling start_capturing(), but not both at the
+    same time. In the latter case consumers fetch captured frames with
+    latest_frame() or next_frame() without waiting for the screenshot itself.
 
-    def __init__(self, fps=2, buffer_seconds=2):
-        maxlen = buffer_seconds * fps
+    Screenshots are converted straight from the raw BGRA buffer of mss into
+    the next slot of the frame buffer, so every grabbed pixel is written
+    once. Frames from grab_frame() are views into the frame buffer, which
+    are overwritten once the buffer wraps around; copy frame.img to keep it
+    longer. Frames from latest_frame() and next_frame() are copies, taken
+    while the capture thread cannot write, so they stay valid however long
+    the consumer takes.
+
+    """
+
+    def __init__(self, fps=2, buffer_seconds=2, color_mode=ColorModes.BGR, scale=1):
+        """Construct frame grabber.
+
+        Args:
+            fps (number): frames per second when capturing in the background.
+            buffer_seconds (number): seconds of frames kept in frame buffer.
+            color_mode (ColorModes): pixel format of grabbed frames.
+            scale (number): factor to resize grabbed frames with.
+        """
+        maxlen = max(1, int(buffer_seconds * fps))
+        self._fps = fps
+        self._color_mode = color_mode
+        self._scale = scale
+        self._scaled_image = None
         self._frame_buffer = FrameBuffer(maxlen=maxlen)
         self._screen_grabber = mss.mss()
 
+        self._condition = threading.Condition()
+        self._capture_thread = None
+        self._capture_region = None
+        self._stop_capturing = threading.Event()
+        self._drop_policy = DropPolicies.DROP_OLDEST
+        self._unconsumed_frames = collections.deque()
+
+        self._frames_captured = 0
+        self._frames_consumed = 0
+        self._frames_dropped = 0
+
     @property
     def frame_buffer(self):
         return self._frame_buffer
 
+    @property
+    def is_capturing(self):
+        """bool: True when frames are captured in a background thread."""
+        return self._capture_thread is not None
+
+    @property
+    def capture_region(self):
+        """dict: region of screen captured by the background thread.
+
+        Can be updated while capturing, e.g. after the game window moved.
+        """
+        return self._capture_region
+
+    @capture_region.setter
+    def capture_region(self, region):
+        self._capture_region = region
+
+    @property
+    def frames_captured(self):
+        """int: number of frames captured by the background thread."""
+        return self._frames_captured
+
+    @property
+    def frames_consumed(self):
+        """int: number of captured frames fetched by a consumer."""
+        return self._frames_consumed
+
+    @property
+    def frames_dropped(self):
+        """int: number of frames dropped according to the drop policy."""
+        return self._frames_dropped
+
     def grab_frame(self, region):
         """Make screenshot of given subregion of the screen.
 
@@ -32,13 +125,181 @@ class FrameGrabber:
                 }
         Returns:
             Frame: containing ndarray with 3 dimensions
-                (2D grid with 3 channel uint8 BGR info per pixel)
+                (2D grid with 3 channel uint8 BGR info per pixel;
+                or 2 dimensions for ColorModes.GRAYSCALE)
                 and current datetime of capture
 
+        Raises:
+            FrameGrabberError: when capturing in the background, because the
+                frame would take the buffer slot of a frame not consumed yet.
         """
-        frame = np.array(self._screen_grabber.grab(region))
+        if self.is_capturing:
+            raise FrameGrabberError("FrameGrabber is capturing, use latest_frame()...")
+        return self._grab(self._screen_grabber, region)
+
+    def start_capturing(self, region, drop_policy=DropPolicies.DROP_OLDEST):
+        """Start grabbing frames continuously in a background thread.
+
+        Frames are grabbed at the fps of this frame grabber and added to its
+        frame buffer. At most frame_buffer.maxlen captured frames are kept
+        for consumption by next_frame(); drop_policy decides what happens
+        when more frames are captured than consumed.
+
+        Args:
+            region (dict): region of screen to capture (see grab_frame()).
+            drop_policy (DropPolicies): policy when the consumer falls behind.
+
+        Raises:
+            FrameGrabberError: when already capturing.
+        """
+        if self.is_capturing:
+            raise FrameGrabberError("FrameGrabber is already capturing...")
+
+        self._capture_region = region
+        self._drop_policy = drop_policy
+        self._unconsumed_frames.clear()
+        # Every thread gets its own event, so a thread that did not finish
+        # within the timeout of stop_capturing() stays stopped.
+        self._stop_capturing = threading.Event()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(self._stop_capturing,),
+            name="FrameGrabber",
+            daemon=True,
+        )
+        self._capture_thread.start()
+
+    def stop_capturing(self, timeout=None):
+        """Stop the background thread started by start_capturing().
+
+        Args:
+            timeout (number/None): seconds to wait for the thread to finish.
+        """
+        if not self.is_capturing:
+            return
+
+        self._stop_capturing.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._capture_thread.join(timeout)
+        self._capture_thread = None
+
+    def latest_frame(self):
+        """Fetch the most recently captured frame without waiting.
+
+        Older captured frames that were not consumed yet are skipped.
+
+        Returns:
+            Frame/None: copy of the newest frame; None when nothing was
+                captured yet.
+        """
+        with self._condition:
+            if self._unconsumed_frames:
+                self._frames_consumed += 1
+                self._frames_dropped += len(self._unconsumed_frames) - 1
+                self._unconsumed_frames.clear()
+            return _copy_frame(self.frame_buffer.last_frame)
+
+    def next_frame(self, timeout=None):
+        """Fetch the oldest captured frame that was not consumed yet.
+
+        Blocks until a frame is captured when there is none to consume.
+
+        Args:
+            timeout (number/None): maximum number of seconds to wait.
+
+        Returns:
+            Frame/None: copy of the captured frame; None when timed out or
+                stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._unconsumed_frames or self._stop_capturing.is_set(),
+                timeout,
+            )
+            if not self._unconsumed_frames:
+                return None
+            self._frames_consumed += 1
+            return _copy_frame(self._unconsumed_frames.popleft())
+
+    def _capture_loop(self, stop_capturing):
+        """Grab frames until stop_capturing is set by stop_capturing().
+
+        Uses its own screen grabber, because mss instances cannot be
+        shared between threads on every platform.
+        """
+        limiter = Limiter(fps=self._fps)
+        with mss.mss() as screen_grabber:
+            while not stop_capturing.is_set():
+                limiter.start()
+                self._capture_frame(screen_grabber)
+                limiter.stop_and_delay()
+
+    def _capture_frame(self, screen_grabber):
+        """Capture one frame for consumers, according to the drop policy.
+
+        The slot the frame is stored in holds the oldest unconsumed frame
+        when maxlen frames are waiting, so that frame is dropped in the same
+        critical section; consumers never see its frame_id with new pixels.
+        """
+        maxlen = self.frame_buffer.maxlen
+        with self._condition:
+            if (
+                self._drop_policy == DropPolicies.DROP_NEWEST
+                and len(self._unconsumed_frames) >= maxlen
+            ):
+                self._frames_dropped += 1
+                return
+
+        bgra, timestamp = self._screenshot(screen_grabber, self._capture_region)
+        with self._condition:
+            if len(self._unconsumed_frames) >= maxlen:
+                self._unconsumed_frames.popleft()
+                self._frames_dropped += 1
+            frame = self._store_frame(bgra, timestamp)
+            self._frames_captured += 1
+            self._unconsumed_frames.append(frame)
+            self._condition.notify_all()
+
+    def _grab(self, screen_grabber, region):
+        """Grab a screenshot and convert it into the next frame buffer slot."""
+        bgra, timestamp = self._screenshot(screen_grabber, region)
+        with self._condition:
+            return self._store_frame(bgra, timestamp)
+
+    def _screenshot(self, screen_grabber, region):
+        """Grab a screenshot as a BGRA view of the raw buffer of mss."""
+        screenshot = screen_grabber.grab(region)
+        bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4
+        )
+        return bgra, datetime.now()
+
+    def _store_frame(self, bgra, timestamp):
+        """Convert a screenshot into the next frame buffer slot; hold the lock."""
+        if self._scale != 1:
+            size = (
+                max(1, round(bgra.shape[1] * self._scale)),
+                max(1, round(bgra.shape[0] * self._scale)),
+            )
+            if self._scaled_image is None or self._scaled_image.shape[1::-1] != size:
+                self._scaled_image = np.empty((size[1], size[0], 4), dtype=np.uint8)
+            bgra = cv2.resize(
+                bgra, size, dst=self._scaled_image, interpolation=cv2.INTER_AREA
+            )
+
+        if self._color_mode == ColorModes.GRAYSCALE:
+            img = self.frame_buffer.next_image(bgra.shape[:2])
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=img)
+        else:
+            img = self.frame_buffer.next_image(bgra.shape[:2] + (3,))
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=img)
+
+        return self.frame_buffer.add_frame(Frame(img, timestamp=timestamp))
 
-        frame = Frame(frame[..., :3], timestamp=datetime.now())
-        self.frame_buffer.add_frame(frame)
 
-        return frame
+def _copy_frame(frame):
+    """Frame with a copy of the pixels, which the frame buffer cannot overwrite."""
+    if frame is None:
+        return None
+    return Frame(frame.img.copy(), timestamp=frame.timestamp, frame_id=frame.frame_id)
@@ -9,6 +9,7 @@ import numpy as np
 from game_control.frame_grabber import FrameGrabber
 from game_control.input_controller import InputController
 from game_control.limiter import Limiter
+from game_control.region_gate import RegionGate
 from game_control.sprite import Sprite
 from game_control.window_controller import WindowController
 
@@ -46,6 +47,8 @@ class Game(ABC):
         height=540,
         window_name=None,
         wait_for_focus=5,
+        window_cache_ttl=1,
+        window_backend=None,
         **kwargs,
     ):
         """Constructs a game, starts it and initializes the window.
@@ -59,6 +62,12 @@ class Game(ABC):
                 fast initialization. Set to None to use the window with focus.
             wait_for_focus (int): Seconds to wait for game to start and get
                 focus when window_name is not given.
+            window_cache_ttl (number): Seconds to reuse the window geometry and
+                focus state for when grabbing frames. Use float("inf") to only
+                query them again after the window is moved/resized/focused
+                through the window controller or invalidate() is called on it.
+            window_backend (WindowControllers/None): Backend of the window
+                controller; None for the default of the platform.
             **kwargs: Extra args for implementation of abstract method start().
 
         """
@@ -69,8 +78,11 @@ class Game(ABC):
             "height": height,
         }
         self._frame_grabber = FrameGrabber()
-        self._window_controller = WindowController()
+        self._window_controller = WindowController(
+            backend=window_backend, cache_ttl=window_cache_ttl
+        )
         self._input_controller = InputController(game=self)
+        self._window_id = None
         self.start(**kwargs)
         self._set_window_name(window_name, wait_for_focus)
         self._set_window_id()
@@ -78,6 +90,7 @@ class Game(ABC):
 
         self._sprites = {}
         self._regions = {}
+        self._region_gate = RegionGate(self._regions)
 
     @abstractmethod
     def start(self):
@@ -97,25 +110,56 @@ class Game(ABC):
         """
         pass
 
+    @property
+    def frame_grabber(self):
+        """FrameGrabber: object to make screenshots of the game."""
+        return self._frame_grabber
+
+    @property
+    def window_controller(self):
+        """WindowController: object to position, resize, focus etc. the game window."""
+        return self._window_controller
+
     @property
     def input_controller(self):
         """InputController: object to send keyboard and mouse commands to the game."""
         return self._input_controller
 
+    def _get_process_id(self):
+        """Id of the process that owns the game window.
+
+        Can be overridden in derived classes that start the game process
+        themselves, so that the window can be found as soon as it appears.
+
+        Returns:
+            int/None: process id when known; None otherwise.
+        """
+        return None
+
     def _set_window_name(self, window_name, wait_for_focus):
         """Sets name of the window to given name
+        or uses the name of the window of the game process when its id is known
         or uses the name of the focused window when given name is None.
         POST: self._set_window_name is set.
 
         Args:
             window_name (string/None): name of window; None when needs to be fetched.
-            wait_for_focus (number): seconds to wait before name is fetched from focused window.
+            wait_for_focus (number): seconds to wait before name is fetched from focused window;
+                or maximum seconds to wait for a window of the game process.
         """
+        process_id = self._get_process_id()
         if window_name is not None:
             self._window_name = window_name
+        elif process_id is not None and self._set_window_id_by_process_id(
+            process_id, seconds_to_try=wait_for_focus
+        ):
+            self._window_name = self._window_controller.get_window_name(self._window_id)
         else:
-            print(f"Waiting {wait_for_focus} seconds for game to start and get focus")
-            time.sleep(wait_for_focus)
+            if process_id is None:
+                print(
+                    f"Waiting {wait_for_focus} seconds for game to start and get focus"
+                )
+                time.sleep(wait_for_focus)
             self._window_name = self._window_controller.get_focused_window_name()
 
     def _get_window_id(self):
@@ -129,29 +173,50 @@ class Game(ABC):
         window_id = self._window_controller.locate_window(self._window_name)
         return None if window_id in [0, "0"] else window_id
 
+    def _set_window_id_by_process_id(
+        self,
+        process_id,
+        seconds_to_try=15,
+        tries_per_second=20,
+    ):
+        """Tries to set the id of the window using the id of its process.
+        POST: self._window_id is set when found.
+
+        Returns:
+            bool: True when the window was found in time; False otherwise.
+        """
+        started_at = datetime.utcnow()
+        limiter = Limiter(fps=tries_per_second)
+        while (datetime.utcnow() - started_at).total_seconds() < seconds_to_try:
+            limiter.start()
+            window_id = self._window_controller.locate_window_by_process_id(process_id)
+            if window_id not in [0, "0"]:
+                self._window_id = window_id
+                return True
+            limiter.stop_and_delay()
+
+        return False
+
     def _set_window_id(
         self,
         seconds_to_try=15,
-        tries_per_second=1,
+        tries_per_second=10,
     ):
-        """Tries to set the id of the window.
+        """Tries to set the id of the window, unless it was set already.
         POST: self._window_id is set.
 
         Raises:
             RuntimeError: when window could not be found.
         """
-        self._window_id = None
         started_at = datetime.utcnow()
         limiter = Limiter(fps=tries_per_second)
-        while (datetime.utcnow() - started_at).total_seconds() < seconds_to_try:
+        while self._window_id is None:
+            if (datetime.utcnow() - started_at).total_seconds() >= seconds_to_try:
+                raise RuntimeError("Could not find window...")
             limiter.start()
             self._window_id = self._get_window_id()
-            if self._window_id:
-                break
-            limiter.stop_and_delay()
-
-        if self._window_id is None:
-            raise RuntimeError("Could not find window...")
+            if self._window_id is None:
+                limiter.stop_and_delay()
 
     def _initialize_window(self):
         """Tries to focus the game window and move/resize it to its intial position.
@@ -173,6 +238,11 @@ class Game(ABC):
     def regions(self):
         return self._regions
 
+    @property
+    def region_gate(self):
+        """RegionGate: locates sprites in regions only when they changed."""
+        return self._region_gate
+
     def is_launched(self):
         """bool: True when game was launched succesully; False otherwise."""
         return self._get_window_id() is not None
@@ -203,6 +273,7 @@ class Game(ABC):
         msg=None,
         seconds_to_try=15,
         tries_per_second=5,
+        tracker=None,
     ):
         """
         Waits for the sprite to appear within the defined (roi of) frame.
@@ -215,6 +286,8 @@ class Game(ABC):
             msg (string/None): print this message while waiting
             seconds_to_try (number): Number of seconds to wait for sprite to appear.
             tries_per_second (number): Number of times per second to try and locate the sprite.
+            tracker (SpriteTracker/None): Search near where the tracker saw the
+                sprite last first; None to search the (roi of) frame every time.
 
         Returns:
             bool: True when sprite appeared and was found in time;
@@ -235,7 +308,8 @@ class Game(ABC):
             if frame is not None:
                 if msg is not None:
                     print(msg)
-                location = Sprite.locate_template(
+                locate = Sprite.locate_template if tracker is None else tracker.locate
+                location = locate(
                     sprite, frame, region, use_global_location=use_global_location
                 )
                 if location is not None:
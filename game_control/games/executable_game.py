@@ -21,6 +21,10 @@ class ExecutableGame(Game):
         """Starts the game executable in a separate process."""
         self._process = subprocess.Popen(shlex.split(self._executable_filepath))
 
+    def _get_process_id(self):
+        """int: id of the game process, to find its window as soon as it appears."""
+        return self._process.pid
+
     def stop(self):
         """Stops the game by terminating the process."""
         self._process.terminate()
@@ -0,0 +1,172 @@
+import itertools
+
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=8):
+    """Difference hash of an image.
+
+    The image is shrunk to hash_size x (hash_size + 1) grayscale pixels and
+    every bit tells whether a pixel is brighter than its right neighbour, so
+    similar images get hashes that differ in few bits.
+
+    Args:
+        image (ndarray): BGR or BGRA uint8 image.
+        hash_size (int): number of bits per row and column of the hash.
+
+    Returns:
+        int: hash of hash_size * hash_size bits.
+    """
+    return dhashes(image[np.newaxis], hash_size)[0]
+
+
+def dhashes(images, hash_size=8):
+    """Difference hashes of images of the same shape, see dhash.
+
+    All images are converted to grayscale as one tall image and shrunk four
+    at a time as the channels of one image.
+
+    Args:
+        images (ndarray): BGR or BGRA uint8 images with shape (N, H, W, C), or
+            grayscale ones with shape (N, H, W).
+        hash_size (int): number of bits per row and column of the hashes.
+
+    Returns:
+        list: per image a hash of hash_size * hash_size bits.
+    """
+    count, height, width = images.shape[:3]
+    if images.ndim == 4:
+        tall = np.ascontiguousarray(images[..., :3]).reshape(-1, width, 3)
+        images = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(count, height, width)
+
+    groups = -(-count // 4)
+    channels = np.zeros((groups * 4, height, width), dtype=images.dtype)
+    channels[:count] = images
+    channels = channels.reshape(groups, 4, height, width).transpose(0, 2, 3, 1)
+    small = np.concatenate(
+        [
+            cv2.resize(
+                np.ascontiguousarray(group),
+                (hash_size + 1, hash_size),
+                interpolation=cv2.INTER_AREA,
+            )
+            for group in channels
+        ],
+        axis=2,
+    )[..., :count]
+    bits = small[:, 1:] > small[:, :-1]
+    return [
+        int.from_bytes(packed.tobytes(), "big")
+        for packed in np.packbits(bits.transpose(2, 0, 1).reshape(count, -1), axis=1)
+    ]
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of bits that differ between two hashes."""
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class MultiIndexHashes:
+    """Index to find the nearest hash by Hamming distance.
+
+    Hashes are split into chunks and every chunk has its own table. A hash
+    within distance d of the query has at least one chunk within distance
+    d // chunks of the query's chunk, so the nearest hash is found by looking
+    up the chunks that differ in 0, 1, 2, ... bits until no nearer hash can
+    be left. Near queries touch a few table entries instead of all hashes.
+    Falls back to comparing all hashes when that is cheaper.
+    """
+
+    def __init__(self, bits=64, chunks=4):
+        """Construct empty index.
+
+        Args:
+            bits (int): number of bits of the hashes.
+            chunks (int): number of chunks to split hashes into.
+        """
+        self._chunks = chunks
+        self._chunk_bits = -(-bits // chunks)
+        self._bits = bits
+        self._hashes = []
+        self._items = []
+        self._tables = [dict() for _ in range(chunks)]
+        self._flips = [[0]]
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, hash_value, item):
+        """Add an item with its hash.
+
+        Args:
+            hash_value (int): the hash.
+            item: anything orderable; of items with equally near hashes the
+                smallest is found.
+        """
+        index = len(self._hashes)
+        self._hashes.append(hash_value)
+        self._items.append(item)
+        for table, chunk in zip(self._tables, self._split(hash_value)):
+            table.setdefault(chunk, []).append(index)
+
+    def nearest(self, hash_value, max_distance=None):
+        """Item with the nearest hash.
+
+        Args:
+            hash_value (int): the query hash.
+            max_distance (int): only consider hashes within this distance.
+
+        Returns:
+            tuple: the item and its distance; (None, None) when none is found.
+        """
+        if max_distance is None:
+            max_distance = self._bits
+
+        candidates = set()
+        best = (max_distance, None)
+        for flipped_bits in range(self._chunk_bits + 1):
+            flips = self._get_flips(flipped_bits)
+            if len(flips) * self._chunks > len(self._hashes):
+                new_candidates = set(range(len(self._hashes))) - candidates
+            else:
+                new_candidates = set()
+                for table, chunk in zip(self._tables, self._split(hash_value)):
+                    for flip in flips:
+                        new_candidates.update(table.get(chunk ^ flip, ()))
+                new_candidates -= candidates
+
+            for index in new_candidates:
+                distance = hamming_distance(hash_value, self._hashes[index])
+                item = self._items[index]
+                if distance <= best[0] and (best[1] is None or (distance, item) < best):
+                    best = (distance, item)
+            candidates |= new_candidates
+
+            # All hashes with fewer than this many different bits are found.
+            found_distance = self._chunks * (flipped_bits + 1)
+            if len(candidates) == len(self._hashes) or found_distance > best[0]:
+                break
+
+        if best[1] is None:
+            return None, None
+        return best[1], best[0]
+
+    def _split(self, hash_value):
+        mask = (1 << self._chunk_bits) - 1
+        return [
+            (hash_value >> (i * self._chunk_bits)) & mask for i in range(self._chunks)
+        ]
+
+    def _get_flips(self, flipped_bits):
+        """Masks of all chunk values with flipped_bits bits set."""
+        while len(self._flips) <= flipped_bits:
+            self._flips.append(
+                [
+                    sum(1 << bit for bit in bits)
+                    for bits in itertools.combinations(
+                        range(self._chunk_bits), len(self._flips)
+                    )
+                ]
+            )
+        return self._flips[flipped_bits]
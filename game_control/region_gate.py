@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+
+from game_control.sprite import Sprite
+from game_control.utilities import extract_roi_from_image
+
+
+class RegionGate:
+    """Reuses the locations of sprites in regions that did not change.
+
+    Every region of a game gets a fingerprint: the region shrunk to at most
+    fingerprint_size x fingerprint_size cells of mean colors. A region
+    changed when a cell differs more than max_difference from the
+    fingerprint taken when its sprites were last located; only then are its
+    sprites located again. Comparing with that fingerprint instead of the one
+    of the previous frame keeps slow changes from slipping through.
+
+    """
+
+    def __init__(
+        self,
+        regions,
+        locate=Sprite.locate_template,
+        max_difference=2,
+        fingerprint_size=16,
+    ):
+        """Construct gate.
+
+        Args:
+            regions (dict): per region name a region tuple, e.g. Game.regions.
+            locate (callable): locate function with the arguments of
+                Sprite.locate_template, e.g. SpriteTracker.locate.
+            max_difference (number): Maximum difference of a color channel
+                of a fingerprint cell for a region to be unchanged.
+            fingerprint_size (int): Maximum number of fingerprint cells per
+                row and column.
+        """
+        self.regions = regions
+        self.max_difference = max_difference
+        self.fingerprint_size = fingerprint_size
+        self._locate = locate
+        self._fingerprints = dict()
+        self._locations = dict()
+        self._checked = set()
+        self._img = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self):
+        """int: number of locates answered with the location of an earlier frame."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """int: number of locates that searched the frame."""
+        return self._misses
+
+    def locate(
+        self,
+        sprite=None,
+        frame=None,
+        region_name=None,
+        use_global_location=True,
+        **kwargs
+    ):
+        """
+        Locates the sprite within a region, unless the region did not change.
+
+        Args:
+            sprite (Sprite): The sprite to find.
+            frame (Frame): The frame to search within.
+            region_name (str): Name of the region to search within.
+            use_global_location (bool): whether to return global location or
+                local to region.
+            **kwargs: Extra args for the locate function.
+
+        Returns:
+            Tuple of location of the sprite when found or None otherwise.
+        """
+        key = (
+            region_name,
+            sprite.name,
+            use_global_location,
+            tuple(sorted(kwargs.items())),
+        )
+        self._check_region(frame, region_name)
+        if key in self._locations:
+            self._hits += 1
+            return self._locations[key]
+
+        self._misses += 1
+        location = self._locate(
+            sprite, frame, self.regions[region_name], use_global_location, **kwargs
+        )
+        self._locations[key] = location
+        return location
+
+    def forget(self, region_name=None):
+        """Forget the locations in the given region; or in all regions when None."""
+        if region_name is None:
+            self._fingerprints.clear()
+            self._locations.clear()
+            self._checked.clear()
+        else:
+            self._fingerprints.pop(region_name, None)
+            self._checked.discard(region_name)
+            for key in [key for key in self._locations if key[0] == region_name]:
+                del self._locations[key]
+
+    def _check_region(self, frame, region_name):
+        """Forget the locations in the region when it changed, once per frame."""
+        if self._img is not frame.img:
+            self._img = frame.img
+            self._checked.clear()
+
+        if region_name not in self._checked:
+            region = tuple(self.regions[region_name])
+            fingerprint = self._fingerprint(frame.img, region)
+            reference_region, reference = self._fingerprints.get(
+                region_name, (None, None)
+            )
+            if (
+                reference_region != region
+                or np.max(np.abs(fingerprint - reference)) > self.max_difference
+            ):
+                self.forget(region_name)
+                self._fingerprints[region_name] = (region, fingerprint)
+            self._checked.add(region_name)
+
+    def _fingerprint(self, img, region):
+        img = extract_roi_from_image(img, region)
+        size = (
+            min(img.shape[1], self.fingerprint_size),
+            min(img.shape[0], self.fingerprint_size),
+        )
+        return cv2.resize(img, size, interpolation=cv2.INTER_AREA).astype(np.float32)
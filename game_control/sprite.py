@@ -1,11 +1,50 @@
+import enum
+import os
 import random
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
 import numpy as np
 
-from game_control.utilities import extract_roi_from_image
+from game_control.binary_matching import (
+    BinaryImage,
+    BinaryTemplate,
+    binarize_color_key,
+    binarize_edges,
+)
+from game_control.color_index import pack_colors
+from game_control.frame import Frame
+from game_control.sprite_cache import file_key, read_sprite_cache, write_sprite_cache
+from game_control.fft_matching import compute_spectra
+from game_control.utilities import convert_to_grayscale, extract_roi_from_image
+
+# Relative difference of match values below which windows tie; float32
+# rounding of cv2.matchTemplate differs by about 1e-6 per input size.
+_TIE_TOLERANCE = 1e-5
+# Tied windows matched again on their own to pick the best of them.
+_TIE_CANDIDATES = 16
+
+_thread_pool = None
+
+
+def _get_thread_pool():
+    """Thread pool shared by the batch locates; OpenCV releases the GIL while matching."""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _thread_pool
+
+
+class MatchEngines(enum.Enum):
+    OPENCV = 1
+    FFT = 2
+
+
+class Binarizations(enum.Enum):
+    COLOR_KEY = 1
+    EDGES = 2
 
 
 class SpriteError(BaseException):
@@ -24,6 +63,7 @@ class Sprite:
 
         self.name = name
         self.image_data = image_data
+        self._cache = dict()
         self.image_shape = image_data.shape[:2]
         self.image_count = image_data.shape[-1]
 
@@ -33,27 +73,76 @@ class Sprite:
             constellation_of_pixels or self._generate_constellation_of_pixels()
         )
 
-    def append_image_data(
-        self, image_data, signature_colors=None, constellation_of_pixels=None
+    @classmethod
+    def from_images(
+        cls, name, images, signature_colors=None, constellation_of_pixels=None
     ):
-        images = list()
+        """Construct a sprite with one animation state per image at once.
 
-        for i in range(self.image_data.shape[3]):
-            images.append((self.image_data[:, :, :, i])[:, :, :, np.newaxis])
+        Stacks the images a single time instead of growing the image data
+        with append_image_data per image.
+
+        Args:
+            name (str): name of the sprite.
+            images (list): 3D ndarrays of the same shape.
+            signature_colors (list): optional set of colors per image.
+            constellation_of_pixels (list): optional dict of pixels per image.
+
+        Returns:
+            Sprite: the sprite.
+        """
+        return cls(
+            name,
+            image_data=np.stack(images, axis=3),
+            signature_colors=signature_colors,
+            constellation_of_pixels=constellation_of_pixels,
+        )
 
-        images.append(image_data)
+    def append_image_data(
+        self, image_data, signature_colors=None, constellation_of_pixels=None
+    ):
+        """Append animation states.
 
-        self.image_data = np.squeeze(np.stack(images, axis=3))
+        Only the signature colors and constellations of pixels of the new
+        states are generated when not given.
 
-        if signature_colors is not None:
-            self.signature_colors.append(signature_colors)
-        else:
-            self.signature_colors = self._generate_signature_colors()
+        Args:
+            image_data (ndarray): 4D array with the states to append, or 3D
+                array with a single state.
+            signature_colors (set/list): set of colors of a single state, or
+                list of sets with one per state.
+            constellation_of_pixels (dict/list): dict of pixels of a single
+                state, or list of dicts with one per state.
+        """
+        if image_data.ndim == 3:
+            image_data = image_data[..., np.newaxis]
+        if isinstance(signature_colors, set):
+            signature_colors = [signature_colors]
+        if isinstance(constellation_of_pixels, dict):
+            constellation_of_pixels = [constellation_of_pixels]
+
+        first_new_state = self.image_count
+        self.image_data = np.concatenate((self.image_data, image_data), axis=3)
+        self.image_count = self.image_data.shape[-1]
+        new_states = range(first_new_state, self.image_count)
+
+        if signature_colors is None:
+            signature_colors = [
+                Sprite._image_signature_colors(self.image_data[..., i])
+                for i in new_states
+            ]
+        self.signature_colors.extend(signature_colors)
+
+        if constellation_of_pixels is None:
+            constellation_of_pixels = [
+                Sprite._image_constellation_of_pixels(
+                    self.image_data[..., i], self.signature_colors[i]
+                )
+                for i in new_states
+            ]
+        self.constellation_of_pixels.extend(constellation_of_pixels)
 
-        if constellation_of_pixels is not None:
-            self.constellation_of_pixels.append(constellation_of_pixels)
-        else:
-            self.constellation_of_pixels = self._generate_constellation_of_pixels()
+        self._cache.clear()
 
     def generate_constellation_of_pixels_images(self):
         constellation_of_pixel_images = list()
@@ -70,62 +159,200 @@ class Sprite:
 
         return constellation_of_pixel_images
 
-    def _generate_seed(self):
-        return str(uuid.uuid4())
+    def get_template(self, state, grayscale=False, pyramid_level=0):
+        """Image of an animation state ready for template matching.
 
-    def _generate_signature_colors(self, quantity=8):
-        signature_colors = list()
-        height, width, pixels, animation_states = self.image_data.shape
-
-        for i in range(animation_states):
-            values, counts = np.unique(
-                self.image_data[..., i].reshape(width * height, pixels),
-                axis=0,
-                return_counts=True,
+        Templates are compiled on first use and cached until
+        append_image_data: C-contiguous, optionally converted to grayscale
+        and optionally halved pyramid_level times with cv2.pyrDown.
+
+        Args:
+            state (int): index of the animation state.
+            grayscale (bool): whether to convert the image to grayscale.
+            pyramid_level (int): number of times to halve the image.
+
+        Returns:
+            ndarray: the template.
+        """
+        key = ("template", state, grayscale, pyramid_level)
+        if key not in self._cache:
+            if pyramid_level > 0:
+                template = cv2.pyrDown(
+                    self.get_template(state, grayscale, pyramid_level - 1)
+                )
+            elif grayscale:
+                template = convert_to_grayscale(self.image_data[..., state])
+            else:
+                template = np.ascontiguousarray(self.image_data[..., state])
+            self._cache[key] = template
+        return self._cache[key]
+
+    def get_template_spectra(self, state, grayscale, fft_shape):
+        """Fourier transforms of the channels of a template, for the FFT engine.
+
+        Cached like get_template, per size of the transform.
+
+        Args:
+            state (int): index of the animation state.
+            grayscale (bool): whether to convert the image to grayscale.
+            fft_shape (tuple): size of the transform of the frame.
+
+        Returns:
+            list: per channel the transform; see fft_matching.compute_spectra.
+        """
+        key = ("spectra", state, grayscale, tuple(fft_shape))
+        if key not in self._cache:
+            self._cache[key] = compute_spectra(
+                self.get_template(state, grayscale), fft_shape
             )
+        return self._cache[key]
+
+    def get_binary_template(self, state, binarization, color_key=None, tolerance=0):
+        """Binarized template of an animation state, for locate_binary.
+
+        Cached like get_template, per binarization.
 
-            if len(values[0]) == 3:
-                maximum_indices = np.argsort(counts)[::-1][:quantity]
-            elif len(values[0]) == 4:
-                maximum_indices = list()
+        Args:
+            state (int): index of the animation state.
+            binarization (Binarizations): COLOR_KEY or EDGES.
+            color_key (tuple): BGR color of the set bits for COLOR_KEY.
+            tolerance (int): maximum difference per channel for COLOR_KEY.
 
-                for index in np.argsort(counts)[::-1]:
-                    value = values[index]
+        Returns:
+            BinaryTemplate: the packed bits of the template.
+        """
+        key = ("binary", state, binarization, color_key, tolerance)
+        if key not in self._cache:
+            self._cache[key] = BinaryTemplate(
+                Sprite._binarize(
+                    self.get_template(state), binarization, color_key, tolerance
+                )
+            )
+        return self._cache[key]
 
-                    if value[3] > 0:
-                        maximum_indices.append(index)
+    def _compile_constellations(self):
+        """Constellations of pixels as arrays, compiled once per animation state.
 
-                        if len(maximum_indices) == quantity:
-                            break
+        Returns:
+            list: per animation state a tuple of (y, x) offsets with shape (K, 2)
+                and BGR colors with shape (K, 3).
+        """
+        if "constellations" not in self._cache:
+            self._cache["constellations"] = [
+                (
+                    np.array(list(constellation.keys()), dtype=np.intp).reshape(-1, 2),
+                    np.array(list(constellation.values()), dtype=np.uint8).reshape(
+                        -1, 3
+                    ),
+                )
+                for constellation in self.constellation_of_pixels
+            ]
+        return self._cache["constellations"]
 
-            colors = [tuple(map(int, values[index][:3])) for index in maximum_indices]
-            signature_colors.append(set(colors))
+    def _generate_seed(self):
+        return str(uuid.uuid4())
 
-        return signature_colors
+    def _generate_signature_colors(self, quantity=8):
+        return [
+            Sprite._image_signature_colors(self.image_data[..., i], quantity)
+            for i in range(self.image_data.shape[3])
+        ]
 
     def _generate_constellation_of_pixels(self, quantity=8):
-        constellation_of_pixels = list()
-        height, width, pixels, animation_states = self.image_data.shape
+        return [
+            Sprite._image_constellation_of_pixels(
+                self.image_data[..., i], self.signature_colors[i], quantity
+            )
+            for i in range(self.image_data.shape[3])
+        ]
 
-        for i in range(animation_states):
-            constellation_of_pixels.append(dict())
+    @staticmethod
+    def _image_signature_colors(image, quantity=8):
+        """Set of the most common (opaque) BGR colors of one image."""
+        return Sprite._images_signature_colors([image], quantity)[0]
 
-            for ii in range(quantity):
-                signature_color = random.choice(list(self.signature_colors[i]))
-                signature_color_locations = Sprite.locate_color(
-                    signature_color, np.squeeze(self.image_data[:, :, :3, i])
+    @staticmethod
+    def _images_signature_colors(images, quantity=8):
+        """Sets of the most common (opaque) BGR colors of images.
+
+        Counts packed colors instead of unique pixel rows. Packed colors sort
+        like rows do, so ties between equally common colors are broken the
+        same way. The colors of all images with the same number of channels
+        are counted together, tagged with the index of their image.
+        """
+        signature_colors = [None] * len(images)
+        image_indices = dict()
+        for i, image in enumerate(images):
+            image_indices.setdefault(image.shape[2], []).append(i)
+
+        for channels, indices in image_indices.items():
+            colors = np.concatenate(
+                [
+                    pack_colors(images[i]).ravel().astype(np.uint64)
+                    | np.uint64(k) << np.uint64(32)
+                    for k, i in enumerate(indices)
+                ]
+            )
+            keys, counts = np.unique(colors, return_counts=True)
+            bounds = np.searchsorted(keys >> np.uint64(32), np.arange(len(indices) + 1))
+            for k, i in enumerate(indices):
+                values = (keys[bounds[k] : bounds[k + 1]] & 0xFFFFFFFF).astype(
+                    np.uint32
                 )
+                signature_colors[i] = Sprite._most_common_colors(
+                    values, counts[bounds[k] : bounds[k + 1]], channels, quantity
+                )
+        return signature_colors
 
-                y, x = random.choice(signature_color_locations)
-                constellation_of_pixels[i][(y, x)] = signature_color
+    @staticmethod
+    def _most_common_colors(values, counts, channels, quantity):
+        """Set of the BGR colors of the quantity (opaque) packed values counted most."""
+        maximum_indices = np.argsort(counts)[::-1]
+        if channels == 4:
+            maximum_indices = maximum_indices[values[maximum_indices] & 0xFF > 0]
+        maximum_indices = maximum_indices[:quantity]
+
+        shift = 8 * (channels - 3)
+        return set(
+            (
+                int(value) >> (shift + 16),
+                int(value) >> (shift + 8) & 0xFF,
+                int(value) >> shift & 0xFF,
+            )
+            for value in values[maximum_indices]
+        )
+
+    @staticmethod
+    def _image_constellation_of_pixels(image, signature_colors, quantity=8):
+        """Dict of random (y, x) locations of signature colors of one image."""
+        constellation_of_pixels = dict()
+
+        for ii in range(quantity):
+            signature_color = random.choice(list(signature_colors))
+            signature_color_locations = Sprite.locate_color(
+                signature_color, np.squeeze(image[:, :, :3])
+            )
+
+            y, x = random.choice(signature_color_locations)
+            constellation_of_pixels[(y, x)] = signature_color
 
         return constellation_of_pixels
 
     @classmethod
     def locate_color(cls, color, image):
-        # TODO: Optimize for ms gain
+        """Locates all pixels with the given color.
+
+        Args:
+            color (tuple): BGR color to find.
+            image (ndarray/Frame): image to search in; for a frame its shared
+                color index is used.
 
-        if image.shape[2] == 3:
+        Returns:
+            list: (y, x) tuples of the pixels with the color.
+        """
+        if isinstance(image, Frame):
+            color_indices = image.color_index.locate_color(color)
+        elif image.shape[2] == 3:
             color_indices = np.where(np.all(image[:, :, :3] == color, axis=-1))
         elif image.shape[2] == 4:
             color_indices = np.where(
@@ -149,7 +376,6 @@ class Sprite:
         Returns:
             Tuple of location of the sprite when found or None otherwise.
         """
-        constellation = sprite.generate_constellation_of_pixels_images()
         location = None
 
         img = frame.img
@@ -157,43 +383,39 @@ class Sprite:
         if region:
             img = extract_roi_from_image(img, region)
 
-        for i in range(len(constellation)):
-            constellation_of_pixels_item = list(
-                sprite.constellation_of_pixels[i].items()
-            )[0]
+        height, width = sprite.image_shape
+        maximum_y = img.shape[0] - height
+        maximum_x = img.shape[1] - width
 
-            query_coordinates = constellation_of_pixels_item[0]
-            query_rgb = constellation_of_pixels_item[1]
-
-            rgb_coordinates = Sprite.locate_color(query_rgb, image=img)
+        constellations = sprite._compile_constellations()
+        first_pixel_positions = frame.color_index.locate_colors(
+            [colors[0] for offsets, colors in constellations]
+        )
 
-            rgb_coordinates = list(
-                map(
-                    lambda yx: (
-                        yx[0] - query_coordinates[0],
-                        yx[1] - query_coordinates[1],
-                    ),
-                    rgb_coordinates,
+        for (offsets, colors), (ys, xs) in zip(constellations, first_pixel_positions):
+            # Top left corners where the first pixel of the constellation matches
+            if region:
+                in_region = (
+                    (ys >= region[0])
+                    & (ys < region[2])
+                    & (xs >= region[1])
+                    & (xs < region[3])
                 )
-            )
+                ys = ys[in_region] - region[0]
+                xs = xs[in_region] - region[1]
+            ys = ys - offsets[0, 0]
+            xs = xs - offsets[0, 1]
 
-            maximum_y = img.shape[0] - constellation[i].shape[0]
-            maximum_x = img.shape[1] - constellation[i].shape[1]
-
-            for y, x in rgb_coordinates:
-                if y < 0 or x < 0 or y > maximum_y or x > maximum_x:
-                    continue
-
-                for yx, rgb in sprite.constellation_of_pixels[i].items():
-                    if tuple(img[y + yx[0], x + yx[1], :]) != rgb:
-                        break
-                else:
-                    location = (
-                        y,
-                        x,
-                        y + constellation[i].shape[0],
-                        x + constellation[i].shape[1],
-                    )
+            valid = (ys >= 0) & (xs >= 0) & (ys <= maximum_y) & (xs <= maximum_x)
+            ys, xs = ys[valid], xs[valid]
+
+            for (y, x), color in zip(offsets[1:], colors[1:]):
+                matches = np.all(img[ys + y, xs + x, :3] == color, axis=-1)
+                ys, xs = ys[matches], xs[matches]
+
+            if len(ys):
+                y, x = int(ys[-1]), int(xs[-1])
+                location = (y, x, y + height, x + width)
 
         if location and region and use_global_location:
             location = (
@@ -213,6 +435,11 @@ class Sprite:
         use_global_location=True,
         match_method=cv2.TM_CCORR_NORMED,
         match_threshold=0.95,
+        pyramid_levels=0,
+        pyramid_candidates=3,
+        grayscale=False,
+        match_engine=MatchEngines.OPENCV,
+        tiles=1,
     ):
         """
         Locates the sprite within the defined (roi of) frame.
@@ -223,10 +450,321 @@ class Sprite:
             region (tuple): Only search within this region of the frame.
             use_global_location (bool): if using a region, whether to return
                 global location or local to region.
+            pyramid_levels (int): Number of times to halve frame and sprite
+                for a coarse search first; 0 to search at full resolution only.
+                Levels are dropped when the sprite would get smaller than
+                8 pixels.
+            pyramid_candidates (int): Number of best coarse matches per
+                animation state to refine at full resolution.
+            grayscale (bool): Match in grayscale; always done for frames
+                without channel axis.
+            match_engine (MatchEngines): OPENCV to use cv2.matchTemplate; FFT
+                to correlate with the transform of the (region of the) frame,
+                which is computed once per frame and region and then shared by
+                all locates. FFT pays off from a handful of templates per
+                region and cannot be combined with pyramid_levels.
+            tiles (int): Number of overlapping horizontal bands to match in
+                parallel on the thread pool with the OPENCV engine at full
+                resolution; os.cpu_count() speeds up large captures on
+                multi-core machines, on a single core bands only add overhead.
+                The location is the same for any number of bands.
+
+        Returns:
+            Tuple of location of the sprite when found or None otherwise.
+        """
+        img = frame.img
+        if region:
+            img = extract_roi_from_image(img, region)
+
+        if img.shape[0] < sprite.image_shape[0] or img.shape[1] < sprite.image_shape[1]:
+            return None
+
+        if match_engine == MatchEngines.FFT:
+            if pyramid_levels > 0:
+                raise SpriteError("The FFT match engine does not support pyramids!")
+            grayscale = grayscale or img.ndim == 2
+            spectrum = frame.spectrum(region, grayscale)
+            min_max_locs = [
+                Sprite._match_template_fft(
+                    spectrum,
+                    sprite.get_template(s, grayscale),
+                    sprite.get_template_spectra(s, grayscale, spectrum.fft_shape),
+                    match_method,
+                )
+                for s in range(sprite.image_count)
+            ]
+            best = Sprite._select_best_match(
+                min_max_locs, match_method, match_threshold
+            )
+            return Sprite._match_to_location(best, sprite, region, use_global_location)
+
+        img, grayscale = Sprite._prepare_image(img, grayscale)
+
+        levels = Sprite._usable_pyramid_levels(sprite.image_shape, pyramid_levels)
+        if levels > 0:
+            img_pyramid = [img]
+            for _ in range(levels):
+                img_pyramid.append(cv2.pyrDown(img_pyramid[-1]))
+            min_max_locs = [
+                Sprite._match_template_pyramid(
+                    img_pyramid,
+                    [
+                        sprite.get_template(s, grayscale, level)
+                        for level in range(levels + 1)
+                    ],
+                    match_method,
+                    pyramid_candidates,
+                )
+                for s in range(sprite.image_count)
+            ]
+        else:
+            min_max_locs = [
+                Sprite._match_template_best(
+                    img, sprite.get_template(s, grayscale), match_method, tiles
+                )
+                for s in range(sprite.image_count)
+            ]
+
+        best = Sprite._select_best_match(min_max_locs, match_method, match_threshold)
+
+        return Sprite._match_to_location(best, sprite, region, use_global_location)
+
+    @staticmethod
+    def locate_many(
+        sprites=None,
+        frame=None,
+        regions=None,
+        use_global_location=True,
+        match_method=cv2.TM_CCORR_NORMED,
+        match_threshold=0.95,
+        grayscale=False,
+        match_engine=MatchEngines.OPENCV,
+    ):
+        """
+        Locates many sprites within the defined (rois of) frame at once.
+
+        Gives the same locations as calling locate_template for each sprite,
+        but extracts every region once and runs the template matches of all
+        sprites and animation states in parallel on a thread pool.
+
+        Args:
+            sprites (list/dict): The sprites to find; for a dict its values.
+            frame (Frame): The frame to search within.
+            regions (tuple/dict): Only search within this region of the frame;
+                or a dict with per sprite name the region to search within
+                (None or missing for the whole frame).
+            use_global_location (bool): if using a region, whether to return
+                global location or local to region.
+            grayscale (bool): Match in grayscale; always done for frames
+                without channel axis.
+            match_engine (MatchEngines): OPENCV or FFT; see locate_template.
+
+        Returns:
+            dict: per sprite name the location of the sprite when found or
+                None otherwise.
+        """
+        if isinstance(sprites, dict):
+            sprites = sprites.values()
+
+        rois = dict()
+        matches = dict()
+        for sprite in sprites:
+            region = regions.get(sprite.name) if isinstance(regions, dict) else regions
+            region = tuple(region) if region else None
+            if region not in rois:
+                img = frame.img
+                if region:
+                    img = extract_roi_from_image(img, region)
+                rois[region] = Sprite._prepare_image(img, grayscale)
+            img, gray = rois[region]
+
+            if (
+                img.shape[0] < sprite.image_shape[0]
+                or img.shape[1] < sprite.image_shape[1]
+            ):
+                matches[sprite.name] = (sprite, region, [])
+                continue
+
+            if match_engine == MatchEngines.FFT:
+                spectrum = frame.spectrum(region, gray)
+                futures = [
+                    _get_thread_pool().submit(
+                        Sprite._match_template_fft,
+                        spectrum,
+                        sprite.get_template(s, gray),
+                        sprite.get_template_spectra(s, gray, spectrum.fft_shape),
+                        match_method,
+                    )
+                    for s in range(sprite.image_count)
+                ]
+            else:
+                futures = [
+                    _get_thread_pool().submit(
+                        Sprite._match_template,
+                        img,
+                        sprite.get_template(s, gray),
+                        match_method,
+                    )
+                    for s in range(sprite.image_count)
+                ]
+            matches[sprite.name] = (sprite, region, futures)
+
+        locations = dict()
+        for name, (sprite, region, futures) in matches.items():
+            best = Sprite._select_best_match(
+                [future.result() for future in futures], match_method, match_threshold
+            )
+            locations[name] = Sprite._match_to_location(
+                best, sprite, region, use_global_location
+            )
+
+        return locations
+
+    @staticmethod
+    def locate_all_template(
+        sprite=None,
+        frame=None,
+        region=None,
+        use_global_location=True,
+        match_method=cv2.TM_CCORR_NORMED,
+        match_threshold=0.95,
+        max_results=None,
+        max_overlap=0.3,
+        grayscale=False,
+        match_engine=MatchEngines.OPENCV,
+        tiles=1,
+    ):
+        """
+        Locates all instances of the sprite within the defined (roi of) frame.
+
+        Matches every animation state once and keeps per position the best
+        match value of all states. Local optima beyond match_threshold are
+        the candidates, of which the best are kept that overlap no better
+        candidate by more than max_overlap.
+
+        Args:
+            sprite (Sprite): The sprite to find.
+            frame (Frame): The frame to search within.
+            region (tuple): Only search within this region of the frame.
+            use_global_location (bool): if using a region, whether to return
+                global location or local to region.
+            max_results (int): Maximum number of locations; None for all.
+            max_overlap (float): Maximum intersection over union of the
+                locations of two instances.
+            grayscale (bool): Match in grayscale; always done for frames
+                without channel axis.
+            match_engine (MatchEngines): OPENCV or FFT; see locate_template.
+            tiles (int): Number of bands to match in parallel; see
+                locate_template. Match values can differ by float32 rounding
+                from those without bands, so values within about 1e-6 of
+                match_threshold or of a neighbour can be decided differently.
+
+        Returns:
+            list: tuples of location and match value, best match first.
+        """
+        img = frame.img
+        if region:
+            img = extract_roi_from_image(img, region)
+
+        if img.shape[0] < sprite.image_shape[0] or img.shape[1] < sprite.image_shape[1]:
+            return []
+
+        if match_engine == MatchEngines.FFT:
+            grayscale = grayscale or img.ndim == 2
+            spectrum = frame.spectrum(region, grayscale)
+            match_results = [
+                spectrum.match_template(
+                    sprite.get_template(s, grayscale),
+                    sprite.get_template_spectra(s, grayscale, spectrum.fft_shape),
+                    match_method,
+                )
+                for s in range(sprite.image_count)
+            ]
+        else:
+            img, grayscale = Sprite._prepare_image(img, grayscale)
+            match_results = [
+                Sprite._match_template_tiled(
+                    img, sprite.get_template(s, grayscale), match_method, tiles
+                )
+                for s in range(sprite.image_count)
+            ]
+
+        kernel = np.ones((3, 3), dtype=np.uint8)
+        if match_method == cv2.TM_SQDIFF or match_method == cv2.TM_SQDIFF_NORMED:
+            match_result = np.min(match_results, axis=0)
+            candidates = (match_result <= match_threshold) & (
+                match_result == cv2.erode(match_result, kernel)
+            )
+            sign = 1
+        else:
+            match_result = np.max(match_results, axis=0)
+            candidates = (match_result >= match_threshold) & (
+                match_result == cv2.dilate(match_result, kernel)
+            )
+            sign = -1
+
+        ys, xs = np.nonzero(candidates)
+        values = match_result[ys, xs]
+        order = np.argsort(sign * values, kind="stable")
+        ys, xs, values = ys[order], xs[order], values[order]
+
+        keep = Sprite._suppress_overlaps(
+            ys, xs, sprite.image_shape, max_overlap, max_results
+        )
+        return [
+            (
+                Sprite._match_to_location(
+                    (values[i], (int(xs[i]), int(ys[i]))),
+                    sprite,
+                    region,
+                    use_global_location,
+                ),
+                float(values[i]),
+            )
+            for i in keep
+        ]
+
+    @staticmethod
+    def locate_binary(
+        sprite=None,
+        frame=None,
+        region=None,
+        use_global_location=True,
+        binarization=Binarizations.COLOR_KEY,
+        color_key=None,
+        color_tolerance=0,
+        match_threshold=0.95,
+    ):
+        """
+        Locates the sprite within the defined (roi of) frame by its bits.
+
+        For flat colored sprites like UI icons: frame and sprite are reduced
+        to one bit per pixel, telling whether it has the color key or is on
+        an edge, and the match value of a position is the fraction of equal
+        bits. Windows are first rejected by the bit counts of blocks of them,
+        so only few windows get compared bit by bit.
+
+        Args:
+            sprite (Sprite): The sprite to find.
+            frame (Frame): The frame to search within.
+            region (tuple): Only search within this region of the frame.
+            use_global_location (bool): if using a region, whether to return
+                global location or local to region.
+            binarization (Binarizations): COLOR_KEY to set the bits of pixels
+                with color_key; EDGES to set those of Canny edges.
+            color_key (tuple): BGR color for COLOR_KEY.
+            color_tolerance (int): Maximum difference per channel with
+                color_key.
+            match_threshold (float): Minimum fraction of equal bits.
 
         Returns:
             Tuple of location of the sprite when found or None otherwise.
         """
+        if binarization == Binarizations.COLOR_KEY:
+            if color_key is None:
+                raise SpriteError("Binarizing by color key requires a color_key!")
+            color_key = tuple(int(c) for c in color_key)
+
         img = frame.img
         if region:
             img = extract_roi_from_image(img, region)
@@ -234,12 +772,211 @@ class Sprite:
         if img.shape[0] < sprite.image_shape[0] or img.shape[1] < sprite.image_shape[1]:
             return None
 
+        binary_image = BinaryImage(
+            Sprite._binarize(img, binarization, color_key, color_tolerance)
+        )
         best = None
-        for s in range(sprite.image_count):
-            match_result = cv2.matchTemplate(
-                img, sprite.image_data[..., s], match_method
+        for state in range(sprite.image_count):
+            match = binary_image.match(
+                sprite.get_binary_template(
+                    state, binarization, color_key, color_tolerance
+                ),
+                match_threshold,
             )
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(match_result, None)
+            if match is not None and (best is None or match[0] >= best[0]):
+                best = match
+
+        return Sprite._match_to_location(best, sprite, region, use_global_location)
+
+    @staticmethod
+    def _binarize(img, binarization, color_key, tolerance):
+        if binarization == Binarizations.COLOR_KEY:
+            return binarize_color_key(img, color_key, tolerance)
+        return binarize_edges(img)
+
+    @staticmethod
+    def _suppress_overlaps(ys, xs, shape, max_overlap, max_results):
+        """Greedy non-maximum suppression of equally sized boxes, best first.
+
+        Returns:
+            list: indices of the boxes to keep.
+        """
+        height, width = shape
+        keep = []
+        remaining = np.arange(len(ys))
+        while remaining.size and (max_results is None or len(keep) < max_results):
+            best, remaining = remaining[0], remaining[1:]
+            keep.append(best)
+            intersections = np.maximum(
+                height - np.abs(ys[remaining] - ys[best]), 0
+            ) * np.maximum(width - np.abs(xs[remaining] - xs[best]), 0)
+            overlaps = intersections / (2 * height * width - intersections)
+            remaining = remaining[overlaps <= max_overlap]
+        return keep
+
+    @staticmethod
+    def _prepare_image(img, grayscale):
+        """Image to match templates against; returns image and whether it is gray.
+
+        Converts to grayscale if requested and makes the image C-contiguous,
+        so OpenCV does not copy it for every template.
+        """
+        if img.ndim == 2:
+            return np.ascontiguousarray(img), True
+        if grayscale:
+            return convert_to_grayscale(img), True
+        return np.ascontiguousarray(img), False
+
+    @staticmethod
+    def _match_template(img, template, match_method):
+        """Match template against img; returns min_val, max_val, min_loc, max_loc."""
+        match_result = cv2.matchTemplate(img, template, match_method)
+        return cv2.minMaxLoc(match_result, None)
+
+    @staticmethod
+    def _match_template_tiled(img, template, match_method, tiles):
+        """cv2.matchTemplate of img split in overlapping horizontal bands.
+
+        Every band extends template height - 1 rows into the next one, so it
+        holds every window of its rows of the result. The bands are matched
+        in parallel on the thread pool and written into one result, which
+        equals the untiled result up to floating point rounding. Bands are
+        kept at least as high as the template, so the overlap does not
+        dominate the work.
+        """
+        result_shape = (
+            img.shape[0] - template.shape[0] + 1,
+            img.shape[1] - template.shape[1] + 1,
+        )
+        tiles = max(1, min(tiles, result_shape[0] // template.shape[0]))
+        if tiles == 1:
+            return cv2.matchTemplate(img, template, match_method)
+
+        match_result = np.empty(result_shape, dtype=np.float32)
+        bounds = np.linspace(0, result_shape[0], tiles + 1).astype(int)
+
+        def match_band(top, bottom):
+            band = img[top : bottom + template.shape[0] - 1]
+            match_result[top:bottom] = cv2.matchTemplate(band, template, match_method)
+
+        futures = [
+            _get_thread_pool().submit(match_band, top, bottom)
+            for top, bottom in zip(bounds[:-1], bounds[1:])
+        ]
+        for future in futures:
+            future.result()
+        return match_result
+
+    @staticmethod
+    def _match_template_best(img, template, match_method, tiles):
+        """minMaxLoc of the match result of img, the same for any number of tiles.
+
+        The values of a tiled result differ from the untiled ones by float32
+        rounding, as OpenCV picks DFT sizes per input size, which decides
+        between near-tied windows, e.g. on the plateaus of flat sprites. So
+        the windows within _TIE_TOLERANCE (relative) of the best value, at
+        most _TIE_CANDIDATES of them in row-major order, are matched again on
+        their own. Their values only depend on the window, and the best of
+        them is taken, the first in row-major order on ties.
+        """
+        match_result = Sprite._match_template_tiled(img, template, match_method, tiles)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(match_result, None)
+        tolerance = _TIE_TOLERANCE * max(1, abs(min_val), abs(max_val))
+        if match_method == cv2.TM_SQDIFF or match_method == cv2.TM_SQDIFF_NORMED:
+            candidates = np.flatnonzero(match_result <= min_val + tolerance)
+            sign = -1
+        else:
+            candidates = np.flatnonzero(match_result >= max_val - tolerance)
+            sign = 1
+
+        ys, xs = np.unravel_index(candidates[:_TIE_CANDIDATES], match_result.shape)
+        height, width = template.shape[:2]
+        values = [
+            cv2.matchTemplate(
+                img[y : y + height, x : x + width], template, match_method
+            )[0, 0]
+            for y, x in zip(ys, xs)
+        ]
+        best = int(np.argmax(sign * np.array(values)))
+        loc = (int(xs[best]), int(ys[best]))
+        if sign < 0:
+            return float(values[best]), max_val, loc, max_loc
+        return min_val, float(values[best]), min_loc, loc
+
+    @staticmethod
+    def _match_template_fft(spectrum, template, template_spectra, match_method):
+        """Match template against an ImageSpectrum; returns minMaxLoc like _match_template."""
+        match_result = spectrum.match_template(template, template_spectra, match_method)
+        return cv2.minMaxLoc(match_result, None)
+
+    @staticmethod
+    def _usable_pyramid_levels(image_shape, pyramid_levels, minimum_size=8):
+        """Number of pyramid levels at which the sprite keeps minimum_size pixels."""
+        levels = 0
+        while (
+            levels < pyramid_levels and min(image_shape) >> (levels + 1) >= minimum_size
+        ):
+            levels += 1
+        return levels
+
+    @staticmethod
+    def _match_template_pyramid(
+        img_pyramid, template_pyramid, match_method, candidates
+    ):
+        """Match template coarse-to-fine; returns min_val, max_val, min_loc, max_loc.
+
+        Matches at the coarsest level of img_pyramid and template_pyramid
+        first and then only matches at full resolution in small windows
+        around the best candidates. Values and locations are those of full
+        resolution.
+        """
+        levels = len(img_pyramid) - 1
+        scale = 2**levels
+        template = template_pyramid[0]
+
+        coarse_result = cv2.matchTemplate(
+            img_pyramid[-1], template_pyramid[-1], match_method
+        )
+        if match_method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+            coarse_result = -coarse_result
+        coarse_height, coarse_width = template_pyramid[-1].shape[:2]
+
+        img = img_pyramid[0]
+        height, width = template.shape[:2]
+        best = None
+        for _ in range(candidates):
+            _, coarse_max_val, _, (x, y) = cv2.minMaxLoc(coarse_result)
+            if coarse_max_val == -np.inf:
+                break
+            coarse_result[
+                max(y - coarse_height // 2, 0) : y + coarse_height // 2 + 1,
+                max(x - coarse_width // 2, 0) : x + coarse_width // 2 + 1,
+            ] = -np.inf
+
+            # Refine within a window that covers the rounding of every level
+            y0 = max(y * scale - scale, 0)
+            x0 = max(x * scale - scale, 0)
+            y1 = min(y * scale + scale + height, img.shape[0])
+            x1 = min(x * scale + scale + width, img.shape[1])
+            min_val, max_val, min_loc, max_loc = Sprite._match_template(
+                img[y0:y1, x0:x1], template, match_method
+            )
+            min_loc = (min_loc[0] + x0, min_loc[1] + y0)
+            max_loc = (max_loc[0] + x0, max_loc[1] + y0)
+            if best is None:
+                best = [min_val, max_val, min_loc, max_loc]
+            if min_val < best[0]:
+                best[0], best[2] = min_val, min_loc
+            if max_val > best[1]:
+                best[1], best[3] = max_val, max_loc
+
+        return tuple(best)
+
+    @staticmethod
+    def _select_best_match(min_max_locs, match_method, match_threshold):
+        """Best (value, (x, y)) of the matches of the animation states, if good enough."""
+        best = None
+        for min_val, max_val, min_loc, max_loc in min_max_locs:
             if match_method == cv2.TM_SQDIFF or match_method == cv2.TM_SQDIFF_NORMED:
                 if min_val <= match_threshold:
                     if best is None or min_val < best[0]:
@@ -248,7 +985,10 @@ class Sprite:
                 if max_val >= match_threshold:
                     if best is None or max_val >= best[0]:
                         best = (max_val, max_loc)
+        return best
 
+    @staticmethod
+    def _match_to_location(best, sprite, region, use_global_location):
         location = None
         if best is not None:
             best_loc = best[1]
@@ -270,11 +1010,16 @@ class Sprite:
         return location
 
     @staticmethod
-    def discover_sprites(sprites_dir):
+    def discover_sprites(sprites_dir, cache_file=None):
         """Discover the sprites in the given dir (of a game).
 
         Args:
             sprites_dir (Path/str): Directory where to search for sprites.
+            cache_file (Path/str): Optional .npz file to keep the decoded
+                images, signature colors and constellations of pixels in.
+                Only images of which the modification time or size changed
+                are decoded again (in parallel); the file is rewritten when
+                any image was added, changed or removed.
 
         Returns:
             dict: key value pairs where keys are sprite name strings and values
@@ -284,16 +1029,70 @@ class Sprite:
         sprites_dir = Path(sprites_dir)
 
         if sprites_dir.is_dir():
-            for file_path in sprites_dir.glob("*.png"):
-                sprite_name = "_".join(str(file_path.stem).split("_")[:-1]).upper()
+            file_paths = list(sprites_dir.glob("*.png"))
+            entries = Sprite._load_image_entries(file_paths, cache_file)
 
-                sprite_image_data = cv2.imread(str(file_path))
-                sprite_image_data = sprite_image_data[..., np.newaxis]
+            sprite_entries = {}
+            for file_path in file_paths:
+                sprite_name = "_".join(str(file_path.stem).split("_")[:-1]).upper()
+                sprite_entries.setdefault(sprite_name, []).append(
+                    entries[file_path.name]
+                )
 
-                if sprite_name not in sprites:
-                    sprite = Sprite(sprite_name, image_data=sprite_image_data)
-                    sprites[sprite_name] = sprite
-                else:
-                    sprites[sprite_name].append_image_data(sprite_image_data)
+            for sprite_name, image_entries in sprite_entries.items():
+                sprites[sprite_name] = Sprite.from_images(
+                    sprite_name,
+                    [entry["image"] for entry in image_entries],
+                    signature_colors=[
+                        entry["signature_colors"] for entry in image_entries
+                    ],
+                    constellation_of_pixels=[
+                        entry["constellation_of_pixels"] for entry in image_entries
+                    ],
+                )
 
         return sprites
+
+    @staticmethod
+    def _load_image_entries(file_paths, cache_file=None):
+        """Decoded image, signature colors and constellation per file name.
+
+        Entries come from cache_file when the file did not change since it was
+        cached; the others are decoded on the shared thread pool.
+        """
+        cached_entries = read_sprite_cache(cache_file) if cache_file else {}
+
+        entries = {}
+        missing_file_paths = []
+        for file_path in file_paths:
+            entry = cached_entries.get(file_path.name)
+            if entry is not None and entry["key"] == file_key(file_path):
+                entries[file_path.name] = entry
+            else:
+                missing_file_paths.append(file_path)
+
+        for file_path, entry in zip(
+            missing_file_paths,
+            _get_thread_pool().map(Sprite._compile_image_file, missing_file_paths),
+        ):
+            entries[file_path.name] = entry
+
+        if cache_file and (missing_file_paths or len(entries) != len(cached_entries)):
+            write_sprite_cache(cache_file, entries)
+
+        return entries
+
+    @staticmethod
+    def _compile_image_file(file_path):
+        """Decode an image file and generate its signature colors and constellation."""
+        key = file_key(file_path)
+        image = cv2.imread(str(file_path))
+        signature_colors = Sprite._image_signature_colors(image)
+        return {
+            "key": key,
+            "image": image,
+            "signature_colors": signature_colors,
+            "constellation_of_pixels": Sprite._image_constellation_of_pixels(
+                image, signature_colors
+            ),
+        }
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+
+_ARRAY_NAMES = (
+    "file_names",
+    "keys",
+    "shapes",
+    "pixel_offsets",
+    "pixels",
+    "signature_colors",
+    "signature_color_counts",
+    "constellation_offsets",
+    "constellation_colors",
+    "constellation_counts",
+)
+
+
+def file_key(file_path):
+    """Modification time in ns and size of a file; a cache entry is valid while equal."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_sprite_cache(cache_file):
+    """Read the compiled images of a sprites dir.
+
+    Args:
+        cache_file (Path/str): .npz file written by write_sprite_cache.
+
+    Returns:
+        dict: per file name a dict with the "key" of the file when compiled,
+            its "image", the "signature_colors" set and the
+            "constellation_of_pixels" dict. Empty when the file is missing or
+            cannot be read.
+    """
+    try:
+        with np.load(cache_file) as data:
+            arrays = {name: data[name] for name in _ARRAY_NAMES}
+    except (OSError, ValueError, KeyError, EOFError):
+        return {}
+
+    entries = {}
+    for i, file_name in enumerate(arrays["file_names"]):
+        start, end = arrays["pixel_offsets"][i : i + 2]
+        image = arrays["pixels"][start:end].reshape(arrays["shapes"][i])
+        colors = arrays["signature_colors"][i, : arrays["signature_color_counts"][i]]
+        offsets = arrays["constellation_offsets"][
+            i, : arrays["constellation_counts"][i]
+        ]
+        constellation_colors = arrays["constellation_colors"][i, : len(offsets)]
+        entries[str(file_name)] = {
+            "key": tuple(int(value) for value in arrays["keys"][i]),
+            "image": image,
+            "signature_colors": {tuple(map(int, color)) for color in colors},
+            "constellation_of_pixels": {
+                tuple(map(int, yx)): tuple(map(int, color))
+                for yx, color in zip(offsets, constellation_colors)
+            },
+        }
+    return entries
+
+
+def write_sprite_cache(cache_file, entries):
+    """Write the compiled images of a sprites dir to one uncompressed .npz file.
+
+    All images are stored in a single flat pixel array, so reading the cache
+    takes a handful of reads no matter how many sprites there are. The file is
+    replaced atomically, so concurrent readers see the old or the new cache.
+
+    Args:
+        cache_file (Path/str): file to write.
+        entries (dict): per file name a dict as returned by read_sprite_cache.
+    """
+    file_names = list(entries)
+    count = len(file_names)
+    max_colors = max([len(e["signature_colors"]) for e in entries.values()] + [0])
+    max_pixels = max(
+        [len(e["constellation_of_pixels"]) for e in entries.values()] + [0]
+    )
+
+    keys = np.zeros((count, 2), dtype=np.int64)
+    shapes = np.zeros((count, 3), dtype=np.int64)
+    pixel_offsets = np.zeros(count + 1, dtype=np.int64)
+    signature_colors = np.zeros((count, max_colors, 3), dtype=np.uint8)
+    signature_color_counts = np.zeros(count, dtype=np.int64)
+    constellation_offsets = np.zeros((count, max_pixels, 2), dtype=np.int64)
+    constellation_colors = np.zeros((count, max_pixels, 3), dtype=np.uint8)
+    constellation_counts = np.zeros(count, dtype=np.int64)
+
+    for i, file_name in enumerate(file_names):
+        entry = entries[file_name]
+        keys[i] = entry["key"]
+        shapes[i] = entry["image"].shape
+        pixel_offsets[i + 1] = pixel_offsets[i] + entry["image"].size
+        colors = sorted(entry["signature_colors"])
+        signature_colors[i, : len(colors)] = colors
+        signature_color_counts[i] = len(colors)
+        constellation = entry["constellation_of_pixels"]
+        constellation_offsets[i, : len(constellation)] = list(constellation.keys())
+        constellation_colors[i, : len(constellation)] = list(constellation.values())
+        constellation_counts[i] = len(constellation)
+
+    pixels = np.concatenate(
+        [entries[file_name]["image"].ravel() for file_name in file_names]
+        + [np.empty(0, dtype=np.uint8)]
+    )
+
+    temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temporary_file, "wb") as f:
+        np.savez(
+            f,
+            file_names=np.array(file_names, dtype=str),
+            keys=keys,
+            shapes=shapes,
+            pixel_offsets=pixel_offsets,
+            pixels=pixels,
+            signature_colors=signature_colors,
+            signature_color_counts=signature_color_counts,
+            constellation_offsets=constellation_offsets,
+            constellation_colors=constellation_colors,
+            constellation_counts=constellation_counts,
+        )
+    os.replace(temporary_file, cache_file)
@@ -1,6 +1,65 @@
+import itertools
+
+import numpy as np
+
+from game_control import perceptual_hash, ssim
+from game_control.color_index import pack_colors
+from game_control.sprite import Sprite
+from game_control.utilities import extract_roi_from_image
+
+# Packed 3 channel colors fit in 24 bits, so this pads constellations.
+_NO_COLOR = 0xFFFFFFFF
+_HASH_BITS = 64
+# Rows compiled in the time a query takes to score one extra segment.
+_ROWS_PER_SEGMENT_QUERY = 10
+
+
+class SpriteIdentifierError(BaseException):
+    pass
+
+
 class SpriteIdentifier:
-    def __init__(self, sprites={}):
-        self.sprites = sprites
+    """Identifies query sprites among registered sprites.
+
+    Keeps an inverted index from signature color to the sprite states that
+    have it, so identifying by signature colors only scores the states that
+    share a color with the query. Constellations of pixels are packed into
+    arrays per image shape, so a query is scored against all sprites of its
+    shape at once. SSIM statistics of the sprites are likewise computed once
+    per image shape; see game_control.ssim. These indexes are kept in
+    segments (see _Segments), so after register only a small segment with the
+    new sprite and, now and then, a merge of segments is compiled. Call
+    register again after changing the signature colors or constellations of
+    pixels of a registered sprite.
+
+    The PERCEPTUAL_HASH mode finds the sprite state with the nearest
+    difference hash in a multi-index hash table, which is built on first use
+    and then extended by register. Its score is the percentage of equal hash
+    bits.
+    """
+
+    # Per identification mode the method that scores queries of one shape.
+    _BATCH_MATCHERS = {
+        "CONSTELLATION_OF_PIXELS": "_match_constellations_of_pixels",
+        "SSIM": "_match_ssim",
+        "PERCEPTUAL_HASH": "_match_perceptual_hash",
+    }
+
+    def __init__(self, sprites=None):
+        # A copy, so that sprites only get in through register and the
+        # indexes always cover all of them.
+        self.sprites = dict(sprites or {})
+        self._sprite_ranks = dict()
+        self._signature_color_segments = _Segments(
+            self._sprite_ranks, self._compile_signature_colors
+        )
+        self._sprite_shapes = dict()
+        self._constellation_segments = dict()
+        self._ssim_segments = dict()
+        self._hash_index = None
+
+        for sprite_name, sprite in self.sprites.items():
+            self._index(sprite_name, sprite)
 
     def identify(
         self, sprite, mode="SIGNATURE_COLORS", score_threshold=75, debug=False
@@ -17,113 +76,613 @@ class SpriteIdentifier:
             return self.identify_by_ssim(
                 sprite, score_threshold=score_threshold, debug=debug
             )
+        elif mode == "PERCEPTUAL_HASH":
+            return self.identify_by_perceptual_hash(
+                sprite, score_threshold=score_threshold, debug=debug
+            )
 
-    def identify_by_signature_colors(
-        self, query_sprite, score_threshold=0, debug=False
+    def identify_many(
+        self,
+        crops=None,
+        mode="SIGNATURE_COLORS",
+        score_threshold=75,
+        frame=None,
+        boxes=None,
+        debug=False,
     ):
-        top_sprite_score = 0
-        top_sprite_match = None
+        """Identify many crops at once, without constructing query sprites.
 
-        for sprite_name, sprite in self.sprites.items():
-            for sprite_signature_colors in sprite.signature_colors:
-                for query_sprite_signature_colors in query_sprite.signature_colors:
-                    signature_color_score = int(
-                        (
-                            len(query_sprite_signature_colors & sprite_signature_colors)
-                            / len(sprite_signature_colors)
-                        )
-                        * 100
-                    )
+        Only the features the mode needs are computed, for all crops at once:
+        the signature colors of all crops are counted together, and crops of
+        the same shape are scored in one batched comparison.
 
-                    if debug:
-                        print(sprite_name, signature_color_score)
+        Args:
+            crops (list): BGR(A) image ndarrays to identify.
+            mode (str): SIGNATURE_COLORS, CONSTELLATION_OF_PIXELS, SSIM or
+                PERCEPTUAL_HASH, like for identify.
+            score_threshold (int): minimum score of a match.
+            frame (Frame): frame to cut the crops from, instead of crops.
+            boxes (list): (y0, x0, y1, x1) regions of frame to identify.
+            debug (bool): whether to print scores.
 
-                    if signature_color_score > top_sprite_score:
-                        top_sprite_score = signature_color_score
-                        top_sprite_match = sprite_name
+        Returns:
+            list: per crop a tuple of the sprite name (or "UNKNOWN" below
+                score_threshold) and the score, like identify would give for
+                a sprite of that crop.
+
+        Raises:
+            SpriteIdentifierError: when the mode is unknown.
+        """
+        if crops is None:
+            crops = [extract_roi_from_image(frame.img, box) for box in boxes]
+
+        if mode == "SIGNATURE_COLORS":
+            matches = self._match_signature_colors(
+                [
+                    [signature_colors]
+                    for signature_colors in Sprite._images_signature_colors(crops)
+                ],
+                debug,
+            )
+        elif mode in self._BATCH_MATCHERS:
+            match = getattr(self, self._BATCH_MATCHERS[mode])
+            matches = [None] * len(crops)
+            crop_indices = dict()
+            for i, crop in enumerate(crops):
+                crop_indices.setdefault(crop.shape, []).append(i)
+            for indices in crop_indices.values():
+                images = np.stack([crops[i] for i in indices])[:, np.newaxis]
+                for i, crop_match in zip(indices, match(images, debug)):
+                    matches[i] = crop_match
+        else:
+            raise SpriteIdentifierError(f"Unknown identification mode '{mode}'!")
 
+        return [
+            (
+                top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN",
+                top_sprite_score,
+            )
+            for top_sprite_score, top_sprite_match in matches
+        ]
+
+    def identify_by_signature_colors(
+        self, query_sprite, score_threshold=0, debug=False
+    ):
+        top_sprite_score, top_sprite_match = self._match_signature_colors(
+            [query_sprite.signature_colors], debug
+        )[0]
         return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
 
     def identify_by_constellation_of_pixels(
         self, query_sprite, score_threshold=0, debug=False
     ):
-        top_sprite_score = 0
-        top_sprite_match = None
+        top_sprite_score, top_sprite_match = self._match_constellations_of_pixels(
+            _sprite_images(query_sprite), debug
+        )[0]
+        return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
 
-        for sprite_name, sprite in self.sprites.items():
-            if sprite.image_shape != query_sprite.image_shape:
-                continue
-
-            for constellation_of_pixels in sprite.constellation_of_pixels:
-                for i in range(query_sprite.image_data.shape[3]):
-                    query_sprite_image = query_sprite.image_data[..., i]
-
-                    constellation_of_pixels_score = 0
-
-                    for (
-                        pixel_coordinates,
-                        pixel_color,
-                    ) in constellation_of_pixels.items():
-                        if (
-                            tuple(
-                                query_sprite_image[
-                                    pixel_coordinates[0], pixel_coordinates[1], :
-                                ][:3]
-                            )
-                            == pixel_color
-                        ):
-                            constellation_of_pixels_score += 1
-
-                    constellation_of_pixels_score = int(
-                        (constellation_of_pixels_score / len(constellation_of_pixels))
-                        * 100
-                    )
+    def identify_by_ssim(self, query_sprite, score_threshold=0, debug=False):
+        top_sprite_score, top_sprite_match = self._match_ssim(
+            _sprite_images(query_sprite), debug
+        )[0]
+        return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
 
-                    if debug:
-                        print(sprite_name, constellation_of_pixels_score)
+    def identify_by_perceptual_hash(self, query_sprite, score_threshold=0, debug=False):
+        top_sprite_score, top_sprite_match = self._match_perceptual_hash(
+            _sprite_images(query_sprite), debug
+        )[0]
+        return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
 
-                    if constellation_of_pixels_score > top_sprite_score:
-                        top_sprite_score = constellation_of_pixels_score
-                        top_sprite_match = sprite_name
+    def nearest_by_perceptual_hash(self, query_sprite, max_distance=None):
+        """Sprite with the animation state nearest to any state of the query.
 
-        return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
+        Args:
+            query_sprite (Sprite): the sprite to identify.
+            max_distance (int): maximum Hamming distance between the hashes.
 
-    def identify_by_ssim(self, query_sprite, score_threshold=0, debug=False):
-        import skimage.measure
+        Returns:
+            tuple: name of the sprite and Hamming distance between the hashes;
+                (None, None) when no sprite is within max_distance.
+        """
+        return self._nearest_by_perceptual_hash(
+            perceptual_hash.dhashes(_sprite_images(query_sprite)[0]), max_distance
+        )
 
-        top_sprite_score = 0
-        top_sprite_match = None
+    def _match_signature_colors(self, queries_signature_colors, debug):
+        """Top score and sprite name per query.
 
-        for sprite_name, sprite in self.sprites.items():
-            if (
-                sprite.image_data[..., 0].shape[:2]
-                == query_sprite.image_data[..., 0].shape[:2]
-            ):
-                for i in range(sprite.image_data.shape[3]):
-                    for ii in range(query_sprite.image_data.shape[3]):
-                        sprite_image = sprite.image_data[..., :3, i]
-                        query_sprite_image = query_sprite.image_data[..., :3, ii]
-
-                        ssim_score = int(
-                            skimage.measure.compare_ssim(
-                                query_sprite_image, sprite_image, multichannel=True
-                            )
-                            * 100
-                        )
-
-                        if debug:
-                            print(sprite_name, ssim_score)
-
-                        if ssim_score > top_sprite_score:
-                            top_sprite_score = ssim_score
-                            top_sprite_match = sprite_name
-            else:
-                if debug:
+        The signature colors of all states of all queries are looked up in
+        the index at once, and the colors they share with every sprite state
+        are counted in one bincount.
+
+        Args:
+            queries_signature_colors (list): per query a list of the sets of
+                signature colors of its states.
+
+        Returns:
+            list: per query a tuple of the top score and sprite name.
+        """
+        if not queries_signature_colors:
+            return []
+        if not self._signature_color_segments:
+            return [(0, None)] * len(queries_signature_colors)
+        sprite_names, ranks, states, live, compiled_segments = (
+            self._signature_color_segments.compiled()
+        )
+        query_states = [
+            signature_colors
+            for query_signature_colors in queries_signature_colors
+            for signature_colors in query_signature_colors
+        ]
+        query_colors = np.array(
+            [_pack_color(color) for colors in query_states for color in colors],
+            dtype=np.int64,
+        )
+        query_state_ids = np.repeat(
+            np.arange(len(query_states)), [len(colors) for colors in query_states]
+        )
+        color_counts = np.concatenate(
+            [
+                _count_signature_colors(
+                    compiled, query_colors, query_state_ids, len(query_states)
+                )
+                for compiled in compiled_segments
+            ],
+            axis=1,
+        )
+        sizes = np.concatenate([compiled[0] for compiled in compiled_segments])
+        color_counts[:, ~live] = 0
+
+        # The best state of every query counts.
+        query_starts = np.cumsum(
+            [0] + [len(states) for states in queries_signature_colors[:-1]]
+        )
+        color_counts = np.maximum.reduceat(color_counts, query_starts, axis=0)
+        signature_color_scores = (color_counts / np.maximum(sizes, 1) * 100).astype(int)
+
+        if debug:
+            for scores, counts in zip(signature_color_scores, color_counts):
+                for sprite_name, score in zip(
+                    np.array(sprite_names)[counts > 0], scores[counts > 0]
+                ):
+                    print(sprite_name, score)
+
+        return [
+            _best_match(sprite_names, ranks, states, scores)
+            for scores in signature_color_scores
+        ]
+
+    def _match_constellations_of_pixels(self, images, debug):
+        """Top score and sprite name per query.
+
+        Args:
+            images (ndarray): states of the queries with shape (N, Q, H, W, C).
+
+        Returns:
+            list: per query a tuple of the top score and sprite name.
+        """
+        segments = self._constellation_segments.get(tuple(images.shape[2:4]))
+        if not segments:
+            return [(0, None)] * len(images)
+        sprite_names, ranks, states, live, compiled_segments = segments.compiled()
+
+        query_colors = pack_colors(images[..., :3]).reshape(images.shape[:2] + (-1,))
+        scores = []
+        for indices, colors, sizes in compiled_segments:
+            matches = query_colors[:, :, indices] == colors
+            scores.append(matches.sum(axis=3).max(axis=1) / np.maximum(sizes, 1))
+        constellation_of_pixels_scores = (np.concatenate(scores, axis=1) * 100).astype(
+            int
+        )
+        constellation_of_pixels_scores[:, ~live] = 0
+
+        if debug:
+            for scores in constellation_of_pixels_scores:
+                for sprite_name, score in zip(sprite_names, scores):
+                    print(sprite_name, score)
+
+        return [
+            _best_match(sprite_names, ranks, states, scores)
+            for scores in constellation_of_pixels_scores
+        ]
+
+    def _match_ssim(self, images, debug):
+        """Top score and sprite name per query.
+
+        Args:
+            images (ndarray): states of the queries with shape (N, Q, H, W, C).
+
+        Returns:
+            list: per query a tuple of the top score and sprite name.
+        """
+        shape = images.shape[2:4]
+        if debug:
+            for sprite_name, sprite_shape in self._sprite_shapes.items():
+                if sprite_shape != shape:
                     print(
                         f"The shape of '{sprite_name}' does not match the query sprite's shape. Skipping!"
                     )
 
-        return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
+        segments = self._ssim_segments.get(tuple(shape))
+        if not segments or min(shape) < ssim.WINDOW_SIZE:
+            return [(0, None)] * len(images)
+        sprite_names, ranks, states, live, compiled_segments = segments.compiled()
+
+        query_images = images[..., :3].reshape((-1,) + shape + (3,))
+        ssim_scores = np.concatenate(
+            [references.compare(query_images) for references in compiled_segments],
+            axis=1,
+        )
+        ssim_scores = (
+            ssim_scores.reshape(images.shape[:2] + (-1,)).max(axis=1) * 100
+        ).astype(int)
+        ssim_scores[:, ~live] = 0
+
+        if debug:
+            for scores in ssim_scores:
+                for sprite_name, score in zip(sprite_names, scores):
+                    print(sprite_name, score)
+
+        return [
+            _best_match(sprite_names, ranks, states, scores) for scores in ssim_scores
+        ]
+
+    def _match_perceptual_hash(self, images, debug):
+        """Top score and sprite name per query.
+
+        Args:
+            images (ndarray): states of the queries with shape (N, Q, H, W, C).
+
+        Returns:
+            list: per query a tuple of the top score and sprite name.
+        """
+        hashes = perceptual_hash.dhashes(images.reshape((-1,) + images.shape[2:]))
+        states = images.shape[1]
+
+        matches = []
+        for i in range(len(images)):
+            sprite_name, distance = self._nearest_by_perceptual_hash(
+                hashes[i * states : (i + 1) * states]
+            )
+
+            top_sprite_score = 0
+            top_sprite_match = None
+            if sprite_name is not None:
+                top_sprite_score = int((1 - distance / _HASH_BITS) * 100)
+                top_sprite_match = sprite_name if top_sprite_score > 0 else None
+
+            if debug:
+                print(sprite_name, top_sprite_score)
+
+            matches.append((top_sprite_score, top_sprite_match))
+        return matches
+
+    def _nearest_by_perceptual_hash(self, hashes, max_distance=None):
+        hash_index = self._get_hash_index()
+
+        best_item, best_distance = None, None
+        for hash_value in hashes:
+            item, distance = hash_index.nearest(hash_value, max_distance)
+            if item is not None and (
+                best_distance is None or (distance, item) < (best_distance, best_item)
+            ):
+                best_item, best_distance = item, distance
+
+        if best_item is None:
+            return None, None
+        return best_item[2], best_distance
 
     def register(self, sprite):
         self.sprites[sprite.name] = sprite
+        self._index(sprite.name, sprite)
+
+    def _index(self, sprite_name, sprite):
+        if sprite_name in self._sprite_ranks:
+            self._hash_index = None
+        else:
+            self._sprite_ranks[sprite_name] = len(self._sprite_ranks)
+            if self._hash_index is not None:
+                self._add_hashes(self._hash_index, sprite_name, sprite)
+        self._index_signature_colors(sprite_name, sprite)
+        self._index_shape(sprite_name, sprite)
+
+    def _index_signature_colors(self, sprite_name, sprite):
+        self._signature_color_segments.add(sprite_name, len(sprite.signature_colors))
+
+    def _compile_signature_colors(self, rows):
+        """The inverted signature color index of sprite states, as arrays.
+
+        Args:
+            rows (list): (sprite_name, state) of the sprite states.
+
+        Returns:
+            tuple: numbers of signature colors of the rows; the sorted packed
+                colors; per color the offset of its rows in the last array,
+                which holds the row indices per color.
+        """
+        row_colors = [
+            sorted(map(_pack_color, self.sprites[sprite_name].signature_colors[state]))
+            for sprite_name, state in rows
+        ]
+        sizes = np.array([len(colors) for colors in row_colors], dtype=int)
+        row_indices = np.repeat(np.arange(len(rows)), sizes)
+        all_colors = np.array(
+            [color for colors in row_colors for color in colors], dtype=np.int64
+        )
+        order = np.argsort(all_colors, kind="stable")
+        colors, starts = np.unique(all_colors[order], return_index=True)
+        return (
+            sizes,
+            colors,
+            np.append(starts, len(all_colors)),
+            row_indices[order],
+        )
+
+    def _index_shape(self, sprite_name, sprite):
+        previous_shape = self._sprite_shapes.pop(sprite_name, None)
+        if previous_shape is not None:
+            self._constellation_segments[previous_shape].remove(sprite_name)
+            self._ssim_segments[previous_shape].remove(sprite_name)
+
+        shape = tuple(sprite.image_shape)
+        self._sprite_shapes[sprite_name] = shape
+        if shape not in self._constellation_segments:
+            self._constellation_segments[shape] = _Segments(
+                self._sprite_ranks,
+                lambda rows: self._compile_constellations(shape, rows),
+            )
+            self._ssim_segments[shape] = _Segments(
+                self._sprite_ranks, self._compile_ssim_references
+            )
+        self._constellation_segments[shape].add(
+            sprite_name, len(sprite.constellation_of_pixels)
+        )
+        self._ssim_segments[shape].add(sprite_name, sprite.image_count)
+
+    def _compile_constellations(self, shape, rows):
+        """Constellations of pixels of sprite states with shape, as arrays.
+
+        Args:
+            shape (tuple): height and width of the sprites.
+            rows (list): (sprite_name, state) of the sprite states.
+
+        Returns:
+            tuple: flat pixel indices and packed colors of the pixels with
+                shape (M, K), padded to the largest constellation with a color
+                no pixel has; and the number of pixels per row.
+        """
+        constellations = [
+            self.sprites[sprite_name].constellation_of_pixels[state]
+            for sprite_name, state in rows
+        ]
+        pixels = max(len(constellation) for constellation in constellations)
+        indices = np.zeros((len(rows), pixels), dtype=np.intp)
+        colors = np.full((len(rows), pixels), _NO_COLOR, dtype=np.uint32)
+        sizes = np.zeros(len(rows), dtype=np.intp)
+        for i, constellation_of_pixels in enumerate(constellations):
+            size = len(constellation_of_pixels)
+            indices[i, :size] = [y * shape[1] + x for y, x in constellation_of_pixels]
+            colors[i, :size] = [
+                _pack_color(color) for color in constellation_of_pixels.values()
+            ]
+            sizes[i] = size
+        return indices, colors, sizes
+
+    def _compile_ssim_references(self, rows):
+        """SSIM references of sprite states of one shape.
+
+        Args:
+            rows (list): (sprite_name, state) of the sprite states.
+
+        Returns:
+            SSIMReferences: the references, in the order of rows.
+        """
+        return ssim.SSIMReferences(
+            np.stack(
+                [
+                    self.sprites[sprite_name].image_data[..., :3, state]
+                    for sprite_name, state in rows
+                ]
+            )
+        )
+
+    def _get_hash_index(self):
+        if self._hash_index is None:
+            self._hash_index = perceptual_hash.MultiIndexHashes(bits=_HASH_BITS)
+            for sprite_name in self._sprite_ranks:
+                self._add_hashes(
+                    self._hash_index, sprite_name, self.sprites[sprite_name]
+                )
+        return self._hash_index
+
+    def _add_hashes(self, hash_index, sprite_name, sprite):
+        hashes = perceptual_hash.dhashes(_sprite_images(sprite)[0])
+        for state, hash_value in enumerate(hashes):
+            hash_index.add(
+                hash_value, (self._sprite_ranks[sprite_name], state, sprite_name)
+            )
+
+
+class _Segments:
+    """Rows of sprite states in segments that are compiled for scoring.
+
+    Adding a sprite appends a segment with its states. The last segment is
+    merged with the one before it while it has at least as many rows, so
+    there are at most about log2 of the number of rows segments, and every
+    row is compiled about log2 times as rows are added, instead of all rows
+    after every addition. Segments are compiled on first use. The rows of a
+    sprite that is added again are masked in a compiled segment until it is
+    merged.
+
+    Every segment adds overhead to a query, so when queries keep coming
+    without additions, all segments are merged into one as soon as that
+    overhead adds up to the time it takes to compile all rows.
+    """
+
+    def __init__(self, sprite_ranks, compile_rows):
+        """Construct segments.
+
+        Args:
+            sprite_ranks (dict): per sprite name its order of registration.
+            compile_rows (callable): compiles a list of (sprite_name, state)
+                rows into what a matcher scores against.
+        """
+        self._sprite_ranks = sprite_ranks
+        self._compile_rows = compile_rows
+        self._segments = []
+        self._sprite_segments = dict()
+        self._compiled = None
+        self._queries = 0
+
+    def __len__(self):
+        return sum(segment.size for segment in self._segments)
+
+    def add(self, sprite_name, states):
+        self.remove(sprite_name)
+        if states == 0:
+            return
+        self._segments.append(
+            _Segment([(sprite_name, state) for state in range(states)])
+        )
+        self._sprite_segments[sprite_name] = self._segments[-1]
+        while (
+            len(self._segments) > 1
+            and self._segments[-1].size >= self._segments[-2].size
+        ):
+            self._merge(len(self._segments) - 2)
+
+    def remove(self, sprite_name):
+        self._changed()
+        segment = self._sprite_segments.pop(sprite_name, None)
+        if segment is None:
+            return
+        start, stop = segment.sprite_rows.pop(sprite_name)
+        segment.live[start:stop] = False
+        segment.size -= stop - start
+        if segment.size == 0:
+            self._segments.remove(segment)
+
+    def _changed(self):
+        self._compiled = None
+        self._queries = 0
+
+    def _merge(self, start):
+        """Merge the segments from start on into one."""
+        self._changed()
+        segment = _Segment(
+            [row for segment in self._segments[start:] for row in segment.live_rows()]
+        )
+        self._segments[start:] = [segment]
+        for sprite_name in segment.sprite_rows:
+            self._sprite_segments[sprite_name] = segment
+
+    def compiled(self):
+        """The rows of all segments, compiling those that are not yet.
+
+        Only call this when there are rows.
+
+        Returns:
+            tuple: names, ranks and states of the rows; a mask of the rows
+                that are not removed; and the compiled rows per segment.
+        """
+        self._queries += 1
+        overhead = self._queries * (len(self._segments) - 1) * _ROWS_PER_SEGMENT_QUERY
+        if overhead >= len(self):
+            self._merge(0)
+        if self._compiled is None:
+            for i, segment in enumerate(self._segments):
+                if segment.compiled is None:
+                    if segment.size < len(segment.rows):
+                        segment = self._segments[i] = _Segment(segment.live_rows())
+                        for sprite_name in segment.sprite_rows:
+                            self._sprite_segments[sprite_name] = segment
+                    segment.compile(self._sprite_ranks, self._compile_rows)
+
+            self._compiled = (
+                list(
+                    itertools.chain.from_iterable(
+                        segment.sprite_names for segment in self._segments
+                    )
+                ),
+                np.concatenate([segment.ranks for segment in self._segments]),
+                np.concatenate([segment.states for segment in self._segments]),
+                np.concatenate([segment.live for segment in self._segments]),
+                [segment.compiled for segment in self._segments],
+            )
+        return self._compiled
+
+
+class _Segment:
+    """Rows of a segment of _Segments; the rows of a sprite are contiguous."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.live = np.ones(len(rows), dtype=bool)
+        self.size = len(rows)
+        self.sprite_rows = dict()
+        for i, (sprite_name, _) in enumerate(rows):
+            start, _ = self.sprite_rows.get(sprite_name, (i, i))
+            self.sprite_rows[sprite_name] = (start, i + 1)
+        self.compiled = None
+
+    def live_rows(self):
+        return [row for row, live in zip(self.rows, self.live) if live]
+
+    def compile(self, sprite_ranks, compile_rows):
+        self.sprite_names = [sprite_name for sprite_name, _ in self.rows]
+        self.ranks = np.array(
+            [sprite_ranks[sprite_name] for sprite_name in self.sprite_names], dtype=int
+        )
+        self.states = np.array([state for _, state in self.rows], dtype=int)
+        self.compiled = compile_rows(self.rows)
+
+
+def _count_signature_colors(compiled, query_colors, query_state_ids, query_states):
+    """Signature colors every query state shares with every row of a segment.
+
+    Args:
+        compiled (tuple): the segment, compiled by
+            SpriteIdentifier._compile_signature_colors.
+        query_colors (ndarray): packed signature colors of the query states.
+        query_state_ids (ndarray): query state of every color.
+        query_states (int): number of query states.
+
+    Returns:
+        ndarray: counts with shape (query_states, rows of the segment).
+    """
+    sizes, colors, offsets, rows = compiled
+    indices = np.searchsorted(colors, query_colors)
+    found = indices < len(colors)
+    found[found] = colors[indices[found]] == query_colors[found]
+    starts, ends = offsets[indices[found]], offsets[indices[found] + 1]
+    lengths = ends - starts
+    posting_indices = np.arange(lengths.sum()) + np.repeat(
+        starts - np.cumsum(lengths) + lengths, lengths
+    )
+    return np.bincount(
+        np.repeat(query_state_ids[found], lengths) * len(sizes) + rows[posting_indices],
+        minlength=query_states * len(sizes),
+    ).reshape(query_states, len(sizes))
+
+
+def _best_match(sprite_names, ranks, states, scores):
+    """Top score and name of its sprite; None when no score is above 0.
+
+    Ties go to the first state of the sprite registered first, like when
+    scoring every state of every sprite in order and keeping the first best.
+    """
+    top_sprite_score = max(int(scores.max()), 0)
+    if top_sprite_score == 0:
+        return 0, None
+    (candidates,) = np.nonzero(scores == top_sprite_score)
+    best = candidates[np.lexsort((states[candidates], ranks[candidates]))[0]]
+    return top_sprite_score, sprite_names[best]
+
+
+def _sprite_images(sprite):
+    """States of a sprite as the images of one query, with shape (1, Q, H, W, C)."""
+    return sprite.image_data.transpose(3, 0, 1, 2)[np.newaxis]
+
+
+def _pack_color(color):
+    return (color[0] << 16) | (color[1] << 8) | color[2]
@@ -0,0 +1,122 @@
+import cv2
+
+from game_control.sprite import Sprite
+
+
+class SpriteTracker:
+    """Locates sprites near where they were found in previous frames.
+
+    Remembers the last location and velocity of every tracked sprite and
+    first searches a small window around the predicted location. Only when
+    the sprite is not found there above match_threshold, the whole (region
+    of the) frame is searched.
+
+    """
+
+    def __init__(
+        self, margin=16, match_method=cv2.TM_CCORR_NORMED, match_threshold=0.95
+    ):
+        """Construct tracker.
+
+        Args:
+            margin (int): Number of pixels to search around the predicted
+                location of a sprite.
+            match_method (int): cv2 template match method.
+            match_threshold (float): Minimum (or maximum for the TM_SQDIFF
+                methods) match value to accept a location.
+        """
+        self.margin = margin
+        self.match_method = match_method
+        self.match_threshold = match_threshold
+        self._tracks = dict()
+        self._window_locates = 0
+        self._full_locates = 0
+
+    @property
+    def window_locates(self):
+        """int: number of sprites found within their predicted window."""
+        return self._window_locates
+
+    @property
+    def full_locates(self):
+        """int: number of searches of the whole (region of the) frame."""
+        return self._full_locates
+
+    def locate(self, sprite=None, frame=None, region=None, use_global_location=True):
+        """
+        Locates the sprite, near its last location in the frame if possible.
+
+        Args:
+            sprite (Sprite): The sprite to find.
+            frame (Frame): The frame to search within.
+            region (tuple): Only search within this region of the frame.
+            use_global_location (bool): if using a region, whether to return
+                global location or local to region.
+
+        Returns:
+            Tuple of location of the sprite when found or None otherwise.
+        """
+        key = (sprite.name, tuple(region) if region else None)
+        track = self._tracks.get(key)
+
+        location = None
+        if track is not None:
+            window = self._predicted_window(track, frame, region)
+            if window is not None:
+                location = self._locate(sprite, frame, window)
+            if location is not None:
+                self._window_locates += 1
+
+        if location is None:
+            location = self._locate(sprite, frame, region)
+            self._full_locates += 1
+
+        if location is None:
+            self._tracks.pop(key, None)
+        else:
+            velocity = (0, 0)
+            if track is not None:
+                velocity = (location[0] - track[0][0], location[1] - track[0][1])
+            self._tracks[key] = (location, velocity)
+
+        if location and region and not use_global_location:
+            location = (
+                location[0] - region[0],
+                location[1] - region[1],
+                location[2] - region[0],
+                location[3] - region[1],
+            )
+
+        return location
+
+    def forget(self, sprite_name=None):
+        """Forget the tracks of the given sprite; or of all sprites when None."""
+        if sprite_name is None:
+            self._tracks.clear()
+        else:
+            for key in [key for key in self._tracks if key[0] == sprite_name]:
+                del self._tracks[key]
+
+    def _locate(self, sprite, frame, region):
+        return Sprite.locate_template(
+            sprite,
+            frame,
+            region,
+            use_global_location=True,
+            match_method=self.match_method,
+            match_threshold=self.match_threshold,
+        )
+
+    def _predicted_window(self, track, frame, region):
+        """Region around the predicted location, within region or frame."""
+        (y0, x0, y1, x1), (dy, dx) = track
+        bounds = region or (0, 0) + frame.img.shape[:2]
+        window = (
+            max(y0 + dy - self.margin, bounds[0]),
+            max(x0 + dx - self.margin, bounds[1]),
+            min(y1 + dy + self.margin, bounds[2]),
+            min(x1 + dx + self.margin, bounds[3]),
+        )
+        if window[2] - window[0] < y1 - y0 or window[3] - window[1] < x1 - x0:
+            return None
+        return window
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+# Parameters of skimage's structural_similarity with its defaults for uint8
+# images: a 7x7 uniform window, sample covariance and a data range of 255.
+WINDOW_SIZE = 7
+K1 = 0.01
+K2 = 0.03
+DATA_RANGE = 255
+_C1 = (K1 * DATA_RANGE) ** 2
+_C2 = (K2 * DATA_RANGE) ** 2
+_COV_NORM = WINDOW_SIZE**2 / (WINDOW_SIZE**2 - 1)
+# Maximum number of window values of query-reference pairs compared at once.
+_CHUNK_SIZE = 1 << 16
+
+
+def box_means(images, size=WINDOW_SIZE):
+    """Means of all size x size windows that fit within the images.
+
+    Args:
+        images (ndarray): float array with shape (..., H, W, C).
+        size (int): width and height of the window.
+
+    Returns:
+        ndarray: array with shape (..., H - size + 1, W - size + 1, C).
+    """
+    # Images are stacked vertically into one image for a single box filter;
+    # windows that straddle two images are cut away.
+    height, width, channels = images.shape[-3:]
+    stacked = np.ascontiguousarray(images).reshape(-1, width, channels)
+    means = cv2.blur(stacked, (size, size), anchor=(0, 0))
+    return means.reshape(images.shape)[..., : height - size + 1, : width - size + 1, :]
+
+
+class SSIMReferences:
+    """Images to compute the structural similarity of query images with.
+
+    Window means and variances of the references are computed once, so
+    comparing queries with all references takes batched computations over
+    chunks of query-reference pairs.
+    Values equal those of skimage's structural_similarity for uint8 images
+    with multichannel (channel_axis) set and default arguments, of which only
+    windows that fit within the image count.
+    """
+
+    def __init__(self, images):
+        """Construct references.
+
+        Args:
+            images (ndarray): uint8 array with shape (N, H, W, C) and H and W
+                at least WINDOW_SIZE.
+        """
+        self._images = images.astype(np.float64)
+        self._means = box_means(self._images)
+        variances = _COV_NORM * (
+            box_means(self._images * self._images) - self._means * self._means
+        )
+        # The terms of the denominator that only depend on the references.
+        self._squared_means_c1 = self._means * self._means + _C1
+        self._variances_c2 = variances + _C2
+
+    def __len__(self):
+        return len(self._images)
+
+    def compare(self, images):
+        """Mean structural similarity of query images with every reference.
+
+        Args:
+            images (ndarray): uint8 array with shape (H, W, C) for one query
+                or (Q, H, W, C) for many.
+
+        Returns:
+            ndarray: float array with shape (N,) for one query or (Q, N).
+        """
+        if images.ndim == 3:
+            return self.compare(images[np.newaxis])[0]
+
+        images = images.astype(np.float64)
+        all_means = box_means(images)
+        all_squared_means = all_means * all_means
+        all_variances = _COV_NORM * (box_means(images * images) - all_squared_means)
+
+        # Every term is computed in place, per chunk of query-reference pairs
+        # small enough to stay in cache.
+        similarities = np.empty((len(images), len(self)))
+        pair_size = self._images[0].size
+        reference_chunk = max(1, _CHUNK_SIZE // pair_size)
+        query_chunk = max(1, _CHUNK_SIZE // (pair_size * len(self)))
+        for start in range(0, len(images), query_chunk):
+            queries = slice(start, start + query_chunk)
+            for reference_start in range(0, len(self), reference_chunk):
+                references = slice(reference_start, reference_start + reference_chunk)
+                similarities[queries, references] = self._compare_chunk(
+                    images[queries, np.newaxis],
+                    all_means[queries, np.newaxis],
+                    all_squared_means[queries, np.newaxis],
+                    all_variances[queries, np.newaxis],
+                    references,
+                )
+        return similarities
+
+    def _compare_chunk(self, images, means, squared_means, variances, references):
+        """Mean structural similarities of queries with a slice of references."""
+        luminances = self._means[references] * means
+        covariances = box_means(self._images[references] * images)
+        covariances -= luminances
+        covariances *= 2 * _COV_NORM
+        covariances += _C2
+        luminances *= 2
+        luminances += _C1
+        numerators = luminances
+        numerators *= covariances
+
+        denominators = covariances
+        np.add(self._variances_c2[references], variances, out=denominators)
+        denominators *= self._squared_means_c1[references] + squared_means
+        numerators /= denominators
+        return numerators.mean(axis=(2, 3, 4))
@@ -1,5 +1,7 @@
 import sys
 
+import cv2
+
 
 def is_linux():
     return sys.platform in ["linux", "linux2"]
@@ -14,3 +16,8 @@ def extract_roi_from_image(image, region_bounding_box):
         region_bounding_box[0] : region_bounding_box[2],
         region_bounding_box[1] : region_bounding_box[3],
     ]
+
+
+def convert_to_grayscale(image):
+    conversion = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, conversion)
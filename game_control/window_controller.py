@@ -1,47 +1,123 @@
 from game_control.utilities import is_linux, is_windows
+import enum
 import time
 
+
+class WindowControllers(enum.Enum):
+    XDOTOOL = 1
+    XLIB = 2
+    WIN32 = 3
+
+
 class WindowControllerError(BaseException):
     pass
 
 
 class WindowController:
+    """Controls windows via the adapter for the current platform.
 
-    def __init__(self):
-        self.adapter = self._load_adapter()()
+    Window geometry and focus state are cached for cache_ttl seconds, because
+    querying them can be far more expensive than grabbing a frame. The cache
+    of a window is invalidated when it is moved, resized or focused through
+    this controller; call invalidate() when it changed by other means.
+    Use a cache_ttl of 0 to disable caching and float("inf") to never expire.
+
+    The adapter is chosen with backend; None picks the default of the
+    platform: XDOTOOL on Linux and WIN32 on Windows. XLIB keeps one
+    connection to the X server instead of starting xdotool subprocesses.
+    """
+
+    def __init__(self, backend=None, cache_ttl=0):
+        self.adapter = self._load_adapter(backend)()
+        self.cache_ttl = cache_ttl
+        self._geometry_cache = dict()
+        self._focus_cache = dict()
 
     def locate_window(self, name):
         return self.adapter.locate_window(name)
 
+    def locate_window_by_process_id(self, process_id):
+        return self.adapter.locate_window_by_process_id(process_id)
+
     def move_window(self, window_id, x, y):
         self.adapter.move_window(window_id, x, y)
+        self.invalidate(window_id)
 
     def resize_window(self, window_id, width, height):
         self.adapter.resize_window(window_id, width, height)
+        self.invalidate(window_id)
 
     def focus_window(self, window_id):
         self.adapter.focus_window(window_id)
+        self.invalidate()
 
     def bring_window_to_top(self, window_id):
         self.adapter.bring_window_to_top(window_id)
+        self.invalidate()
 
     def is_window_focused(self, window_id):
-        return self.adapter.is_window_focused(window_id)
+        return self._cached(
+            self._focus_cache, window_id, self.adapter.is_window_focused
+        )
 
     def get_focused_window_name(self):
         return self.adapter.get_focused_window_name()
 
+    def get_window_name(self, window_id):
+        return self.adapter.get_window_name(window_id)
+
     def get_window_geometry(self, window_id):
-        return self.adapter.get_window_geometry(window_id)
+        geometry = self._cached(
+            self._geometry_cache, window_id, self.adapter.get_window_geometry
+        )
+        return dict(geometry)
 
     def set_window_geometry(self, window_id, region):
         self.adapter.move_window(window_id, region["left"], region["top"])
         self.adapter.resize_window(window_id, region["width"], region["height"])
+        self.invalidate(window_id)
+
+    def invalidate(self, window_id=None):
+        """Forget cached geometry and focus state.
+
+        Args:
+            window_id: window to forget the geometry of; None for all windows.
+                Focus state is always forgotten for all windows, because
+                focusing one window unfocuses another.
+        """
+        if window_id is None:
+            self._geometry_cache.clear()
+        else:
+            self._geometry_cache.pop(window_id, None)
+        self._focus_cache.clear()
+
+    def _cached(self, cache, window_id, fetch):
+        now = time.monotonic()
+        if window_id in cache:
+            fetched_at, value = cache[window_id]
+            if now - fetched_at < self.cache_ttl:
+                return value
+
+        value = fetch(window_id)
+        if self.cache_ttl > 0:
+            cache[window_id] = (now, value)
+        return value
+
+    def _load_adapter(self, backend=None):
+        if backend is None:
+            if is_linux():
+                backend = WindowControllers.XDOTOOL
+            elif is_windows():
+                backend = WindowControllers.WIN32
 
-    def _load_adapter(self):
-        if is_linux():
+        if backend == WindowControllers.XDOTOOL:
             from game_control.window_controllers.linux_window_controller import LinuxWindowController
             return LinuxWindowController
-        elif is_windows():
+        elif backend == WindowControllers.XLIB:
+            from game_control.window_controllers.xlib_window_controller import XlibWindowController
+            return XlibWindowController
+        elif backend == WindowControllers.WIN32:
             from game_control.window_controllers.win32_window_controller import Win32WindowController
             return Win32WindowController
+        else:
+            raise WindowControllerError("The specified backend is invalid!")
@@ -14,6 +14,13 @@ class LinuxWindowController(WindowController):
     def locate_window(self, name):
         return subprocess.check_output(shlex.split(f"xdotool search --onlyvisible --name \"^{name}$\"")).decode("utf-8").strip()
 
+    def locate_window_by_process_id(self, process_id):
+        result = subprocess.run(
+            shlex.split(f"xdotool search --onlyvisible --pid {process_id}"), stdout=subprocess.PIPE
+        )
+        window_ids = result.stdout.decode("utf-8").split()
+        return window_ids[0] if window_ids else "0"
+
     def move_window(self, window_id, x, y):
         subprocess.call(shlex.split(f"xdotool windowmove {window_id} {x} {y}"))
 
@@ -34,6 +41,10 @@ class LinuxWindowController(WindowController):
         focused_window_id = subprocess.check_output(shlex.split("xdotool getwindowfocus")).decode("utf-8").strip()
         return subprocess.check_output(shlex.split(f"xdotool getwindowname {focused_window_id}")).decode("utf-8").strip()
 
+    def get_window_name(self, window_id):
+        window_name = subprocess.check_output(shlex.split(f"xdotool getwindowname {window_id}"))
+        return window_name.decode("utf-8").strip()
+
     def get_window_geometry(self, window_id):
         geometry = dict()
 
@@ -2,6 +2,7 @@ from game_control.window_controller import WindowController
 
 import win32gui
 import win32con
+import win32process
 
 import re
 
@@ -30,6 +31,18 @@ class Win32WindowController(WindowController):
 
         return window_id
 
+    def locate_window_by_process_id(self, process_id):
+        window_ids = list()
+
+        def callback(wid, window_ids):
+            if win32gui.IsWindowVisible(wid) and win32gui.GetWindowText(wid):
+                if win32process.GetWindowThreadProcessId(wid)[1] == process_id:
+                    window_ids.append(wid)
+
+        win32gui.EnumWindows(callback, window_ids)
+
+        return window_ids[0] if window_ids else 0
+
     def move_window(self, window_id, x, y):
         x0, y0, x1, y1 = win32gui.GetWindowRect(window_id)
         win32gui.MoveWindow(window_id, x, y, x1 - x0, y1 - y0, True)
@@ -54,6 +67,9 @@ class Win32WindowController(WindowController):
     def get_focused_window_name(self):
         return win32gui.GetWindowText(win32gui.GetForegroundWindow())
 
+    def get_window_name(self, window_id):
+        return win32gui.GetWindowText(window_id)
+
     def get_window_geometry(self, window_id):
         geometry = dict()
 
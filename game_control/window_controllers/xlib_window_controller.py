@@ -0,0 +1,144 @@
+from game_control.window_controller import WindowController
+
+from Xlib import X, display, error
+from Xlib.protocol import event
+
+import re
+
+
+class XlibWindowController(WindowController):
+    """Linux window controller that keeps one connection to the X server.
+
+    Does the same as LinuxWindowController with X protocol requests instead of
+    xdotool/xwininfo subprocesses. Requires python-xlib. Window ids are ints.
+    """
+
+    def __init__(self, display_name=None):
+        self._display = display.Display(display_name)
+        self._root = self._display.screen().root
+        self._net_active_window = self._display.intern_atom("_NET_ACTIVE_WINDOW")
+        self._net_supported = self._display.intern_atom("_NET_SUPPORTED")
+        self._net_wm_name = self._display.intern_atom("_NET_WM_NAME")
+        self._net_wm_pid = self._display.intern_atom("_NET_WM_PID")
+        self._utf8_string = self._display.intern_atom("UTF8_STRING")
+
+    def close(self):
+        self._display.close()
+
+    def locate_window(self, name):
+        pattern = re.compile(f"^{name}$")
+        for window in self._visible_windows():
+            window_name = self._get_window_name(window)
+            if window_name is not None and pattern.search(window_name):
+                return window.id
+        return 0
+
+    def locate_window_by_process_id(self, process_id):
+        for window in self._visible_windows():
+            try:
+                pid = window.get_full_property(self._net_wm_pid, X.AnyPropertyType)
+            except error.BadWindow:
+                continue
+            if pid is not None and pid.value[0] == process_id:
+                return window.id
+        return 0
+
+    def move_window(self, window_id, x, y):
+        self._window(window_id).configure(x=x, y=y)
+        self._display.sync()
+
+    def resize_window(self, window_id, width, height):
+        self._window(window_id).configure(width=width, height=height)
+        self._display.sync()
+
+    def focus_window(self, window_id):
+        window = self._window(window_id)
+        if self._is_supported_by_window_manager(self._net_active_window):
+            # Ask the window manager, like xdotool windowactivate does
+            message = event.ClientMessage(
+                window=window,
+                client_type=self._net_active_window,
+                data=(32, [2, X.CurrentTime, 0, 0, 0]),
+            )
+            mask = X.SubstructureRedirectMask | X.SubstructureNotifyMask
+            self._root.send_event(message, event_mask=mask)
+        else:
+            window.configure(stack_mode=X.Above)
+            window.set_input_focus(X.RevertToParent, X.CurrentTime)
+        self._display.sync()
+
+    def bring_window_to_top(self, window_id):
+        self.focus_window(window_id)
+
+    def is_window_focused(self, window_id):
+        focused_window = self._get_focused_window()
+        return focused_window is not None and focused_window.id == int(window_id)
+
+    def get_focused_window_name(self):
+        focused_window = self._get_focused_window()
+        if focused_window is None:
+            return ""
+        return self._get_window_name(focused_window) or ""
+
+    def get_window_name(self, window_id):
+        return self._get_window_name(self._window(window_id)) or ""
+
+    def get_window_geometry(self, window_id):
+        geometry = dict()
+
+        window = self._window(window_id)
+        window_geometry = window.get_geometry()
+        geometry["width"] = window_geometry.width
+        geometry["height"] = window_geometry.height
+
+        # Absolute upper-left corner, including border, as xwininfo reports it
+        border_width = window_geometry.border_width
+        position = self._root.translate_coords(window, -border_width, -border_width)
+        geometry["left"] = position.x
+        geometry["top"] = position.y
+
+        return geometry
+
+    def _window(self, window_id):
+        return self._display.create_resource_object("window", int(window_id))
+
+    def _visible_windows(self):
+        """Yields all viewable windows in the tree below the root window."""
+        windows = [self._root]
+        while windows:
+            try:
+                children = windows.pop().query_tree().children
+            except error.BadWindow:
+                continue
+
+            for child in children:
+                try:
+                    viewable = child.get_attributes().map_state == X.IsViewable
+                except error.BadWindow:
+                    continue
+                if viewable:
+                    yield child
+                windows.append(child)
+
+    def _get_window_name(self, window):
+        try:
+            name = window.get_full_property(self._net_wm_name, self._utf8_string)
+            if name is not None:
+                return name.value.decode("utf-8")
+            name = window.get_wm_name()
+        except error.BadWindow:
+            return None
+        return name.decode("latin-1") if isinstance(name, bytes) else name
+
+    def _get_focused_window(self):
+        """Window with focus or its first ancestor with WM_CLASS, like xdotool getwindowfocus."""
+        window = self._display.get_input_focus().focus
+        while not isinstance(window, int) and window != self._root:
+            if window.get_wm_class() is not None:
+                return window
+            window = window.query_tree().parent
+        return None
+
+    def _is_supported_by_window_manager(self, atom):
+        supported = self._root.get_full_property(self._net_supported, X.AnyPropertyType)
+        return supported is not None and atom in supported.value
@@ -32,6 +32,9 @@ setup(
         'Programming Language :: Python :: 3.8',
     ],
     description="Framework to control any game on your pc. Can create an OpenAI gym environment for your game, so that you can easily train an agent for it with a reinforcement learning library.",
+    extras_require={
+        'xlib': ['python-xlib'],
+    },
     entry_points={
         'console_scripts': [
             'game_control=game_control.cli:main',
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from game_control.binary_matching import (
+    BinaryImage,
+    BinaryTemplate,
+    binarize_color_key,
+)
+
+
+def _brute_force_mismatches(bits, template_bits):
+    height, width = template_bits.shape
+    return np.array(
+        [
+            [
+                np.sum(bits[y : y + height, x : x + width] != template_bits)
+                for x in range(bits.shape[1] - width + 1)
+            ]
+            for y in range(bits.shape[0] - height + 1)
+        ]
+    )
+
+
+@pytest.mark.parametrize("match_threshold", [0.6, 0.9, 1.0])
+def test_match_equals_brute_force(match_threshold):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        height, width = rng.integers(1, 12, 2)
+        bits = rng.random((40, 50)) < 0.3
+        template_bits = rng.random((height, width)) < 0.3
+        y, x = rng.integers(0, 40 - height + 1), rng.integers(0, 50 - width + 1)
+        bits[y : y + height, x : x + width] = template_bits
+        bits[y, x] = not bits[y, x]
+
+        match = BinaryImage(bits).match(BinaryTemplate(template_bits), match_threshold)
+
+        mismatches = _brute_force_mismatches(bits, template_bits)
+        score = 1 - mismatches.min() / (height * width)
+        if score < match_threshold:
+            assert match is None
+        else:
+            best_y, best_x = np.unravel_index(np.argmin(mismatches), mismatches.shape)
+            assert match == (score, (best_x, best_y))
+
+
+def test_binarize_color_key():
+    image = np.array([[[10, 20, 30], [12, 20, 30], [15, 20, 30]]], dtype=np.uint8)
+    assert binarize_color_key(image, (10, 20, 30)).tolist() == [[True, False, False]]
+    assert binarize_color_key(image, (10, 20, 30), 2).tolist() == [[True, True, False]]
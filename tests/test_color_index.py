@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from game_control.color_index import ColorIndex, pack_colors
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    palette = np.array([(0, 0, 0), (255, 0, 0), (0, 255, 0), (1, 2, 3)], dtype=np.uint8)
+    return palette[rng.integers(0, len(palette), (30, 40))]
+
+
+def test_pack_colors_keeps_row_order():
+    pixels = np.array(
+        [(0, 0, 255), (0, 1, 0), (1, 0, 0), (255, 255, 255)], dtype=np.uint8
+    )
+    assert list(np.argsort(pack_colors(pixels))) == [0, 1, 2, 3]
+
+
+def test_locate_colors(image):
+    colors = [(255, 0, 0), (1, 2, 3), (9, 9, 9), (255, 0, 0)]
+    color_index = ColorIndex(image)
+    positions = color_index.locate_colors(colors)
+
+    for color, (ys, xs) in zip(colors, positions):
+        expected_ys, expected_xs = np.where(np.all(image == color, axis=-1))
+        assert np.array_equal(ys, expected_ys)
+        assert np.array_equal(xs, expected_xs)
+    assert color_index.locate_color((1, 2, 3)) is positions[1]
+
+
+def test_locate_colors_with_alpha(image):
+    alpha = np.where(image[..., 1:2] == 0, 0, 255).astype(np.uint8)
+    ys, xs = ColorIndex(np.concatenate([image, alpha], axis=-1)).locate_color(
+        (0, 255, 0)
+    )
+    expected_ys, expected_xs = np.where(np.all(image == (0, 255, 0), axis=-1))
+    assert np.array_equal(ys, expected_ys) and np.array_equal(xs, expected_xs)
+
+
+def test_frame_shares_color_index(image):
+    frame = Frame(image)
+    assert frame.color_index is frame.color_index
+    assert Sprite.locate_color((1, 2, 3), frame) == Sprite.locate_color(
+        (1, 2, 3), image
+    )
+
+    frame.img = image.copy()
+    assert frame.color_index.image is frame.img
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+import pytest
+
+from game_control.fft_matching import ImageSpectrum, compute_spectra
+
+MATCH_METHODS = [
+    cv2.TM_SQDIFF,
+    cv2.TM_SQDIFF_NORMED,
+    cv2.TM_CCORR,
+    cv2.TM_CCORR_NORMED,
+    cv2.TM_CCOEFF,
+    cv2.TM_CCOEFF_NORMED,
+]
+
+
+@pytest.mark.parametrize("match_method", MATCH_METHODS)
+@pytest.mark.parametrize("shape", [(60, 80, 3), (60, 80)])
+def test_match_template(match_method, shape):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, shape, dtype=np.uint8)
+    spectrum = ImageSpectrum(image)
+
+    for template in [image[10:22, 20:36].copy(), image[30:45, 40:60].copy()]:
+        template_spectra = compute_spectra(template, spectrum.fft_shape)
+        result = spectrum.match_template(template, template_spectra, match_method)
+        expected_result = cv2.matchTemplate(image, template, match_method)
+        assert result.dtype == expected_result.dtype
+        assert np.allclose(
+            result,
+            expected_result,
+            rtol=1e-5,
+            atol=1e-5 * np.abs(expected_result).max(),
+        )
+
+
+def test_match_flat_template():
+    image = np.zeros((20, 30, 3), dtype=np.uint8)
+    image[5:, 10:] = 200
+    template = np.full((4, 4, 3), 200, dtype=np.uint8)
+    spectrum = ImageSpectrum(image)
+    template_spectra = compute_spectra(template, spectrum.fft_shape)
+
+    for match_method in [
+        cv2.TM_SQDIFF_NORMED,
+        cv2.TM_CCORR_NORMED,
+        cv2.TM_CCOEFF_NORMED,
+    ]:
+        result = spectrum.match_template(template, template_spectra, match_method)
+        expected_result = cv2.matchTemplate(image, template, match_method)
+        assert np.allclose(result, expected_result, atol=1e-5)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from game_control.frame import Frame
+from game_control.frame_buffer import FrameBuffer
+
+
+def _frame(value, shape=(4, 5, 3)):
+    return Frame(np.full(shape, value, dtype=np.uint8), timestamp=datetime.now())
+
+
+def test_add_frame_writes_in_place():
+    frame_buffer = FrameBuffer(maxlen=3)
+    frames = [frame_buffer.add_frame(_frame(v)) for v in range(5)]
+
+    assert frame_buffer.is_full
+    assert frame_buffer.last_frame is frames[-1]
+    assert frame_buffer.frames == frames[-3:]
+    assert [f.img[0, 0, 0] for f in frame_buffer.frames] == [2, 3, 4]
+    assert list(frame_buffer.frame_ids) == [2, 3, 4]
+    assert not np.isnan(frame_buffer.timestamps).any()
+    assert all(f.img.flags.c_contiguous for f in frames)
+    assert not np.shares_memory(frames[-1].img, frames[-2].img)
+    # Frame 1 lives in the slot that frame 4 overwrote.
+    assert frames[1].img[0, 0, 0] == 4
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 7])
+def test_last_images_is_ordered_view(count):
+    frame_buffer = FrameBuffer(maxlen=3)
+    for v in range(count):
+        frame_buffer.add_frame(_frame(v))
+
+    for n in range(1, min(count, 3) + 1):
+        images = frame_buffer.last_images(n)
+        assert images.shape == (n, 4, 5, 3)
+        assert images.base is not None
+        assert list(images[:, 0, 0, 0]) == list(range(count - n, count))
+
+    with pytest.raises(ValueError):
+        frame_buffer.last_images(min(count, 3) + 1)
+
+
+def test_add_frame_with_other_shape_reallocates():
+    frame_buffer = FrameBuffer(maxlen=3)
+    frame_buffer.add_frame(_frame(1))
+    frame = frame_buffer.add_frame(_frame(2, shape=(6, 5, 3)))
+
+    assert frame_buffer.frames == [frame]
+    assert frame_buffer.last_images(1).shape == (1, 6, 5, 3)
+    assert list(frame_buffer.frame_ids) == [1]
+
+
+def test_add_frame_clears_caches_of_older_frames():
+    frame_buffer = FrameBuffer(maxlen=2)
+    frames = [frame_buffer.add_frame(_frame(v)) for v in range(2)]
+    caches = [(frame.color_index, frame.spectrum()) for frame in frames]
+    frames.append(frame_buffer.add_frame(_frame(2)))
+
+    # Frame 0 lives in the slot that frame 2 overwrote; frame 1 is older now.
+    for frame, (color_index, spectrum) in zip(frames, caches):
+        assert frame._color_index is None
+        assert not frame._spectra
+        assert frame.color_index is not color_index
+        assert frame.spectrum() is not spectrum
+    assert frames[2].color_index is frames[2].color_index
@@ -0,0 +1,189 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from mss.screenshot import ScreenShot
+
+import game_control.frame_grabber
+from game_control.frame_grabber import (
+    ColorModes,
+    DropPolicies,
+    FrameGrabber,
+    FrameGrabberError,
+)
+
+REGION = {"top": 0, "left": 0, "width": 8, "height": 6}
+
+
+class FakeScreenGrabber:
+    """Stand-in for mss that returns a BGRA screenshot filled with a counter."""
+
+    def __init__(self):
+        self.grabs = 0
+
+    def grab(self, region):
+        self.grabs += 1
+        bgra = np.empty((region["height"], region["width"], 4), dtype=np.uint8)
+        bgra[...] = (self.grabs % 256, 1, 2, 255)
+        return ScreenShot(bytearray(bgra.tobytes()), region)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ConsumingCondition(type(threading.Condition())):
+    """Condition that runs a consumer right after a frame stored in a slot is
+    unlocked, the moment a consumer thread could be scheduled at the latest."""
+
+    def __init__(self, consume):
+        super().__init__()
+        self.consume = consume
+        self.frame_stored = False
+
+    def __exit__(self, *args):
+        super().__exit__(*args)
+        if self.frame_stored:
+            self.frame_stored = False
+            self.consume()
+
+
+@pytest.fixture
+def frame_grabber(monkeypatch):
+    monkeypatch.setattr(game_control.frame_grabber.mss, "mss", FakeScreenGrabber)
+    frame_grabber = FrameGrabber(fps=200, buffer_seconds=0.02)
+    yield frame_grabber
+    frame_grabber.stop_capturing()
+
+
+def test_grab_frame(frame_grabber):
+    frame = frame_grabber.grab_frame(REGION)
+    assert frame.img.shape == (6, 8, 3)
+    assert frame.img.flags.c_contiguous
+    assert (frame.img == (1, 1, 2)).all()
+    assert frame_grabber.frame_buffer.last_frame is frame
+
+
+@pytest.mark.parametrize(
+    "color_mode, scale, expected_shape",
+    [
+        (ColorModes.BGR, 0.5, (3, 4, 3)),
+        (ColorModes.GRAYSCALE, 1, (6, 8)),
+        (ColorModes.GRAYSCALE, 0.5, (3, 4)),
+    ],
+)
+def test_grab_frame_converted(monkeypatch, color_mode, scale, expected_shape):
+    monkeypatch.setattr(game_control.frame_grabber.mss, "mss", FakeScreenGrabber)
+    frame_grabber = FrameGrabber(color_mode=color_mode, scale=scale)
+    frame = frame_grabber.grab_frame(REGION)
+    assert frame.img.shape == expected_shape
+    assert frame.img.flags.c_contiguous
+
+
+def test_next_frame_blocks_for_captured_frames(frame_grabber):
+    frame_grabber.start_capturing(REGION)
+    frames = [frame_grabber.next_frame(timeout=1) for _ in range(3)]
+    frame_grabber.stop_capturing()
+
+    assert all(frame is not None for frame in frames)
+    assert [f.img[0, 0, 0] for f in frames] == sorted(f.img[0, 0, 0] for f in frames)
+    assert frame_grabber.frames_consumed == 3
+    assert frame_grabber.frames_captured >= 3
+
+
+@pytest.mark.parametrize("drop_policy", list(DropPolicies))
+def test_drop_policy_when_consumer_falls_behind(frame_grabber, drop_policy):
+    frame_grabber.start_capturing(REGION, drop_policy=drop_policy)
+    while frame_grabber.frames_dropped < 3:
+        pass
+    frame_grabber.stop_capturing()
+
+    unconsumed = frame_grabber.frame_buffer.maxlen
+    frame = frame_grabber.latest_frame()
+    last_frame = frame_grabber.frame_buffer.last_frame
+    assert frame.frame_id == last_frame.frame_id
+    assert (frame.img == last_frame.img).all()
+    assert not np.shares_memory(frame.img, last_frame.img)
+    assert frame_grabber.frames_consumed == 1
+    if drop_policy == DropPolicies.DROP_OLDEST:
+        assert frame_grabber.frames_captured == frame_grabber.frames_dropped + 1
+    else:
+        assert frame_grabber.frames_captured == unconsumed
+    assert frame_grabber.next_frame(timeout=0) is None
+
+
+@pytest.mark.parametrize("drop_policy", list(DropPolicies))
+def test_slow_consumer_keeps_pixels_of_fetched_frame(monkeypatch, drop_policy):
+    monkeypatch.setattr(game_control.frame_grabber.mss, "mss", FakeScreenGrabber)
+    frame_grabber = FrameGrabber(fps=50, buffer_seconds=0.08)
+    frame_grabber.start_capturing(REGION, drop_policy=drop_policy)
+    while frame_grabber.frames_dropped < 1:
+        time.sleep(0.005)
+
+    frame = frame_grabber.next_frame(timeout=1)
+    pixel = frame.img[0, 0, 0]
+    time.sleep(0.15)
+    frame_grabber.stop_capturing()
+
+    # The frame buffer wrapped around past the slot of the fetched frame
+    assert (
+        frame_grabber.frames_captured
+        > frame.frame_id + frame_grabber.frame_buffer.maxlen
+    )
+    assert (frame.img[..., 0] == pixel).all()
+
+
+def test_thread_stopped_with_timeout_stays_stopped(monkeypatch, frame_grabber):
+    grab = FakeScreenGrabber.grab
+
+    def slow_grab(self, region):
+        time.sleep(0.05)
+        return grab(self, region)
+
+    monkeypatch.setattr(FakeScreenGrabber, "grab", slow_grab)
+    frame_grabber.start_capturing(REGION)
+    first_thread = frame_grabber._capture_thread
+    frame_grabber.stop_capturing(timeout=0)
+    frame_grabber.start_capturing(REGION)
+
+    first_thread.join(1)
+    assert not first_thread.is_alive()
+    assert frame_grabber.is_capturing
+
+
+def test_grab_frame_while_capturing_raises(frame_grabber):
+    frame_grabber.start_capturing(REGION)
+    with pytest.raises(FrameGrabberError):
+        frame_grabber.grab_frame(REGION)
+
+
+def test_consumer_right_after_slot_is_reused_gets_matching_pixels(frame_grabber):
+    frames = []
+    frame_grabber._capture_region = REGION
+    frame_grabber._condition = ConsumingCondition(
+        lambda: frames.append(frame_grabber.next_frame(timeout=0))
+    )
+    add_frame = frame_grabber.frame_buffer.add_frame
+
+    def add_frame_then_consume(frame):
+        frame_grabber._condition.frame_stored = True
+        return add_frame(frame)
+
+    screen_grabber = FakeScreenGrabber()
+    maxlen = frame_grabber.frame_buffer.maxlen
+    for _ in range(maxlen):
+        frame_grabber._capture_frame(screen_grabber)
+    frame_grabber.frame_buffer.add_frame = add_frame_then_consume
+    frame_grabber._capture_frame(screen_grabber)
+
+    # The n-th grab fills the frame with id n - 1 with value n
+    assert [(f.frame_id, f.img[0, 0, 0]) for f in frames] == [
+        (frame.frame_id, frame.frame_id + 1) for frame in frames
+    ]
+    assert frames[0].frame_id == 1
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+
+import game_control.game
+from game_control.game import Game
+from game_control.window_controller import WindowController
+
+
+class FakeAdapter:
+    """Adapter with a game window that appears after a number of lookups."""
+
+    def __init__(self):
+        self.window_id = 42
+        self.lookups_before_window = 2
+        self.pid_lookups = 0
+        self.name_lookups = 0
+
+    def locate_window(self, name):
+        self.name_lookups += 1
+        return self.window_id if name == "GAME" else 0
+
+    def locate_window_by_process_id(self, process_id):
+        self.pid_lookups += 1
+        if process_id != 1234 or self.pid_lookups <= self.lookups_before_window:
+            return 0
+        return self.window_id
+
+    def get_window_name(self, window_id):
+        return "GAME" if window_id == self.window_id else ""
+
+    def get_focused_window_name(self):
+        return "FOCUSED"
+
+
+class FakeGame(Game):
+    """Game with only a window controller, which knows its process id or not."""
+
+    def __init__(self, process_id=None):
+        self._process_id = process_id
+        self._window_controller = WindowController()
+        self._window_id = None
+        self._window_name = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _get_process_id(self):
+        return self._process_id
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    monkeypatch.setattr(
+        WindowController, "_load_adapter", lambda self, backend: FakeAdapter
+    )
+    sleeps = []
+    # Only the wait for focus sleeps in game; the limiter keeps its own sleep.
+    monkeypatch.setattr(game_control.game, "time", SimpleNamespace(sleep=sleeps.append))
+    return sleeps
+
+
+def test_window_found_by_process_id(sleeps):
+    game = FakeGame(process_id=1234)
+    game._set_window_name(None, wait_for_focus=5)
+
+    assert game._window_name == "GAME"
+    assert game._window_id == 42
+    assert game.window_controller.adapter.pid_lookups == 3
+    assert sleeps == []
+
+
+def test_process_id_timeout_falls_back_to_focused_window(sleeps):
+    game = FakeGame(process_id=1234)
+    game.window_controller.adapter.lookups_before_window = float("inf")
+    game._set_window_name(None, wait_for_focus=0.2)
+
+    assert game._window_name == "FOCUSED"
+    assert game._window_id is None
+    assert game.window_controller.adapter.pid_lookups > 1
+    assert sleeps == []
+
+
+def test_without_process_id_waits_for_focus(sleeps):
+    game = FakeGame()
+    game._set_window_name(None, wait_for_focus=5)
+
+    assert game._window_name == "FOCUSED"
+    assert game.window_controller.adapter.pid_lookups == 0
+    assert sleeps == [5]
+
+
+def test_set_window_id_skips_lookup_when_already_set(sleeps):
+    game = FakeGame(process_id=1234)
+    game._set_window_name(None, wait_for_focus=5)
+    game._set_window_id()
+    assert game._window_id == 42
+    assert game.window_controller.adapter.name_lookups == 0
+
+    game = FakeGame()
+    game._set_window_name("GAME", wait_for_focus=5)
+    game._set_window_id()
+    assert game._window_id == 42
+    assert game.window_controller.adapter.name_lookups == 1
+    assert sleeps == []
@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+import pytest
+
+from game_control.perceptual_hash import MultiIndexHashes, dhash, hamming_distance
+
+
+def test_dhash():
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(
+        rng.integers(0, 256, (40, 60, 3), dtype=np.uint8), (0, 0), 4
+    )
+    noisy_image = np.clip(image + rng.integers(-3, 4, image.shape), 0, 255)
+    other_image = cv2.GaussianBlur(
+        rng.integers(0, 256, (40, 60, 3), dtype=np.uint8), (0, 0), 4
+    )
+
+    assert dhash(image) < 2**64
+    assert dhash(image) == dhash(cv2.cvtColor(image, cv2.COLOR_BGR2BGRA))
+    assert hamming_distance(dhash(image), dhash(noisy_image.astype(np.uint8))) <= 4
+    assert hamming_distance(dhash(image), dhash(other_image)) > 16
+
+
+@pytest.mark.parametrize("max_distance", [None, 3, 20])
+def test_hash_index_nearest(max_distance):
+    rng = np.random.default_rng(1)
+    hashes = [int(h) for h in rng.integers(0, 2**16, 300)]
+    hash_index = MultiIndexHashes(bits=16, chunks=4)
+    for i, hash_value in enumerate(hashes):
+        hash_index.add(hash_value, i)
+    assert len(hash_index) == len(hashes)
+
+    flips = [1 << int(bit) for bit in rng.integers(0, 16, 50)]
+    near_queries = [hashes[i] ^ flip for i, flip in enumerate(flips)]
+    for query in near_queries + list(rng.integers(0, 2**16, 50)):
+        distances = [hamming_distance(int(query), h) for h in hashes]
+        expected_distance = min(distances)
+        expected_item = distances.index(expected_distance)
+        if max_distance is not None and expected_distance > max_distance:
+            expected_item, expected_distance = None, None
+        assert hash_index.nearest(int(query), max_distance) == (
+            expected_item,
+            expected_distance,
+        )
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.region_gate import RegionGate
+from game_control.sprite import Sprite
+
+
+def _hud_frames():
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(
+        rng.integers(0, 256, (120, 200, 3), dtype=np.uint8), (0, 0), 2
+    )
+    sprite_img = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    imgs = [background.copy() for _ in range(4)]
+    imgs[0][10:22, 20:36] = sprite_img
+    imgs[1][10:22, 20:36] = sprite_img
+    imgs[1] = cv2.add(imgs[1], 1)
+    imgs[2][10:22, 24:40] = sprite_img
+    imgs[3][10:22, 24:40] = sprite_img
+    imgs[3][80:90, 150:160] = 255
+    sprite = Sprite("ICON", image_data=sprite_img[..., np.newaxis])
+    return sprite, [Frame(img) for img in imgs]
+
+
+def test_locate_reuses_locations_of_unchanged_regions():
+    sprite, frames = _hud_frames()
+    regions = {"HUD": (0, 0, 40, 100), "WORLD": (40, 0, 120, 200)}
+    gate = RegionGate(regions)
+
+    expected_locations = [(10, 20, 22, 36)] * 2 + [(10, 24, 22, 40)] * 2
+    for frame, expected_location in zip(frames, expected_locations):
+        assert gate.locate(sprite, frame, "HUD") == expected_location
+        assert gate.locate(sprite, frame, "HUD") == expected_location
+        assert gate.locate(sprite, frame, "WORLD") is None
+        assert gate.locate(sprite, frame, "HUD", use_global_location=False) == (
+            expected_location
+        )
+
+    # The HUD changed in frame 2 and the world in frame 3
+    assert gate.misses == 3 + 0 + 2 + 1
+    assert gate.hits == 16 - gate.misses
+
+    gate.forget("HUD")
+    gate.locate(sprite, frames[3], "HUD")
+    assert gate.misses == 7
@@ -5,7 +5,7 @@ import numpy as np
 import pytest
 
 from game_control.frame import Frame
-from game_control.sprite import Sprite
+from game_control.sprite import Binarizations, MatchEngines, Sprite, SpriteError
 
 
 def test_discover_sprites():
@@ -116,3 +116,392 @@ def test_locate_template_no_sprite_try(
 ):
     location = _locate_helper(sprite_name, frame_filename, region, use_global_location)
     assert location is None
+
+
+def _synthetic_sprite_and_frame(top=20, left=30, seed=0):
+    """Sprite with a few flat colors pasted twice in a frame with sparse noise."""
+    rng = np.random.default_rng(seed)
+    palette = np.array([(255, 0, 0), (0, 255, 0), (0, 0, 255), (0, 255, 255)])
+    sprite_img = palette[rng.integers(0, len(palette), (12, 16))].astype(np.uint8)
+    frame_img = np.zeros((120, 160, 3), dtype=np.uint8)
+    noise = rng.random(frame_img.shape[:2]) < 0.05
+    frame_img[noise] = palette[rng.integers(0, len(palette), noise.sum())]
+    frame_img[5:17, 5:21] = sprite_img
+    frame_img[top : top + 12, left : left + 16] = sprite_img
+    sprite = Sprite("SYNTHETIC", image_data=sprite_img[..., np.newaxis])
+    return sprite, Frame(frame_img, None)
+
+
+@pytest.mark.parametrize(
+    "region, use_global_location, expected_location",
+    [
+        (None, True, (20, 30, 32, 46)),
+        ((0, 0, 18, 22), True, (5, 5, 17, 21)),
+        ((0, 0, 18, 22), False, (5, 5, 17, 21)),
+        ((15, 25, 40, 60), True, (20, 30, 32, 46)),
+        ((15, 25, 40, 60), False, (5, 5, 17, 21)),
+        ((15, 25, 30, 60), True, None),
+        ((40, 0, 120, 160), True, None),
+    ],
+)
+def test_locate_constellation(region, use_global_location, expected_location):
+    sprite, frame = _synthetic_sprite_and_frame()
+    location = Sprite.locate(sprite, frame, region, use_global_location)
+    assert location == expected_location
+
+
+def _synthetic_sprites(frame, count=6, size=(10, 14), seed=1):
+    """Sprites cut out of random locations of the frame."""
+    rng = np.random.default_rng(seed)
+    sprites = []
+    for i in range(count):
+        y = rng.integers(0, frame.img.shape[0] - size[0])
+        x = rng.integers(0, frame.img.shape[1] - size[1])
+        image_data = frame.img[y : y + size[0], x : x + size[1], :, np.newaxis].copy()
+        sprites.append(Sprite(f"SPRITE_{i}", image_data=image_data))
+    return sprites
+
+
+def _random_frame(shape=(90, 120, 3), seed=0):
+    rng = np.random.default_rng(seed)
+    return Frame(rng.integers(0, 256, shape, dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "regions", [None, (10, 20, 80, 100), {"SPRITE_1": (0, 0, 40, 50)}]
+)
+@pytest.mark.parametrize("match_method", [cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED])
+def test_locate_many(regions, match_method):
+    frame = _random_frame()
+    sprites = _synthetic_sprites(frame)
+    locations = Sprite.locate_many(sprites, frame, regions, match_method=match_method)
+
+    assert list(locations) == [sprite.name for sprite in sprites]
+    for sprite in sprites:
+        region = regions.get(sprite.name) if isinstance(regions, dict) else regions
+        expected_location = Sprite.locate_template(
+            sprite, frame, region, match_method=match_method
+        )
+        assert locations[sprite.name] == expected_location
+
+
+@pytest.mark.parametrize("pyramid_levels", [1, 2, 5])
+@pytest.mark.parametrize("match_method", [cv2.TM_CCOEFF_NORMED, cv2.TM_SQDIFF_NORMED])
+def test_locate_template_pyramid(pyramid_levels, match_method):
+    rng = np.random.default_rng(2)
+    img = cv2.GaussianBlur(
+        rng.integers(0, 256, (200, 300, 3), dtype=np.uint8), (0, 0), 3
+    )
+    frame = Frame(cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX))
+    sprites = _synthetic_sprites(frame, size=(24, 40))
+    match_threshold = 0.1 if match_method == cv2.TM_SQDIFF_NORMED else 0.9
+
+    for sprite in sprites:
+        for region in [None, (13, 17, 150, 260)]:
+            expected_location = Sprite.locate_template(
+                sprite,
+                frame,
+                region,
+                match_method=match_method,
+                match_threshold=match_threshold,
+            )
+            location = Sprite.locate_template(
+                sprite,
+                frame,
+                region,
+                match_method=match_method,
+                match_threshold=match_threshold,
+                pyramid_levels=pyramid_levels,
+            )
+            assert location == expected_location
+
+
+def test_get_template_is_cached_until_append_image_data():
+    frame = _random_frame()
+    sprite = _synthetic_sprites(frame, count=1)[0]
+
+    template = sprite.get_template(0)
+    assert template.flags["C_CONTIGUOUS"]
+    assert np.array_equal(template, sprite.image_data[..., 0])
+    assert sprite.get_template(0) is template
+    assert sprite.get_template(0, grayscale=True).shape == sprite.image_shape[:2]
+    assert sprite.get_template(0, pyramid_level=1).shape[:2] == (5, 7)
+
+    sprite.append_image_data(sprite.image_data[::-1, ::-1])
+    assert sprite.get_template(0) is not template
+
+
+@pytest.mark.parametrize("gray_frame", [False, True])
+def test_locate_template_grayscale(gray_frame):
+    frame = _random_frame()
+    sprites = _synthetic_sprites(frame)
+    if gray_frame:
+        frame = Frame(cv2.cvtColor(frame.img, cv2.COLOR_BGR2GRAY))
+    for sprite in sprites:
+        expected_location = Sprite.locate_template(sprite, _random_frame())
+        location = Sprite.locate_template(sprite, frame, grayscale=True)
+        assert location == expected_location
+        assert Sprite.locate_many([sprite], frame, grayscale=True) == {
+            sprite.name: expected_location
+        }
+
+
+def _write_sprite_files(sprites_dir):
+    colors = {
+        "blue_red_0": (255, 0, 0),
+        "blue_red_1": (0, 0, 255),
+        "green_0": (0, 255, 0),
+    }
+    for stem, color in colors.items():
+        cv2.imwrite(
+            str(sprites_dir / f"sprite_{stem}.png"), np.full((6, 9, 3), color, np.uint8)
+        )
+
+
+def test_discover_sprites_cache_file(tmp_path, monkeypatch):
+    _write_sprite_files(tmp_path)
+    cache_file = tmp_path / "sprites.npz"
+    compiled_file_names = []
+    compile_image_file = Sprite._compile_image_file
+
+    def counting_compile_image_file(file_path):
+        compiled_file_names.append(file_path.name)
+        return compile_image_file(file_path)
+
+    monkeypatch.setattr(Sprite, "_compile_image_file", counting_compile_image_file)
+
+    expected_sprites = Sprite.discover_sprites(tmp_path, cache_file)
+    assert len(compiled_file_names) == 3
+    assert cache_file.exists()
+
+    sprites = Sprite.discover_sprites(tmp_path, cache_file)
+    assert len(compiled_file_names) == 3
+    assert sprites.keys() == expected_sprites.keys()
+    for name, sprite in sprites.items():
+        expected_sprite = expected_sprites[name]
+        assert np.array_equal(sprite.image_data, expected_sprite.image_data)
+        assert sprite.signature_colors == expected_sprite.signature_colors
+        assert sprite.constellation_of_pixels == expected_sprite.constellation_of_pixels
+
+    cv2.imwrite(str(tmp_path / "sprite_green_0.png"), np.zeros((7, 9, 3), np.uint8))
+    sprites = Sprite.discover_sprites(tmp_path, cache_file)
+    assert compiled_file_names[3:] == ["sprite_green_0.png"]
+    assert sprites["SPRITE_GREEN"].signature_colors == [{(0, 0, 0)}]
+
+
+def test_from_images_and_append_image_data():
+    frame = _random_frame()
+    images = [
+        sprite.image_data[..., 0] for sprite in _synthetic_sprites(frame, count=3)
+    ]
+
+    sprite = Sprite.from_images("SPRITE", images)
+    assert sprite.image_count == 3
+    assert sprite.image_data.shape == images[0].shape + (3,)
+    assert len(sprite.signature_colors) == len(sprite.constellation_of_pixels) == 3
+
+    appended_sprite = Sprite("SPRITE", image_data=images[0][..., np.newaxis])
+    signature_colors = list(appended_sprite.signature_colors)
+    appended_sprite.append_image_data(images[1])
+    appended_sprite.append_image_data(images[2][..., np.newaxis])
+    assert appended_sprite.image_count == 3
+    assert np.array_equal(appended_sprite.image_data, sprite.image_data)
+    assert appended_sprite.signature_colors[0] is signature_colors[0]
+    assert appended_sprite.signature_colors == sprite.signature_colors
+
+    location = Sprite.locate_template(
+        appended_sprite, Frame(np.pad(images[2], ((3, 0), (5, 0), (0, 0))))
+    )
+    assert location == (3, 5, 3 + images[2].shape[0], 5 + images[2].shape[1])
+
+
+def _unique_rows_signature_colors(image, quantity=8):
+    """Signature colors the way they were computed with np.unique(axis=0)."""
+    values, counts = np.unique(
+        image.reshape(-1, image.shape[2]), axis=0, return_counts=True
+    )
+    maximum_indices = [
+        index
+        for index in np.argsort(counts)[::-1]
+        if image.shape[2] == 3 or values[index][3] > 0
+    ][:quantity]
+    return set(tuple(map(int, values[index][:3])) for index in maximum_indices)
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+@pytest.mark.parametrize("levels", [2, 3, 256])
+def test_image_signature_colors(channels, levels):
+    rng = np.random.default_rng(levels)
+    images = []
+    for height in range(16, 26, 2):
+        image = rng.integers(0, levels, (height, 30, channels)) * (255 // (levels - 1))
+        image = image.astype(np.uint8)
+        assert Sprite._image_signature_colors(image) == _unique_rows_signature_colors(
+            image
+        )
+        images.append(image)
+    assert Sprite._images_signature_colors(images) == [
+        _unique_rows_signature_colors(image) for image in images
+    ]
+
+
+@pytest.mark.parametrize("grayscale", [False, True])
+@pytest.mark.parametrize("match_method", [cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED])
+def test_locate_fft_match_engine(grayscale, match_method):
+    frame = _random_frame()
+    sprites = _synthetic_sprites(frame)
+    regions = {"SPRITE_1": (0, 0, 40, 50), "SPRITE_2": (10, 20, 80, 100)}
+    match_threshold = 0.1 if match_method == cv2.TM_SQDIFF_NORMED else 0.95
+
+    kwargs = dict(
+        match_method=match_method, match_threshold=match_threshold, grayscale=grayscale
+    )
+    expected_locations = Sprite.locate_many(sprites, frame, regions, **kwargs)
+    locations = Sprite.locate_many(
+        sprites, frame, regions, match_engine=MatchEngines.FFT, **kwargs
+    )
+    assert locations == expected_locations
+    for sprite in sprites:
+        location = Sprite.locate_template(
+            sprite,
+            frame,
+            regions.get(sprite.name),
+            match_engine=MatchEngines.FFT,
+            **kwargs,
+        )
+        assert location == expected_locations[sprite.name]
+    assert frame.spectrum(None, grayscale) is frame.spectrum(None, grayscale)
+
+    with pytest.raises(SpriteError):
+        Sprite.locate_template(
+            sprites[0], frame, pyramid_levels=1, match_engine=MatchEngines.FFT
+        )
+
+
+@pytest.mark.parametrize("match_engine", [MatchEngines.OPENCV, MatchEngines.FFT])
+@pytest.mark.parametrize(
+    "match_method, match_threshold",
+    [(cv2.TM_CCOEFF_NORMED, 0.9), (cv2.TM_SQDIFF_NORMED, 0.1)],
+)
+def test_locate_all_template(match_engine, match_method, match_threshold):
+    frame = _random_frame(shape=(120, 160, 3))
+    sprite_images = [frame.img[:10, :14].copy(), frame.img[10:20, :14].copy()]
+    sprite = Sprite.from_images("SPRITE", sprite_images)
+    positions = [(30, 40), (33, 90), (80, 20), (100, 140)]
+    for i, (y, x) in enumerate(positions):
+        frame.img[y : y + 10, x : x + 14] = sprite_images[i % 2]
+    frame = Frame(frame.img)
+
+    kwargs = dict(
+        match_method=match_method,
+        match_threshold=match_threshold,
+        match_engine=match_engine,
+    )
+    matches = Sprite.locate_all_template(sprite, frame, **kwargs)
+    locations = sorted(location for location, value in matches)
+    expected_locations = [(0, 0, 10, 14), (10, 0, 20, 14)] + [
+        (y, x, y + 10, x + 14) for y, x in positions
+    ]
+    assert locations == sorted(expected_locations)
+
+    region = (25, 30, 60, 120)
+    matches = Sprite.locate_all_template(
+        sprite, frame, region, max_results=1, use_global_location=False, **kwargs
+    )
+    assert len(matches) == 1
+    assert matches[0][0] in [(5, 10, 15, 24), (8, 60, 18, 74)]
+
+
+def test_locate_all_template_suppresses_overlaps():
+    frame_img = np.zeros((40, 60, 3), dtype=np.uint8)
+    frame_img[10:20, 10:30] = 255
+    sprite = Sprite("SPRITE", image_data=frame_img[5:25, 5:35, :, np.newaxis].copy())
+    frame_img[10:20, 12:32] = 255
+    frame = Frame(frame_img)
+
+    matches = Sprite.locate_all_template(sprite, frame, match_threshold=0.8)
+    assert len(matches) == 1
+    assert matches[0][0] == (5, 5, 25, 35)
+    overlapping_matches = Sprite.locate_all_template(
+        sprite, frame, match_threshold=0.8, max_overlap=1
+    )
+    assert len(overlapping_matches) > 1
+    assert overlapping_matches[0] == matches[0]
+
+
+@pytest.mark.parametrize("tiles", [2, 3, 100])
+@pytest.mark.parametrize("match_method", [cv2.TM_CCOEFF_NORMED, cv2.TM_SQDIFF_NORMED])
+def test_locate_template_tiles(tiles, match_method):
+    frame = _random_frame(shape=(120, 160, 3))
+    sprite = Sprite.from_images("SPRITE", [frame.img[59:71, 30:46].copy()])
+
+    tiled_result = Sprite._match_template_tiled(
+        frame.img, sprite.get_template(0), match_method, tiles
+    )
+    result = cv2.matchTemplate(frame.img, sprite.get_template(0), match_method)
+    assert np.allclose(tiled_result, result, atol=1e-5 * np.abs(result).max())
+
+    region = (50, 20, 110, 150)
+    for use_global_location in [True, False]:
+        location = Sprite.locate_template(
+            sprite,
+            frame,
+            region,
+            use_global_location,
+            match_method=match_method,
+            tiles=tiles,
+        )
+        assert location == Sprite.locate_template(
+            sprite, frame, region, use_global_location, match_method=match_method
+        )
+    matches = Sprite.locate_all_template(sprite, frame, tiles=tiles)
+    assert [location for location, _ in matches] == [(59, 30, 71, 46)]
+
+
+@pytest.mark.parametrize("match_method", [cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF_NORMED])
+def test_locate_template_tiles_on_plateau(match_method):
+    # A flat sprite matches every window of a flat area equally well, and
+    # a textured one both of its copies; the first in row-major order wins.
+    frame = _random_frame(shape=(240, 320, 3))
+    frame.img[40:200, 80:240] = (90, 120, 200)
+    frame.img[205:237, 10:42] = frame.img[5:37, 10:42]
+    flat_sprite = Sprite.from_images("FLAT", [frame.img[40:72, 80:112].copy()])
+    textured_sprite = Sprite.from_images("TEXTURED", [frame.img[5:37, 10:42].copy()])
+
+    for sprite, location in [
+        (flat_sprite, (40, 80, 72, 112)),
+        (textured_sprite, (5, 10, 37, 42)),
+    ]:
+        for tiles in [1, 2, 3, 5, 8]:
+            assert (
+                Sprite.locate_template(
+                    sprite, frame, match_method=match_method, tiles=tiles
+                )
+                == location
+            )
+
+
+@pytest.mark.parametrize("binarization", [Binarizations.COLOR_KEY, Binarizations.EDGES])
+def test_locate_binary(binarization):
+    icon = np.full((12, 16, 3), (40, 40, 40), dtype=np.uint8)
+    icon[3:9, 4:12] = (0, 200, 255)
+    icon[4:8, 5:11] = (40, 40, 40)
+    sprite = Sprite.from_images("ICON", [icon])
+    frame_img = np.full((80, 100, 3), (40, 40, 40), dtype=np.uint8)
+    frame_img[50:62, 30:46] = icon
+    frame_img[10:16, 60:68] = (0, 200, 255)
+    frame = Frame(frame_img)
+
+    kwargs = dict(binarization=binarization, color_key=(0, 200, 255))
+    assert Sprite.locate_binary(sprite, frame, **kwargs) == (50, 30, 62, 46)
+    assert Sprite.locate_binary(
+        sprite, frame, (40, 20, 80, 60), use_global_location=False, **kwargs
+    ) == (10, 10, 22, 26)
+    assert Sprite.locate_binary(sprite, frame, (0, 0, 40, 100), **kwargs) is None
+
+
+def test_locate_binary_requires_color_key():
+    frame = _random_frame()
+    sprite = Sprite.from_images("SPRITE", [frame.img[:10, :10].copy()])
+    with pytest.raises(SpriteError):
+        Sprite.locate_binary(sprite, frame)
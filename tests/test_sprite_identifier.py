@@ -0,0 +1,281 @@
+import random
+
+import cv2
+
+import numpy as np
+import pytest
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+from game_control.sprite_identifier import SpriteIdentifier, SpriteIdentifierError
+
+
+def _scan_identify_by_signature_colors(sprites, query_sprite, score_threshold):
+    """Identify by signature colors by scoring every pair of states in order."""
+    top_sprite_score = 0
+    top_sprite_match = None
+    for sprite_name, sprite in sprites.items():
+        for sprite_signature_colors in sprite.signature_colors:
+            for query_sprite_signature_colors in query_sprite.signature_colors:
+                score = int(
+                    (
+                        len(query_sprite_signature_colors & sprite_signature_colors)
+                        / len(sprite_signature_colors)
+                    )
+                    * 100
+                )
+                if score > top_sprite_score:
+                    top_sprite_score = score
+                    top_sprite_match = sprite_name
+    return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
+
+
+def _random_sprite(name, rng, states=2, colors=6):
+    """Sprite with a few colors out of a small palette per state."""
+    palette = rng.integers(0, 4, (12, 3), dtype=np.uint8) * 85
+    images = [
+        palette[rng.integers(0, len(palette), colors)][rng.integers(0, colors, (8, 8))]
+        for _ in range(states)
+    ]
+    return Sprite.from_images(name, images)
+
+
+@pytest.mark.parametrize("score_threshold", [0, 50, 75, 100])
+def test_identify_by_signature_colors(score_threshold):
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    sprite_identifier = SpriteIdentifier({})
+    for i in range(30):
+        sprite_identifier.register(_random_sprite(f"SPRITE_{i}", rng))
+    sprite_identifier.register(_random_sprite("SPRITE_3", rng, states=3))
+
+    for i in range(30):
+        query_sprite = _random_sprite("QUERY", rng, states=1 + i % 2)
+        expected_match = _scan_identify_by_signature_colors(
+            sprite_identifier.sprites, query_sprite, score_threshold
+        )
+        match = sprite_identifier.identify_by_signature_colors(
+            query_sprite, score_threshold=score_threshold
+        )
+        assert match == expected_match
+
+
+def test_identify_by_signature_colors_without_shared_colors():
+    sprite = Sprite("SPRITE", image_data=np.zeros((4, 4, 3, 1), dtype=np.uint8))
+    query_sprite = Sprite("QUERY", image_data=np.ones((4, 4, 3, 1), dtype=np.uint8))
+    sprite_identifier = SpriteIdentifier({"SPRITE": sprite})
+
+    assert sprite_identifier.identify_by_signature_colors(query_sprite) is None
+    assert sprite_identifier.identify(query_sprite) == "UNKNOWN"
+    assert sprite_identifier.identify(sprite) == "SPRITE"
+
+
+def _scan_identify_by_constellation_of_pixels(sprites, query_sprite, score_threshold):
+    """Identify by constellation of pixels by checking every pixel in order."""
+    top_sprite_score = 0
+    top_sprite_match = None
+    for sprite_name, sprite in sprites.items():
+        if sprite.image_shape != query_sprite.image_shape:
+            continue
+        for constellation_of_pixels in sprite.constellation_of_pixels:
+            for i in range(query_sprite.image_data.shape[3]):
+                query_sprite_image = query_sprite.image_data[..., i]
+                score = sum(
+                    tuple(query_sprite_image[y, x, :3]) == color
+                    for (y, x), color in constellation_of_pixels.items()
+                )
+                score = int((score / len(constellation_of_pixels)) * 100)
+                if score > top_sprite_score:
+                    top_sprite_score = score
+                    top_sprite_match = sprite_name
+    return top_sprite_match if top_sprite_score >= score_threshold else "UNKNOWN"
+
+
+@pytest.mark.parametrize("score_threshold", [0, 50, 75, 100])
+def test_identify_by_constellation_of_pixels(score_threshold):
+    random.seed(1)
+    rng = np.random.default_rng(1)
+    sprite_identifier = SpriteIdentifier({})
+    sprites = [_random_sprite(f"SPRITE_{i}", rng, colors=3) for i in range(30)]
+    for sprite in sprites:
+        sprite_identifier.register(sprite)
+    sprite_identifier.register(
+        Sprite("SPRITE_3", image_data=np.zeros((5, 8, 3, 1), dtype=np.uint8))
+    )
+
+    for i in range(30):
+        query_sprite = _random_sprite("QUERY", rng, states=1 + i % 2, colors=3)
+        if i % 3 == 0:
+            query_sprite = Sprite.from_images(
+                "QUERY",
+                [sprites[i].image_data[..., 1], query_sprite.image_data[..., 0]],
+            )
+        expected_match = _scan_identify_by_constellation_of_pixels(
+            sprite_identifier.sprites, query_sprite, score_threshold
+        )
+        match = sprite_identifier.identify_by_constellation_of_pixels(
+            query_sprite, score_threshold=score_threshold
+        )
+        assert match == expected_match
+
+
+@pytest.mark.parametrize("score_threshold", [0, 50, 100])
+def test_identify_by_ssim(score_threshold):
+    random.seed(2)
+    rng = np.random.default_rng(2)
+    sprite_identifier = SpriteIdentifier({})
+    for i in range(5):
+        sprite_identifier.register(_random_sprite(f"SPRITE_{i}", rng, colors=3))
+    small_image_data = np.zeros((5, 5, 3, 1), dtype=np.uint8)
+    sprite_identifier.register(Sprite("SMALL", image_data=small_image_data))
+
+    image = sprite_identifier.sprites["SPRITE_3"].image_data[..., 1]
+    noise = rng.integers(0, 8, image.shape, dtype=np.uint8)
+    query_sprite = Sprite.from_images("QUERY", [image ^ noise])
+    match = sprite_identifier.identify_by_ssim(
+        query_sprite, score_threshold=score_threshold
+    )
+    assert match == ("SPRITE_3" if score_threshold < 100 else "UNKNOWN")
+
+    small_query_sprite = Sprite("SMALL_QUERY", image_data=small_image_data)
+    assert sprite_identifier.identify(small_query_sprite, mode="SSIM") == "UNKNOWN"
+
+
+def test_identify_by_perceptual_hash():
+    rng = np.random.default_rng(3)
+    sprite_identifier = SpriteIdentifier({})
+    images = [
+        cv2.GaussianBlur(rng.integers(0, 256, (24, 32, 3), dtype=np.uint8), (0, 0), 3)
+        for _ in range(12)
+    ]
+    for i in range(0, 10, 2):
+        sprite_identifier.register(Sprite.from_images(f"SPRITE_{i}", images[i : i + 2]))
+
+    query_sprite = Sprite.from_images("QUERY", [images[11], images[7]])
+    assert sprite_identifier.nearest_by_perceptual_hash(query_sprite) == ("SPRITE_6", 0)
+    assert (
+        sprite_identifier.identify(query_sprite, mode="PERCEPTUAL_HASH") == "SPRITE_6"
+    )
+
+    sprite_identifier.register(Sprite.from_images("SPRITE_10", images[10:]))
+    assert sprite_identifier.nearest_by_perceptual_hash(query_sprite) == ("SPRITE_6", 0)
+    sprite_identifier.register(Sprite.from_images("SPRITE_6", images[10:]))
+    assert sprite_identifier.nearest_by_perceptual_hash(query_sprite) == ("SPRITE_6", 0)
+    sprite_identifier.register(Sprite.from_images("SPRITE_6", images[:1]))
+    assert sprite_identifier.nearest_by_perceptual_hash(query_sprite) == (
+        "SPRITE_10",
+        0,
+    )
+    assert sprite_identifier.nearest_by_perceptual_hash(
+        Sprite.from_images("QUERY", [images[7]]), max_distance=4
+    ) == (None, None)
+
+
+@pytest.mark.parametrize(
+    "mode",
+    ["SIGNATURE_COLORS", "CONSTELLATION_OF_PIXELS", "SSIM", "PERCEPTUAL_HASH"],
+)
+def test_identify_many(mode):
+    random.seed(4)
+    rng = np.random.default_rng(4)
+    sprite_identifier = SpriteIdentifier({})
+    for i in range(10):
+        sprite_identifier.register(_random_sprite(f"SPRITE_{i}", rng, colors=3))
+
+    frame_img = np.zeros((40, 60, 3), dtype=np.uint8)
+    boxes = [(0, 0, 8, 8), (10, 20, 18, 28), (30, 40, 40, 60)]
+    for box, i in zip(boxes, [3, 7, 0]):
+        image = sprite_identifier.sprites[f"SPRITE_{i}"].image_data[..., 0]
+        frame_img[box[0] : box[0] + 8, box[1] : box[1] + 8] = image
+    crops = [frame_img[y0:y1, x0:x1] for y0, x0, y1, x1 in boxes]
+    crops.append(_random_sprite("QUERY", rng, states=1, colors=3).image_data[..., 0])
+
+    identifications = sprite_identifier.identify_many(crops, mode=mode)
+    assert (
+        sprite_identifier.identify_many(mode=mode, frame=Frame(frame_img), boxes=boxes)
+        == identifications[:3]
+    )
+    assert [name for name, score in identifications[:2]] == ["SPRITE_3", "SPRITE_7"]
+    for crop, (name, score) in zip(crops, identifications):
+        query_sprite = Sprite("QUERY", image_data=crop[..., np.newaxis])
+        assert name == sprite_identifier.identify(query_sprite, mode=mode)
+        assert 0 <= score <= 100
+
+
+@pytest.mark.parametrize(
+    "mode",
+    ["SIGNATURE_COLORS", "CONSTELLATION_OF_PIXELS", "SSIM", "PERCEPTUAL_HASH"],
+)
+def test_identify_many_without_crops(mode):
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    sprite_identifier = SpriteIdentifier()
+    sprite_identifier.register(_random_sprite("SPRITE", rng))
+    frame = Frame(np.zeros((40, 60, 3), dtype=np.uint8))
+
+    assert sprite_identifier.identify_many([], mode=mode) == []
+    assert sprite_identifier.identify_many(mode=mode, frame=frame, boxes=[]) == []
+
+
+def test_identify_while_registering():
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    modes = ["SIGNATURE_COLORS", "CONSTELLATION_OF_PIXELS", "SSIM"]
+    query_sprites = [_random_sprite("QUERY", rng, states=1) for _ in range(5)]
+    sprite_identifier = SpriteIdentifier()
+    for i in range(40):
+        # Register some sprites again, with other states or another shape.
+        sprite = _random_sprite(f"SPRITE_{i % 25}", rng, states=1 + i % 3)
+        if i % 7 == 6:
+            image = rng.integers(0, 4, (9, 9, 3), dtype=np.uint8) * 85
+            sprite = Sprite.from_images(sprite.name, [image])
+        if i % 3 == 0:
+            query_sprites.append(sprite)
+        sprite_identifier.register(sprite)
+
+        _assert_same_identifications(sprite_identifier, query_sprites, modes)
+
+    # Repeated queries merge the segments of the indexes.
+    for _ in range(20):
+        _assert_same_identifications(sprite_identifier, query_sprites, modes)
+
+
+def _assert_same_identifications(sprite_identifier, query_sprites, modes):
+    fresh_sprite_identifier = SpriteIdentifier(sprite_identifier.sprites)
+    crops = [query_sprite.image_data[..., 0] for query_sprite in query_sprites]
+    for mode in modes:
+        assert sprite_identifier.identify_many(
+            crops, mode=mode
+        ) == fresh_sprite_identifier.identify_many(crops, mode=mode)
+
+
+def test_identify_many_unknown_mode():
+    crops = [np.zeros((8, 8, 3), dtype=np.uint8)]
+    with pytest.raises(SpriteIdentifierError):
+        SpriteIdentifier().identify_many(crops, mode="UNKNOWN")
+
+
+def test_identify_by_perceptual_hash_with_other_identifiers():
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    sprite = _random_sprite("SPRITE", rng)
+    sprite_identifier = SpriteIdentifier()
+    other_sprite_identifier = SpriteIdentifier()
+    other_sprite_identifier.register(sprite)
+
+    assert sprite_identifier.identify(sprite, mode="PERCEPTUAL_HASH") == "UNKNOWN"
+    assert other_sprite_identifier.identify(sprite, mode="PERCEPTUAL_HASH") == "SPRITE"
+
+
+def test_identifiers_do_not_share_sprites():
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    sprites = {"SPRITE_0": _random_sprite("SPRITE_0", rng)}
+    sprite_identifier = SpriteIdentifier(sprites)
+    other_sprite_identifier = SpriteIdentifier()
+    other_sprite_identifier.register(_random_sprite("SPRITE_1", rng))
+    sprites["SPRITE_2"] = _random_sprite("SPRITE_2", rng)
+
+    assert list(sprite_identifier.sprites) == ["SPRITE_0"]
+    assert list(SpriteIdentifier().sprites) == []
+    assert sprite_identifier.identify(sprites["SPRITE_0"]) == "SPRITE_0"
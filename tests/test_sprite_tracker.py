@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from game_control.frame import Frame
+from game_control.sprite import Sprite
+from game_control.sprite_tracker import SpriteTracker
+
+
+def _frames_with_moving_sprite(positions, shape=(120, 200, 3)):
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(
+        rng.integers(0, 256, shape, dtype=np.uint8), (0, 0), 2
+    )
+    sprite_img = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    frames = []
+    for y, x in positions:
+        img = background.copy()
+        img[y : y + 12, x : x + 16] = sprite_img
+        frames.append(Frame(img))
+    return Sprite("MOVING", image_data=sprite_img[..., np.newaxis]), frames
+
+
+def test_locate_near_last_location():
+    positions = [(10, 10), (14, 20), (18, 30), (22, 40), (80, 150)]
+    sprite, frames = _frames_with_moving_sprite(positions)
+    tracker = SpriteTracker(margin=10)
+
+    for (y, x), frame in zip(positions, frames):
+        assert tracker.locate(sprite, frame) == (y, x, y + 12, x + 16)
+
+    # Frame 1 fits in the margin, frames 2 and 3 are predicted with velocity
+    # and the sprite jumped too far in frame 4
+    assert tracker.window_locates == 3
+    assert tracker.full_locates == 2
+
+
+def test_locate_within_region():
+    positions = [(30, 50), (31, 52)]
+    sprite, frames = _frames_with_moving_sprite(positions)
+    tracker = SpriteTracker()
+    region = (20, 40, 100, 120)
+
+    for (y, x), frame in zip(positions, frames):
+        location = tracker.locate(sprite, frame, region, use_global_location=False)
+        assert location == (y - 20, x - 40, y - 8, x - 24)
+    assert tracker.window_locates == 1
+
+    tracker.forget("MOVING")
+    tracker.locate(sprite, frames[0], region)
+    assert tracker.full_locates == 2
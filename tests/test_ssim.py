@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+import pytest
+
+from game_control.ssim import SSIMReferences, box_means
+
+
+def _ssim(image_x, image_y):
+    """SSIM computed per pixel with filters, cropped like skimage does."""
+    x, y = image_x.astype(np.float64), image_y.astype(np.float64)
+
+    def mean(image):
+        return cv2.blur(image, (7, 7), borderType=cv2.BORDER_REFLECT)
+
+    ux, uy = mean(x), mean(y)
+    vx = 49 / 48 * (mean(x * x) - ux * ux)
+    vy = 49 / 48 * (mean(y * y) - uy * uy)
+    vxy = 49 / 48 * (mean(x * y) - ux * uy)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    s = ((2 * ux * uy + c1) * (2 * vxy + c2)) / (
+        (ux * ux + uy * uy + c1) * (vx + vy + c2)
+    )
+    return s[3:-3, 3:-3].mean()
+
+
+def _similar_images(count=5, shape=(20, 30, 3), seed=0):
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 256, shape, dtype=np.uint8), (0, 0), 2)
+    noise = rng.integers(-40, 40, (count,) + shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def test_box_means():
+    images = np.random.default_rng(0).random((2, 9, 11, 3))
+    means = box_means(images, size=3)
+    assert means.shape == (2, 7, 9, 3)
+    assert np.allclose(means[1, 2, 4], images[1, 2:5, 4:7].mean(axis=(0, 1)))
+
+
+def test_compare():
+    images = _similar_images()
+    references = SSIMReferences(images[1:])
+    similarities = references.compare(images[0])
+    expected_similarities = [_ssim(images[0], image) for image in images[1:]]
+    assert np.allclose(similarities, expected_similarities, atol=1e-9)
+    assert np.allclose(references.compare(images[1])[0], 1)
+
+
+def test_compare_like_skimage():
+    metrics = pytest.importorskip("skimage.metrics")
+    images = _similar_images()
+    similarities = SSIMReferences(images[1:]).compare(images[0])
+    expected_similarities = [
+        metrics.structural_similarity(images[0], image, channel_axis=2)
+        for image in images[1:]
+    ]
+    assert np.allclose(similarities, expected_similarities, atol=1e-9)
@@ -0,0 +1,82 @@
+import pytest
+
+from game_control.window_controller import WindowController
+
+
+class CountingAdapter:
+    """Adapter that counts the queries that would hit the window system."""
+
+    def __init__(self):
+        self.queries = 0
+        self.geometry = {"top": 0, "left": 0, "width": 960, "height": 540}
+
+    def is_window_focused(self, window_id):
+        self.queries += 1
+        return True
+
+    def get_window_geometry(self, window_id):
+        self.queries += 1
+        return dict(self.geometry)
+
+    def move_window(self, window_id, x, y):
+        self.geometry.update(left=x, top=y)
+
+    def resize_window(self, window_id, width, height):
+        self.geometry.update(width=width, height=height)
+
+    def focus_window(self, window_id):
+        pass
+
+
+@pytest.fixture
+def window_controller(monkeypatch):
+    monkeypatch.setattr(
+        WindowController, "_load_adapter", lambda self, backend: CountingAdapter
+    )
+    return WindowController(cache_ttl=float("inf"))
+
+
+def _grab_loop(window_controller, steps=10):
+    for _ in range(steps):
+        if window_controller.is_window_focused(1):
+            geometry = window_controller.get_window_geometry(1)
+    return geometry
+
+
+def test_steady_state_makes_no_queries(window_controller):
+    _grab_loop(window_controller)
+    assert window_controller.adapter.queries == 2
+
+
+def test_cache_ttl_zero_disables_cache(window_controller):
+    window_controller.cache_ttl = 0
+    _grab_loop(window_controller)
+    assert window_controller.adapter.queries == 20
+
+
+@pytest.mark.parametrize(
+    "change, expected_geometry",
+    [
+        (lambda wc: wc.move_window(1, 10, 20), (20, 10, 960, 540)),
+        (lambda wc: wc.resize_window(1, 100, 50), (0, 0, 100, 50)),
+        (
+            lambda wc: wc.set_window_geometry(
+                1, {"top": 1, "left": 2, "width": 3, "height": 4}
+            ),
+            (1, 2, 3, 4),
+        ),
+    ],
+)
+def test_changing_window_refreshes_cache(window_controller, change, expected_geometry):
+    _grab_loop(window_controller)
+    change(window_controller)
+    geometry = _grab_loop(window_controller)
+    assert tuple(geometry.values()) == expected_geometry
+    assert window_controller.adapter.queries == 4
+
+
+def test_invalidate(window_controller):
+    _grab_loop(window_controller)
+    window_controller.invalidate()
+    _grab_loop(window_controller)
+    assert window_controller.adapter.queries == 4
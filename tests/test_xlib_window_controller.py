@@ -0,0 +1,72 @@
+import shutil
+import subprocess
+import time
+
+import pytest
+
+Xlib = pytest.importorskip("Xlib")
+from Xlib import X, display  # noqa: E402
+
+from game_control.window_controller import (  # noqa: E402
+    WindowController,
+    WindowControllers,
+)
+
+DISPLAY_NAME = ":97"
+WINDOW_NAME = "game_control test window"
+
+
+@pytest.fixture(scope="module")
+def xvfb():
+    if shutil.which("Xvfb") is None:
+        pytest.skip("Xvfb is not installed")
+
+    process = subprocess.Popen(["Xvfb", DISPLAY_NAME, "-screen", "0", "800x600x24"])
+    for _ in range(50):
+        try:
+            display.Display(DISPLAY_NAME).close()
+            break
+        except Exception:
+            time.sleep(0.1)
+    yield DISPLAY_NAME
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture
+def window(xvfb):
+    connection = display.Display(xvfb)
+    root = connection.screen().root
+    window = root.create_window(10, 20, 200, 100, 0, X.CopyFromParent)
+    window.set_wm_name(WINDOW_NAME)
+    window.set_wm_class("game_control", "GameControl")
+    window.map()
+    connection.sync()
+    yield window
+    window.destroy()
+    connection.close()
+
+
+@pytest.fixture
+def window_controller(xvfb, monkeypatch):
+    monkeypatch.setenv("DISPLAY", xvfb)
+    window_controller = WindowController(backend=WindowControllers.XLIB)
+    yield window_controller
+    window_controller.adapter.close()
+
+
+def test_locate_window(window_controller, window):
+    assert window_controller.locate_window(WINDOW_NAME) == window.id
+    assert window_controller.locate_window("no such window") == 0
+
+
+def test_move_and_resize_window(window_controller, window):
+    region = {"top": 30, "left": 40, "width": 300, "height": 150}
+    window_controller.set_window_geometry(window.id, region)
+    assert window_controller.get_window_geometry(window.id) == region
+
+
+def test_focus_window(window_controller, window):
+    window_controller.focus_window(window.id)
+    assert window_controller.is_window_focused(window.id)
+    assert window_controller.get_focused_window_name() == WINDOW_NAME